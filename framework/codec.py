@@ -0,0 +1,259 @@
+import functools
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils import num
+
+# Size of the chunks in bytes the host buffers are divided in, a data record never crosses a chunk border.
+CHUNK_SIZE = 256
+
+# Number type of the id and n fields
+INTEGER_TYPE = num.UnsignedIntegerNumberType(32)
+
+
+def _layout(fields: List[Tuple[str, int, num.NumberType]]) -> Tuple[List[Tuple], int]:
+    """
+    Places fields in a record the same way as a StructDescription, the first field at the most significant bits.
+    The record is padded at the least significant bits to full bytes.
+    :param fields: list of (field name, list index or None, number type)
+    :return: list of (field name, list index or None, number type, number of bits, bit offset from the lsb of the
+             record) and the record size in bytes
+    """
+    nbr_bits = sum(number_type.nbr_bits for _, _, number_type in fields)
+    record_size = (nbr_bits + 7) // 8
+    high_index = record_size * 8
+    layout = []
+    for field_name, index, number_type in fields:
+        high_index -= number_type.nbr_bits
+        layout.append((field_name, index, number_type, number_type.nbr_bits, high_index))
+    return layout, record_size
+
+
+def _to_raw(number_type: num.NumberType, values) -> np.ndarray:
+    """
+    Converts values with number_type.create_constants, returns the bit patterns as uint64.
+    """
+    constants = number_type.create_constants(values)
+    if number_type.signed:
+        return constants.astype(np.int64).view(np.uint64)
+    return constants.astype(np.uint64)
+
+
+def _from_raw(number_type: num.NumberType, raw: np.ndarray) -> np.ndarray:
+    """
+    Converts bit patterns given as uint64 with number_type.values_of.
+    Signed types are sign extended from number_type.nbr_bits.
+    """
+    if number_type.signed:
+        sign_bit = np.uint64(1 << (number_type.nbr_bits - 1))
+        raw = ((raw ^ sign_bit) - sign_bit).view(np.int64)
+    return number_type.values_of(raw)
+
+
+def _insert_field(records: np.ndarray, raw: np.ndarray, nbr_bits: int, bit_offset: int):
+    """
+    Ors the lowest nbr_bits of raw at bit_offset into every record.
+    :param records: uint8 array of shape (number of records, record size in bytes), little endian
+    :param raw: uint64 array with one value per record
+    """
+    assert nbr_bits <= 64
+    byte_offset, shift = divmod(bit_offset, 8)
+    nbr_bytes = (shift + nbr_bits + 7) // 8
+
+    raw = raw & np.uint64((1 << nbr_bits) - 1)
+    low_bytes = (raw << np.uint64(shift)).astype('<u8').view(np.uint8).reshape(-1, 8)
+    nbr_low_bytes = min(nbr_bytes, 8)
+    records[:, byte_offset:byte_offset + nbr_low_bytes] |= low_bytes[:, :nbr_low_bytes]
+    if nbr_bytes > 8:
+        records[:, byte_offset + 8] |= (raw >> np.uint64(64 - shift)).astype(np.uint8)
+
+
+def _extract_field(records: np.ndarray, nbr_bits: int, bit_offset: int) -> np.ndarray:
+    """
+    Counterpart of _insert_field, returns nbr_bits at bit_offset of every record as uint64.
+    """
+    assert nbr_bits <= 64
+    byte_offset, shift = divmod(bit_offset, 8)
+    nbr_bytes = (shift + nbr_bits + 7) // 8
+
+    nbr_low_bytes = min(nbr_bytes, 8)
+    low_bytes = np.zeros((len(records), 8), dtype=np.uint8)
+    low_bytes[:, :nbr_low_bytes] = records[:, byte_offset:byte_offset + nbr_low_bytes]
+    raw = low_bytes.view('<u8').reshape(-1) >> np.uint64(shift)
+    if nbr_bytes > 8:
+        raw |= records[:, byte_offset + 8].astype(np.uint64) << np.uint64(64 - shift)
+    return raw & np.uint64((1 << nbr_bits) - 1)
+
+
+def _records_to_chunks(records: np.ndarray, first_slot=0) -> np.ndarray:
+    """
+    Places records in chunks of CHUNK_SIZE bytes, the same way the runtime fills the input buffer.
+    :param records: uint8 array of shape (number of records, record size in bytes)
+    :param first_slot: slot of the first chunk the first record is placed in, the slots before are left empty
+    :return: flat uint8 array with the size of all used chunks
+    """
+    nbr_records, record_size = records.shape
+    records_per_chunk = CHUNK_SIZE // record_size
+    assert 0 <= first_slot < records_per_chunk
+    nbr_chunks = int(math.ceil((first_slot + nbr_records) / records_per_chunk))
+
+    slots = np.zeros((nbr_chunks * records_per_chunk, record_size), dtype=np.uint8)
+    slots[first_slot:first_slot + nbr_records] = records
+
+    image = np.zeros((nbr_chunks, CHUNK_SIZE), dtype=np.uint8)
+    image[:, :records_per_chunk * record_size] = slots.reshape(nbr_chunks, records_per_chunk * record_size)
+    return image.reshape(-1)
+
+
+def _chunks_to_records(image: np.ndarray, record_size: int) -> np.ndarray:
+    """
+    Counterpart of _records_to_chunks, returns all record slots of the given chunks.
+    :param image: flat uint8 array, its size must be a multiple of CHUNK_SIZE
+    :return: uint8 array of shape (number of slots, record_size)
+    """
+    assert image.size % CHUNK_SIZE == 0
+    records_per_chunk = CHUNK_SIZE // record_size
+    chunks = image.reshape(-1, CHUNK_SIZE)[:, :records_per_chunk * record_size]
+    return chunks.reshape(-1, record_size)
+
+
+class Codec:
+    def __init__(self, system_size: int, number_type: num.NumberType):
+        """
+        Converts solver inputs and outputs to and from the records exchanged with the fpga, vectorized over whole
+        batches. The record layout is the one of data_desc.get_input_desc and data_desc.get_output_desc, it is
+        computed without myhdl so the runtime does not depend on the generator toolchain.
+        Codecs are immutable, use get_codec to share one codec per system size and number type.
+        :param system_size: size of the ode system
+        :param number_type: number type of x and y of the solver
+        """
+        self.system_size = system_size
+        self.number_type = number_type
+        self._input_fields, self._input_record_size = _layout(
+            [('id', None, INTEGER_TYPE), ('x_start', None, number_type)]
+            + [('y_start', i, number_type) for i in range(system_size)]
+            + [('h', None, number_type), ('n', None, INTEGER_TYPE)]
+        )
+        self._output_fields, self._output_record_size = _layout(
+            [('id', None, INTEGER_TYPE), ('x', None, number_type)]
+            + [('y', i, number_type) for i in range(system_size)]
+        )
+        self._inputs_per_chunk = CHUNK_SIZE // self._input_record_size
+        self._outputs_per_chunk = CHUNK_SIZE // self._output_record_size
+
+    @property
+    def input_record_size(self) -> int:
+        """
+        Size of an input record in bytes.
+        """
+        return self._input_record_size
+
+    @property
+    def output_record_size(self) -> int:
+        """
+        Size of an output record in bytes.
+        """
+        return self._output_record_size
+
+    @property
+    def inputs_per_chunk(self) -> int:
+        """
+        Number of input records placed in each chunk.
+        """
+        return self._inputs_per_chunk
+
+    @property
+    def outputs_per_chunk(self) -> int:
+        """
+        Number of output records placed in each chunk.
+        """
+        return self._outputs_per_chunk
+
+    def input_capacity(self, buffer_size: int) -> int:
+        """
+        Number of input records fitting into a buffer of the given size in bytes, a partial last chunk is used as well.
+        """
+        return (buffer_size // CHUNK_SIZE) * self._inputs_per_chunk \
+            + min(self._inputs_per_chunk, (buffer_size % CHUNK_SIZE) // self._input_record_size)
+
+    def input_chunks(self, nbr_inputs: int) -> int:
+        """
+        Number of chunks used by the given number of input records.
+        """
+        return int(math.ceil(nbr_inputs / self._inputs_per_chunk))
+
+    def output_chunks(self, nbr_outputs: int) -> int:
+        """
+        Number of chunks used by the given number of output records.
+        """
+        return int(math.ceil(nbr_outputs / self._outputs_per_chunk))
+
+    def pack_input_records(self, ids, x_start, y_start, h, n) -> np.ndarray:
+        """
+        Packs a whole batch of inputs into records, scalars are broadcasted over the batch.
+        :param ids: ids of the datasets, defines the number of records
+        :param y_start: solver inputs, of shape (number of records, system_size) in the order of the problem config
+        :return: uint8 array of shape (number of records, input_record_size)
+        """
+        ids = np.asarray(ids).reshape(-1)
+        nbr_records = len(ids)
+        values = {
+            'id': ids,
+            'x_start': np.broadcast_to(x_start, (nbr_records,)),
+            'y_start': np.broadcast_to(y_start, (nbr_records, self.system_size)),
+            'h': np.broadcast_to(h, (nbr_records,)),
+            'n': np.broadcast_to(n, (nbr_records,))
+        }
+        records = np.zeros((nbr_records, self._input_record_size), dtype=np.uint8)
+        for field_name, index, number_type, nbr_bits, bit_offset in self._input_fields:
+            field_values = values[field_name] if index is None else values[field_name][:, index]
+            _insert_field(records, _to_raw(number_type, field_values), nbr_bits, bit_offset)
+        return records
+
+    def pack_input_batch(self, ids, x_start, y_start, h, n, first_slot=0) -> np.ndarray:
+        """
+        Packs a whole batch of inputs into the byte image of the input buffer, including the padding of each chunk.
+        :param first_slot: record slot of the first chunk to start with, allows to continue a partially filled chunk
+        :return: flat uint8 array, identical to the buffer content of the records added one after another
+        """
+        return _records_to_chunks(self.pack_input_records(ids, x_start, y_start, h, n), first_slot)
+
+    def unpack_output_records(self, records: np.ndarray) -> Dict:
+        """
+        Unpacks output records, counterpart of pack_input_records.
+        :param records: uint8 array of shape (number of records, output_record_size)
+        :return: dict with arrays of id, x and y, y of shape (number of records, system_size) in the order of the
+                 problem config
+        """
+        unpacked_data = {
+            'id': None,
+            'x': None,
+            'y': np.zeros((len(records), self.system_size), dtype=np.float64)
+        }
+        for field_name, index, number_type, nbr_bits, bit_offset in self._output_fields:
+            values = _from_raw(number_type, _extract_field(records, nbr_bits, bit_offset))
+            if index is None:
+                unpacked_data[field_name] = values
+            else:
+                unpacked_data[field_name][:, index] = values
+        return unpacked_data
+
+    def unpack_output_batch(self, output_data) -> Dict:
+        """
+        Unpacks all record slots of an output buffer image at once, counterpart of pack_input_batch.
+        Slots which were not written by the solver are returned as well, they can be identified by an id of 0.
+        :param output_data: bytes like object or uint8 array, its size must be a multiple of CHUNK_SIZE
+        :return: dict with arrays of id, x and y, see unpack_output_records
+        """
+        records = _chunks_to_records(np.frombuffer(output_data, dtype=np.uint8), self._output_record_size)
+        return self.unpack_output_records(records)
+
+
+@functools.lru_cache(maxsize=None)
+def get_codec(system_size: int, number_type: num.NumberType) -> Codec:
+    """
+    Returns the codec of the given system size and number type, it is built once and shared by all callers.
+    """
+    return Codec(system_size, number_type)
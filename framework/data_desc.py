@@ -1,13 +1,17 @@
 from bitarray import bitarray
 from myhdl import intbv
 
+from framework.codec import CHUNK_SIZE, get_codec
 from framework.packed_struct import StructDescription, BitVector, StructDescriptionMetaclass, field_len
 from utils import num
 
 
-def get_input_desc(system_size):
+def get_input_desc(system_size, number_type: num.NumberType = None):
+    """
+    :param number_type: number type of x_start, y_start and h, defaults to num.get_default_type()
+    """
     integer_type = num.UnsignedIntegerNumberType(32)
-    default_type = num.get_default_type()
+    default_type = number_type if number_type is not None else num.get_default_type()
     len_without_padding = 2 * integer_type.nbr_bits + (2 + system_size) * default_type.nbr_bits
     if len_without_padding % 8 != 0:
         len_padding = 8 - len_without_padding % 8
@@ -50,8 +54,8 @@ def _data_to_bitarray(field_desc, data):
         raise NotImplementedError()
 
 
-def pack_input_data(system_size, input_data: dict) -> bytes:
-    input_desc = get_input_desc(system_size)
+def pack_input_data(system_size, input_data: dict, number_type: num.NumberType = None) -> bytes:
+    input_desc = get_input_desc(system_size, number_type)
     data = bitarray(endian='little')
 
     for field_name, field_desc in reversed(input_desc.get_fields().items()):
@@ -69,9 +73,42 @@ def pack_input_data(system_size, input_data: dict) -> bytes:
     return data.tobytes()
 
 
-def get_output_desc(system_size):
+def pack_input_records(system_size, ids, x_start, y_start, h, n, number_type: num.NumberType = None):
+    """
+    Packs a whole batch of inputs into records, see Codec.pack_input_records.
+    :return: uint8 array of shape (number of records, record size), each row as packed by pack_input_data
+    """
+    if number_type is None:
+        number_type = num.get_default_type()
+    return get_codec(system_size, number_type).pack_input_records(ids, x_start, y_start, h, n)
+
+
+def pack_input_batch(system_size, ids, x_start, y_start, h, n, first_slot=0, number_type: num.NumberType = None):
+    """
+    Packs a whole batch of inputs into the byte image of the input buffer, including the padding of each chunk.
+    In contrast to pack_input_data all values are python values (not in constant representation), they are
+    converted vectorized. Scalars are broadcasted over the batch. See Codec.pack_input_batch.
+    :param system_size: size of the ode system
+    :param ids: ids of the datasets, defines the number of records
+    :param x_start: solver inputs
+    :param y_start: solver inputs, of shape (number of records, system_size) in the order of the problem config
+    :param h: solver inputs
+    :param n: solver inputs
+    :param first_slot: record slot of the first chunk to start with, allows to continue a partially filled chunk
+    :param number_type: number type of x_start, y_start and h, defaults to num.get_default_type()
+    :return: flat uint8 array, identical to the buffer content of the records added one after another
+    """
+    if number_type is None:
+        number_type = num.get_default_type()
+    return get_codec(system_size, number_type).pack_input_batch(ids, x_start, y_start, h, n, first_slot)
+
+
+def get_output_desc(system_size, number_type: num.NumberType = None):
+    """
+    :param number_type: number type of x and y, defaults to num.get_default_type()
+    """
     integer_type = num.UnsignedIntegerNumberType(32)
-    default_type = num.get_default_type()
+    default_type = number_type if number_type is not None else num.get_default_type()
     len_without_padding = integer_type.nbr_bits + (1 + system_size) * default_type.nbr_bits
     if len_without_padding % 8 != 0:
         len_padding = 8 - len_without_padding % 8
@@ -117,8 +154,8 @@ def _bitarray_to_data(field_desc, data_bits):
         raise NotImplementedError()
 
 
-def unpack_output_data(system_size, output_data: bytes) -> dict:
-    output_desc = get_output_desc(system_size)
+def unpack_output_data(system_size, output_data: bytes, number_type: num.NumberType = None) -> dict:
+    output_desc = get_output_desc(system_size, number_type)
     data = bitarray(endian='little')
     data.frombytes(output_data)
 
@@ -136,3 +173,18 @@ def unpack_output_data(system_size, output_data: bytes) -> dict:
         offset += nbr_bits
 
     return unpacked_data
+
+
+def unpack_output_batch(system_size, output_data, number_type: num.NumberType = None) -> dict:
+    """
+    Unpacks all record slots of an output buffer image at once, counterpart of pack_input_batch.
+    Values are converted vectorized to python values (not in constant representation). Slots which were not written
+    by the solver are returned as well, they can be identified by an id of 0. See Codec.unpack_output_batch.
+    :param system_size: size of the ode system
+    :param output_data: bytes like object or uint8 array, its size must be a multiple of CHUNK_SIZE
+    :param number_type: number type of x and y, defaults to num.get_default_type()
+    :return: dict with arrays of id, x and y, y of shape (number of slots, system_size) in the order of the problem config
+    """
+    if number_type is None:
+        number_type = num.get_default_type()
+    return get_codec(system_size, number_type).unpack_output_batch(output_data)
@@ -2,14 +2,37 @@ import typing
 
 from pyparsing import *
 
-from framework.pipeline import PipeConstant
-from framework.pipeline_elements import add, sub, mul, negate
-
 
 class ExprParserException(Exception):
     pass
 
 
+def _logic_operations():
+    """
+    Operations used to generate the pipeline logic of an expression.
+    Imported on demand, composing python functions of expressions does not require myhdl.
+    """
+    from framework.pipeline import PipeConstant
+    from framework.pipeline_elements import add, sub, mul, negate
+    return {
+        'constant': PipeConstant.from_float,
+        'negate': negate,
+        '+': add,
+        '-': sub,
+        '*': mul
+    }
+
+
+# Operations used to compose a python function of an expression, see function
+_FUNCTION_OPERATIONS = {
+    'constant': lambda value: lambda x, y: value,
+    'negate': lambda operand: lambda x, y: -operand(x, y),
+    '+': lambda lhs, rhs: lambda x, y: lhs(x, y) + rhs(x, y),
+    '-': lambda lhs, rhs: lambda x, y: lhs(x, y) - rhs(x, y),
+    '*': lambda lhs, rhs: lambda x, y: lhs(x, y) * rhs(x, y)
+}
+
+
 def get_expr_grammar():
     """
     Defines the grammar used by the expression parser.
@@ -39,7 +62,9 @@ def get_expr_grammar():
     return grammar
 
 
-def _generate_logic(parse_tree, scope):
+def _generate_logic(parse_tree, scope, operations=None):
+    if operations is None:
+        operations = _logic_operations()
     if isinstance(parse_tree, ParseResults):
         if 'var' in parse_tree:
             if parse_tree['var'] in scope:
@@ -52,32 +77,28 @@ def _generate_logic(parse_tree, scope):
                 raise ExprParserException('Unknown var identifier found: %s' % parse_tree['var'])
         elif 'sign' in parse_tree and len(parse_tree) == 2:
             if parse_tree['sign'] == '+':
-                return _generate_logic(parse_tree[1], scope)
+                return _generate_logic(parse_tree[1], scope, operations)
             elif parse_tree['sign'] == '-':
-                return negate(_generate_logic(parse_tree[1], scope))
+                return operations['negate'](_generate_logic(parse_tree[1], scope, operations))
             else:
                 raise ExprParserException('Unhandled sign operator found: %s' % parse_tree['sign'])
         elif 'op' in parse_tree and len(parse_tree) >= 3:
-            if parse_tree['op'] == '+':
-                mod = add
-            elif parse_tree['op'] == '-':
-                mod = sub
-            elif parse_tree['op'] == '*':
-                mod = mul
+            if parse_tree['op'] in ['+', '-', '*']:
+                mod = operations[parse_tree['op']]
             else:
                 raise ExprParserException('Unhandled operator found: %s' % parse_tree['op'])
-            lhs = _generate_logic(parse_tree.pop(0), scope)
+            lhs = _generate_logic(parse_tree.pop(0), scope, operations)
             if parse_tree[0] == parse_tree['op']:
                 parse_tree.pop(0)
             else:
                 raise ExprParserException('Expected operator: %s found: %s' % (parse_tree['op'], parse_tree[0]))
             if len(parse_tree) > 1:
-                rhs = _generate_logic(parse_tree, scope)
+                rhs = _generate_logic(parse_tree, scope, operations)
             else:
-                rhs = _generate_logic(parse_tree[0], scope)
+                rhs = _generate_logic(parse_tree[0], scope, operations)
             return mod(lhs, rhs)
     elif isinstance(parse_tree, float):
-        return PipeConstant.from_float(parse_tree)
+        return operations['constant'](parse_tree)
     raise ExprParserException('Unknown Parse Error')
 
 
@@ -93,3 +114,21 @@ def expr(expression: str, scope: typing.Dict):
     res = get_expr_grammar().parseString(expression, parseAll=True)
 
     return _generate_logic(res[0], scope)
+
+
+def function(expression: str, system_size: int) -> typing.Callable:
+    """
+    Compiles the given expression to a python function f(x, y), evaluated in the same order as the generated logic.
+    Works on scalars as well as on numpy arrays, y must support indexing by component, e.g. an array of shape
+    (system_size, number of datasets).
+
+    :param expression: string of expression
+    :param system_size: number of components of y
+    :return: python function of x and y
+    """
+    res = get_expr_grammar().parseString(expression, parseAll=True)
+    scope = {
+        'x': lambda x, y: x,
+        'y': [lambda x, y, i=i: y[i] for i in range(system_size)]
+    }
+    return _generate_logic(res[0], scope, _FUNCTION_OPERATIONS)
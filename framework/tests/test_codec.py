@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+from framework import data_desc
+from framework.codec import CHUNK_SIZE, Codec, get_codec
+from framework.packed_struct import field_len
+from utils import num
+
+
+def _struct_fields(desc):
+    """
+    Flattens the fields of a StructDescription like the codec layout, list fields are expanded to their elements.
+    :return: list of (field name, list index or None, number of bits, bit offset from the lsb of the record)
+    """
+    fields = []
+    high_index = len(desc)
+    for field_name, field_desc in desc.get_fields().items():
+        elements = list(enumerate(field_desc)) if isinstance(field_desc, list) else [(None, field_desc)]
+        for index, el in elements:
+            high_index -= field_len(el)
+            if field_name != '_bit_padding':
+                fields.append((field_name, index, field_len(el), high_index))
+    assert high_index == 0
+    return fields
+
+
+class CodecTestCase(TestCase):
+    number_types = [
+        num.SignedFixedNumberType(37, 16),
+        num.SignedFixedNumberType(20, 11),
+        num.FloatingNumberType(num.FloatingPrecision.SINGLE),
+        num.FloatingNumberType(num.FloatingPrecision.DOUBLE)
+    ]
+
+    def test_layout(self):
+        """Check if the record layout matches the struct descriptions of the hardware."""
+        for number_type in self.number_types:
+            for system_size in [1, 2, 5]:
+                with self.subTest(number_type=number_type, system_size=system_size):
+                    codec = Codec(system_size, number_type)
+                    for desc, fields, record_size in [
+                        (data_desc.get_input_desc(system_size, number_type), codec._input_fields,
+                         codec.input_record_size),
+                        (data_desc.get_output_desc(system_size, number_type), codec._output_fields,
+                         codec.output_record_size)
+                    ]:
+                        self.assertEqual(len(desc) // 8, record_size)
+                        self.assertEqual(_struct_fields(desc), [
+                            (field_name, index, nbr_bits, bit_offset)
+                            for field_name, index, _, nbr_bits, bit_offset in fields
+                        ])
+
+    def test_get_codec(self):
+        """Check if codecs are shared between equal number types and their chunk geometry."""
+        codec = get_codec(2, num.SignedFixedNumberType(37, 16))
+        self.assertIs(codec, get_codec(2, num.SignedFixedNumberType(37, 16)))
+        self.assertIsNot(codec, get_codec(2, num.SignedFixedNumberType(20, 11)))
+        self.assertIsNot(codec, get_codec(3, num.SignedFixedNumberType(37, 16)))
+
+        # 2 * 32 + 4 * 54 bits result in 35 bytes per input record and 7 records per chunk
+        self.assertEqual(codec.input_record_size, 35)
+        self.assertEqual(codec.inputs_per_chunk, 7)
+        self.assertEqual(codec.input_capacity(2 * CHUNK_SIZE), 14)
+        self.assertEqual(codec.input_capacity(2 * CHUNK_SIZE + 3 * 35), 17)
+        self.assertEqual(codec.input_capacity(2 * CHUNK_SIZE + 8 * 35), 21)
+        self.assertEqual(codec.input_chunks(15), 3)
+        self.assertEqual(codec.output_chunks(0), 0)
+
+    def test_without_myhdl(self):
+        """Check if the codec can be used without importing myhdl."""
+        subprocess.run([
+            sys.executable, '-c',
+            'import sys\n'
+            'from framework.codec import Codec\n'
+            'from utils import num\n'
+            'Codec(2, num.SignedFixedNumberType(37, 16)).pack_input_batch([1], 0, [1, 2], 0.1, 10)\n'
+            'assert "myhdl" not in sys.modules'
+        ], check=True, cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -0,0 +1,119 @@
+from unittest import TestCase
+
+import numpy as np
+
+from framework import data_desc
+from utils import num
+
+
+class DataDescTestCase(TestCase):
+    number_types = [
+        num.SignedFixedNumberType(37, 16),
+        num.FloatingNumberType(num.FloatingPrecision.SINGLE),
+        num.FloatingNumberType(num.FloatingPrecision.DOUBLE)
+    ]
+
+    def setUp(self):
+        self._default_type = num.get_default_type()
+
+    def tearDown(self):
+        num.set_default_type(self._default_type)
+
+    @staticmethod
+    def _pack_sequential(system_size, ids, x_start, y_start, h, n):
+        """Fills a buffer record by record, the same way Solver.add_input does."""
+        record_size = len(data_desc.get_input_desc(system_size)) // 8
+        buffer = bytearray(data_desc.CHUNK_SIZE * (len(ids) // (data_desc.CHUNK_SIZE // record_size) + 1))
+        chunk = 0
+        offset = 0
+        for i in range(len(ids)):
+            packed_data = data_desc.pack_input_data(system_size, {
+                'id': int(ids[i]),
+                'x_start': num.get_default_type().create_constant(x_start[i]),
+                'y_start': list(map(num.get_default_type().create_constant, reversed(y_start[i]))),
+                'h': num.get_default_type().create_constant(h[i]),
+                'n': int(n[i])
+            })
+            buffer[chunk + offset:chunk + offset + len(packed_data)] = packed_data
+            offset += len(packed_data)
+            if data_desc.CHUNK_SIZE - offset < len(packed_data):
+                chunk += data_desc.CHUNK_SIZE
+                offset = 0
+        used_size = chunk + (data_desc.CHUNK_SIZE if offset > 0 else 0)
+        return bytes(buffer[:used_size])
+
+    def test_pack_input_batch(self):
+        """Check if the batch packer creates the same buffer image as packing record by record."""
+        rng = np.random.default_rng(42)
+        for number_type in self.number_types:
+            num.set_default_type(number_type)
+            for system_size in [1, 2, 5]:
+                nbr_records = 23
+                ids = np.arange(1, nbr_records + 1)
+                x_start = rng.uniform(-10, 10, nbr_records)
+                y_start = rng.uniform(-100, 100, (nbr_records, system_size))
+                h = rng.uniform(-1, 1, nbr_records)
+                n = rng.integers(0, 2 ** 32, nbr_records)
+                with self.subTest(number_type=number_type, system_size=system_size):
+                    image = data_desc.pack_input_batch(system_size, ids, x_start, y_start, h, n)
+                    self.assertEqual(image.size % data_desc.CHUNK_SIZE, 0)
+                    self.assertEqual(
+                        self._pack_sequential(system_size, ids, x_start, y_start, h, n),
+                        image.tobytes()
+                    )
+
+    def test_pack_input_batch_broadcast(self):
+        """Check if scalar inputs are broadcasted over the batch."""
+        image = data_desc.pack_input_batch(2, [1, 2, 3], 0, [2, 1], 0.17, 60)
+        expected = self._pack_sequential(2, [1, 2, 3], [0] * 3, [[2, 1]] * 3, [0.17] * 3, [60] * 3)
+        self.assertEqual(expected, image.tobytes())
+
+    def test_unpack_output_batch(self):
+        """Check if the batch unpacker decodes records packed by the hardware description."""
+        rng = np.random.default_rng(7)
+        for number_type in self.number_types:
+            num.set_default_type(number_type)
+            for system_size in [1, 2, 5]:
+                output_desc = data_desc.get_output_desc(system_size)
+                record_size = len(output_desc) // 8
+                records_per_chunk = data_desc.CHUNK_SIZE // record_size
+
+                nbr_records = 2 * records_per_chunk + 1
+                ids = np.arange(1, nbr_records + 1)
+                x = rng.uniform(-10, 10, nbr_records)
+                y = rng.uniform(-100, 100, (nbr_records, system_size))
+
+                image = bytearray(3 * data_desc.CHUNK_SIZE)
+                for i in range(nbr_records):
+                    packed = output_desc.create_constant({'id': int(ids[i]), 'x': x[i], 'y': list(y[i])})
+                    offset = (i // records_per_chunk) * data_desc.CHUNK_SIZE + (i % records_per_chunk) * record_size
+                    image[offset:offset + record_size] = packed.to_bytes(record_size, 'little')
+
+                with self.subTest(number_type=number_type, system_size=system_size):
+                    unpacked = data_desc.unpack_output_batch(system_size, bytes(image))
+                    self.assertEqual(3 * records_per_chunk, len(unpacked['id']))
+                    self.assertTrue(np.all(unpacked['id'][:nbr_records] == ids))
+                    self.assertTrue(np.all(unpacked['id'][nbr_records:] == 0))
+                    to_const = np.vectorize(number_type.create_constant, otypes=[object])
+                    to_value = np.vectorize(number_type.value_of, otypes=[np.float64])
+                    self.assertTrue(np.array_equal(to_value(to_const(x)), unpacked['x'][:nbr_records]))
+                    self.assertTrue(np.array_equal(to_value(to_const(y)), unpacked['y'][:nbr_records]))
+
+    def test_explicit_number_type(self):
+        """Check if an explicitly given number type is used instead of the default type."""
+        rng = np.random.default_rng(3)
+        x = rng.uniform(-10, 10, 5)
+        y = rng.uniform(-100, 100, (5, 2))
+        output_image = rng.integers(0, 256, 2 * data_desc.CHUNK_SIZE, dtype=np.uint8)
+        for number_type in self.number_types:
+            num.set_default_type(number_type)
+            expected_input = data_desc.pack_input_batch(2, np.arange(1, 6), x, y, 0.1, 10)
+            expected_output = data_desc.unpack_output_batch(2, output_image)
+            for default_type in self.number_types:
+                num.set_default_type(default_type)
+                with self.subTest(number_type=number_type, default_type=default_type):
+                    image = data_desc.pack_input_batch(2, np.arange(1, 6), x, y, 0.1, 10, number_type=number_type)
+                    self.assertEqual(expected_input.tobytes(), image.tobytes())
+                    output = data_desc.unpack_output_batch(2, output_image, number_type)
+                    self.assertTrue(np.array_equal(expected_output['x'], output['x'], equal_nan=True))
+                    self.assertTrue(np.array_equal(expected_output['y'], output['y'], equal_nan=True))
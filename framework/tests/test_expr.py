@@ -1,4 +1,6 @@
-from framework.expr_parser import expr
+import numpy as np
+
+from framework.expr_parser import expr, function
 from framework.tests.helper import PipeTestCase
 from utils import num
 
@@ -44,3 +46,15 @@ class TestExpr(PipeTestCase):
                 return res
 
             self.run_pipe(inner_pipe, list(range(40)), [res_lambda(i) for i in range(40)])
+
+    def test_function(self):
+        """Checking whole testset evaluated as python function on numpy arrays."""
+        x = np.arange(40, dtype=np.float64)
+        for desc, expr_str, res_lambda in self.testset:
+            with self.subTest(desc):
+                self.assertTrue(np.allclose(res_lambda(x), function(expr_str, 0)(x, [])))
+
+    def test_function_components(self):
+        """Checking access to the components of y."""
+        y = np.array([[1.0, 2.0], [3.0, 4.0]])
+        self.assertEqual([13.0, 18.0], function('y[0] * 2 + y[1] * 3 + x', 2)(2.0, y).tolist())
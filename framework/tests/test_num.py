@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+import numpy as np
+
+from utils import num
+
+
+class NumTestCase(TestCase):
+    number_types = [
+        num.SignedFixedNumberType(37, 16),
+        num.SignedFixedNumberType(20, 11),
+        num.FloatingNumberType(num.FloatingPrecision.SINGLE),
+        num.FloatingNumberType(num.FloatingPrecision.DOUBLE)
+    ]
+
+    def test_vectorized_conversion(self):
+        """Check if create_constants and values_of are identical to the scalar conversions."""
+        rng = np.random.default_rng(0)
+        values = np.concatenate([
+            rng.uniform(-1000, 1000, 1000),
+            rng.uniform(-1, 1, 1000) * 2.0 ** -30,
+            [0.0, -0.0, 1.5, -2.5, 2.0 ** -38, 3 * 2.0 ** -38, -3 * 2.0 ** -38, 1 / 3]
+        ])
+        for number_type in self.number_types:
+            with self.subTest(number_type=number_type):
+                constants = number_type.create_constants(values)
+                self.assertEqual([number_type.create_constant(value) for value in values.tolist()], constants.tolist())
+                self.assertEqual([number_type.value_of(constant) for constant in constants.tolist()],
+                                 number_type.values_of(constants).tolist())
+
+    def test_vectorized_range(self):
+        """Check if values exceeding the range of a type are rejected like by the scalar conversions."""
+        fixed_type = num.SignedFixedNumberType(37, 16)
+        max_value = 2.0 ** 16
+        limits = [-max_value, max_value - 2.0 ** -37]
+        self.assertEqual([fixed_type.create_from_constant(fixed_type.create_constant(value)) for value in limits],
+                         fixed_type.create_constants(limits).tolist())
+        for value in [max_value, -max_value - 1, 1e30, float('inf'), float('nan')]:
+            with self.subTest(number_type=fixed_type, value=value):
+                with self.assertRaises(ValueError):
+                    fixed_type.create_constants([0.0, value])
+                if np.isfinite(value):
+                    with self.assertRaises(ValueError):
+                        fixed_type.create_from_constant(fixed_type.create_constant(value))
+
+        single_type = num.FloatingNumberType(num.FloatingPrecision.SINGLE)
+        for value in [1e39, -1e39]:
+            with self.subTest(number_type=single_type, value=value):
+                with self.assertRaises(OverflowError):
+                    single_type.create_constants([0.0, value])
+                with self.assertRaises(OverflowError):
+                    single_type.create_constant(value)
+        special = [float('inf'), -float('inf'), 1e-50]
+        self.assertEqual([single_type.create_constant(value) for value in special],
+                         single_type.create_constants(special).tolist())
+
+        integer_type = num.UnsignedIntegerNumberType(32)
+        self.assertEqual([0, 2 ** 32 - 1], integer_type.create_constants([0, 2 ** 32 - 1]).tolist())
+        for value in [-1, 2 ** 32]:
+            with self.subTest(number_type=integer_type, value=value):
+                with self.assertRaises(ValueError):
+                    integer_type.create_constants([value])
+                with self.assertRaises(ValueError):
+                    integer_type.create_from_constant(integer_type.create_constant(value))
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List
 
 
 @dataclass
@@ -12,6 +12,8 @@ class Config:
     nbr_solver: int = 1
     uuid: bytes = b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
     system_size: int = field(init=False)
+    # Stats of the solver pipeline, set when the solver is generated
+    pipe_stats: Dict = field(init=False, default=None)
 
     def __post_init__(self):
         self.stages = len(self.A)
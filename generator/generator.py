@@ -247,6 +247,8 @@ def convert(config):
         BitVector(len(CcipRx)).create_instance(),
         BitVector(len(CcipTx)).create_instance()
     )
+    # The runtime models the solver pipeline with its stats, see runtime.ordering
+    deep_update(config, {'build_info': {'pipe_stats': cfg.pipe_stats}})
     dir_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'out')
     if not os.path.exists(dir_path):
         os.makedirs(dir_path)
@@ -95,7 +95,8 @@ def solver(
                                x=pipe_data_in.x + pipe_data_in.h,
                                y=y_n)
     pipe = Pipe(pipe_data_in, pipe_data_out)
-    print(pipe.get_stats())
+    config.pipe_stats = pipe.get_stats()
+    print(config.pipe_stats)
     pipe_inst = pipe.create(clk, rst)
 
     @always(clk.posedge)
@@ -17,6 +17,8 @@ The most commonly used commands are:
    build       Generate a solver for a given configuration
    run         Solve a single initial value problem in a given solver
    benchmark   Bechmark a given solver
+   jobs        Solve a list of jobs for different solvers with as few reconfigurations as possible
+   serve       Keep a given solver loaded and solve the problems of clients connecting to a unix socket
 ''')
         parser.add_argument('command', help='Subcommand to run')
         args = parser.parse_args(sys.argv[1:2])
@@ -43,33 +45,195 @@ The most commonly used commands are:
 
         parser.add_argument('solver', help='solver file to execute')
         parser.add_argument('--runtime_config', help='overwrites the default config, must be an json string')
-        parser.add_argument('--amount', type=int, help='number of initial value problems to solve', default=1)
+        parser.add_argument('--amount', type=int, default=1,
+                            help='number of copies of the configured initial value problem to solve, '
+                                 'ignored if --input or --grid is given')
+        inputs = parser.add_mutually_exclusive_group()
+        inputs.add_argument('--input', help='.npz or .csv file with the inputs x, y, h and n of each problem, '
+                                            'missing inputs are taken from the configuration')
+        inputs.add_argument('--grid', help='parameter grid to solve, must be an json string mapping x, h, n or y[i] '
+                                           'to a list of values or to {"linspace": [start, stop, num]}')
+        parser.add_argument('--mode', choices=['single', 'chunked', 'pipelined'], default='chunked',
+                            help='single: solve only as many problems as fit into one buffer, '
+                                 'chunked: split the problems into buffer sized batches (default), '
+                                 'pipelined: like chunked, overlapping host and fpga work with two buffers')
+        parser.add_argument('--wait', choices=['spin', 'backoff', 'deadline'], default='spin',
+                            help='policy used to wait for the fpga: spin (default), backoff or deadline')
+        parser.add_argument('--timeout', type=float, help='maximum duration of a calculation in seconds')
+        parser.add_argument('--force-reload', action='store_true',
+                            help='reconfigure the fpga even if the solver is already loaded')
+        parser.add_argument('--trace', help='file the timing of the runtime steps is written to as chrome trace')
+        parser.add_argument('--devices', type=int, default=1,
+                            help='number of fpga cards to split the problems across, 0 to use all cards (default: 1), '
+                                 'only supported in chunked mode')
+        parser.add_argument('--backend', choices=['fpga', 'cpu', 'hybrid'], default='fpga',
+                            help='where the problems are solved: fpga (default), cpu (numpy fallback if no fpga is '
+                                 'available) or hybrid (split between fpga and cpu by throughput), cpu and hybrid are '
+                                 'only supported in chunked mode')
+        parser.add_argument('--cpu-threads', type=int,
+                            help='number of threads used by the cpu and hybrid backends (default: number of cpus)')
+        parser.add_argument('--order', choices=['input', 'lpt'], default='input',
+                            help='order the problems are fed to the fpga in: input (default) or lpt (most steps '
+                                 'first, balances the load of the solver instances), lpt is not supported in single '
+                                 'mode')
+        parser.add_argument('--report-tail', action='store_true',
+                            help='print the predicted number of cycles solver instances are idle at the end of a '
+                                 'calculation, in the order used and in lpt order, only supported on a single fpga')
+        parser.add_argument('--cache',
+                            help='database file results are cached in, problems solved before are not sent to the '
+                                 'fpga again and problems solved with less steps are resumed, not supported in single '
+                                 'mode')
+        parser.add_argument('--cache-size', type=int, default=1024,
+                            help='maximum size of the cached results in MiB (default: 1024)')
+        parser.add_argument('--output', help='file the results are streamed to, instead of printing them')
+        parser.add_argument('--format', choices=['npy', 'raw', 'json'], default='npy',
+                            help='format of the output file: npy (default), raw (columns with a json sidecar '
+                                 'describing the layout) or json (for debugging only)')
         args = parser.parse_args(sys.argv[2:])
 
         assert args.amount > 0
+        assert args.devices >= 0
         from runtime import runtime
         res = runtime.run(
             args.solver,
             json.loads(args.runtime_config) if args.runtime_config is not None else None,
-            amount_data=args.amount
+            amount_data=args.amount,
+            mode=args.mode,
+            wait_policy=args.wait,
+            timeout=args.timeout,
+            force_reload=args.force_reload,
+            nbr_devices=args.devices,
+            output=args.output,
+            output_format=args.format,
+            input_path=args.input,
+            grid=json.loads(args.grid) if args.grid is not None else None,
+            trace=args.trace,
+            order=args.order,
+            report_tail=args.report_tail,
+            cache=args.cache,
+            cache_size=args.cache_size << 20,
+            backend=args.backend,
+            cpu_threads=args.cpu_threads
         )
-        print('Result:\n%s' % json.dumps(res, sort_keys=True, indent=4))
+        if args.output is None:
+            print('Result:\n%s' % json.dumps(res, sort_keys=True, indent=4))
+        else:
+            print('Results written to %s' % args.output)
 
     def benchmark(self):
         parser = argparse.ArgumentParser(description='Benchmark a given solver')
 
         parser.add_argument('solver', help='solver file to execute')
         parser.add_argument('--runtime_config', help='overwrites the default config, must be an json string')
+        parser.add_argument('--amounts', type=int, nargs='+', default=[1, 10, 100, 1000, 10000],
+                            help='numbers of initial value problems to benchmark (default: 1 10 100 1000 10000)')
+        parser.add_argument('--warmup', type=int, default=1,
+                            help='number of unmeasured runs per amount (default: 1)')
+        parser.add_argument('--repetitions', type=int, default=10,
+                            help='number of measured runs per amount (default: 10)')
+        parser.add_argument('--json', help='file the benchmark report is written to as json')
+        parser.add_argument('--wait', choices=['spin', 'backoff', 'deadline'], default='spin',
+                            help='policy used to wait for the fpga: spin (default), backoff or deadline')
+        parser.add_argument('--timeout', type=float, help='maximum duration of a calculation in seconds')
+        parser.add_argument('--force-reload', action='store_true',
+                            help='reconfigure the fpga even if the solver is already loaded')
+        parser.add_argument('--trace', help='file the timing of the runtime steps is written to as chrome trace')
         args = parser.parse_args(sys.argv[2:])
 
+        assert all(amount > 0 for amount in args.amounts)
+        assert args.warmup >= 0 and args.repetitions > 0
         from runtime import runtime
-        for adata in [1, 10, 100, 1000, 10000]:
-            timing = runtime.benchmark(
-                args.solver,
-                json.loads(args.runtime_config) if args.runtime_config is not None else None,
-                amount_data=adata
-            )
-            print('For %s ivp the solver finished in: %s' % (adata, timing))
+        report = runtime.benchmark(
+            args.solver,
+            json.loads(args.runtime_config) if args.runtime_config is not None else None,
+            amounts=args.amounts,
+            warmup=args.warmup,
+            repetitions=args.repetitions,
+            wait_policy=args.wait,
+            timeout=args.timeout,
+            force_reload=args.force_reload,
+            trace=args.trace
+        )
+        for result in report['results']:
+            timing = result['timing']
+            print('For %d ivp the solver reached %.1f ivp/s and %.1f steps/s, median timing in s: '
+                  'total %.6f (p90 %.6f, p99 %.6f), pack %.6f, compute %.6f, decode %.6f' % (
+                      result['amount'], result['ivps_per_s'], result['steps_per_s'],
+                      timing['total']['p50'], timing['total']['p90'], timing['total']['p99'],
+                      timing['pack']['p50'], timing['compute']['p50'], timing['decode']['p50']))
+        if args.json is not None:
+            with open(args.json, 'w') as fd:
+                json.dump(report, fd, indent=4)
+
+    def jobs(self):
+        parser = argparse.ArgumentParser(
+            description='Solve a list of jobs for different solvers, the jobs are grouped by bitstream to avoid '
+                        'reconfigurations of the fpga'
+        )
+
+        parser.add_argument('jobs', help='json file with a list of jobs, each an object with the solver file '
+                                         '(solver) and optional inputs x, y, h and n')
+        parser.add_argument('--output', help='json file the results of all jobs are written to')
+        parser.add_argument('--max-wait', type=float, default=60.0,
+                            help='maximum time in seconds a job waits for its solver to be loaded (default: 60)')
+        parser.add_argument('--max-group-time', type=float,
+                            help='maximum time in seconds a solver is kept loaded while jobs of others are waiting')
+        parser.add_argument('--wait', choices=['spin', 'backoff', 'deadline'], default='spin',
+                            help='policy used to wait for the fpga: spin (default), backoff or deadline')
+        parser.add_argument('--timeout', type=float, help='maximum duration of a calculation in seconds')
+        args = parser.parse_args(sys.argv[2:])
+
+        from runtime import runtime
+        from runtime.scheduler import JobScheduler
+        with open(args.jobs) as fd:
+            job_specs = json.load(fd)
+        scheduler = JobScheduler(max_wait=args.max_wait, max_group_time=args.max_group_time)
+        jobs = [
+            scheduler.submit(spec['solver'], spec.get('x'), spec.get('y'), spec.get('h'), spec.get('n'))
+            for spec in job_specs
+        ]
+        report = runtime.run_jobs(scheduler, wait_policy=args.wait, timeout=args.timeout)
+        print('Report:\n%s' % json.dumps(report, sort_keys=True, indent=4))
+
+        if args.output is not None:
+            with open(args.output, 'w') as fd:
+                json.dump([
+                    {'solver': job.slv_path, 'error': str(job.error)} if job.error is not None else {
+                        'solver': job.slv_path,
+                        'id': job.result['id'].tolist(),
+                        'x': job.result['x'].tolist(),
+                        'y': job.result['y'].tolist()
+                    }
+                    for job in jobs
+                ], fd, indent=4)
+
+    def serve(self):
+        parser = argparse.ArgumentParser(description='Serve a given solver on a unix socket')
+
+        parser.add_argument('solver', help='solver file to execute')
+        parser.add_argument('--runtime_config', help='overwrites the default config, must be an json string')
+        parser.add_argument('--socket', default='rtlode.sock', help='path of the unix socket (default: rtlode.sock)')
+        parser.add_argument('--max-latency', type=float, default=0.001,
+                            help='time in seconds to wait for further requests before starting a calculation '
+                                 '(default: 0.001)')
+        parser.add_argument('--wait', choices=['spin', 'backoff', 'deadline'], default='spin',
+                            help='policy used to wait for the fpga: spin (default), backoff or deadline')
+        parser.add_argument('--timeout', type=float, help='maximum duration of a calculation in seconds')
+        parser.add_argument('--force-reload', action='store_true',
+                            help='reconfigure the fpga even if the solver is already loaded')
+        args = parser.parse_args(sys.argv[2:])
+
+        assert args.max_latency >= 0
+        from runtime import runtime
+        runtime.serve(
+            args.solver,
+            args.socket,
+            json.loads(args.runtime_config) if args.runtime_config is not None else None,
+            max_latency=args.max_latency,
+            wait_policy=args.wait,
+            timeout=args.timeout,
+            force_reload=args.force_reload
+        )
 
 
 if __name__ == '__main__':
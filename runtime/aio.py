@@ -0,0 +1,172 @@
+import asyncio
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from runtime.interface import Solver, broadcast_inputs
+
+
+class AsyncSolver:
+    def __init__(self, solver: Solver, max_latency=0.001):
+        """
+        asyncio front end of an opened Solver.
+        Submitted datasets are coalesced into hardware batches by a background task, a batch is started as soon as the
+        input buffer is full or max_latency passed since the first pending submission. The solver is only accessed from
+        a single worker thread, so the event loop is not blocked while the fpga is working.
+        Use as async context manager:
+
+            with Solver(config, buffer_size) as solver:
+                async with AsyncSolver(solver) as async_solver:
+                    result = await async_solver.solve(x, y, h, n)
+
+        :param solver: opened solver, must not be used otherwise while the AsyncSolver is running
+        :param max_latency: time in seconds to wait for further submissions before starting a batch
+        """
+        self._solver = solver
+        self._system_size = solver.system_size
+        self._max_latency = max_latency
+        self._executor = None
+        self._task = None
+        self._closing = False
+
+        # Pending submissions as (ids, x_start, y_start, h, n, futures), ids are consecutive over all submissions
+        # until they wrap around, see Solver.reserve_ids
+        self._pending = collections.deque()
+        self._nbr_pending = 0
+        self._pending_event = None
+        self._batch_full_event = None
+
+    async def __aenter__(self):
+        self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def open(self):
+        """
+        Starts the background task, must be called from within the event loop.
+        """
+        self._closing = False
+        self._pending_event = asyncio.Event()
+        self._batch_full_event = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._task = asyncio.get_running_loop().create_task(self._serve())
+
+    async def close(self):
+        """
+        Waits until all pending submissions are solved and stops the background task.
+        """
+        self._closing = True
+        self._pending_event.set()
+        self._batch_full_event.set()
+        try:
+            await self._task
+        finally:
+            self._executor.shutdown()
+
+    def submit(self, x_start, y_start, h, n) -> Dict[int, asyncio.Future]:
+        """
+        Submits input datasets, inputs are broadcasted like in Solver.add_inputs.
+        :return: futures keyed by the package id of each dataset, resolving to a dict with id, x and y
+        """
+        if self._task is None or self._closing:
+            raise Exception('AsyncSolver is not running.')
+        x_start, y_start, h, n = broadcast_inputs(self._system_size, x_start, y_start, h, n)
+        ids = self._solver.reserve_ids(len(x_start))
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in ids]
+        if len(ids) > 0:
+            self._pending.append((ids, x_start, y_start, h, n, futures))
+            self._nbr_pending += len(ids)
+            self._pending_event.set()
+            if self._nbr_pending >= self._solver.input_capacity:
+                self._batch_full_event.set()
+        return dict(zip(ids, futures))
+
+    async def solve(self, x_start: float, y_start: List[float], h: float, n: int) -> Dict:
+        """
+        Solves a single input dataset.
+        :return: dict with id, x and y
+        """
+        future, = self.submit(x_start, y_start, h, n).values()
+        return await future
+
+    def _take_batch(self):
+        """
+        Removes as many pending datasets as fit into the input buffer from the queue.
+        The ids of a batch are consecutive, a batch ends where the ids wrapped around.
+        """
+        capacity = self._solver.input_capacity
+        parts = []
+        while self._pending and capacity > 0:
+            ids, x_start, y_start, h, n, futures = self._pending[0]
+            if parts and ids.start != parts[-1][0].stop:
+                break
+            nbr_taken = min(len(ids), capacity)
+            parts.append((ids[:nbr_taken], x_start[:nbr_taken], y_start[:nbr_taken], h[:nbr_taken], n[:nbr_taken],
+                          futures[:nbr_taken]))
+            if nbr_taken < len(ids):
+                self._pending[0] = (ids[nbr_taken:], x_start[nbr_taken:], y_start[nbr_taken:], h[nbr_taken:],
+                                    n[nbr_taken:], futures[nbr_taken:])
+            else:
+                self._pending.popleft()
+            capacity -= nbr_taken
+            self._nbr_pending -= nbr_taken
+        return parts
+
+    def _run_batch(self, ids, x_start, y_start, h, n):
+        """
+        Solves one hardware batch, runs in the worker thread.
+        """
+        self._solver.select_buffer(0)
+        added = self._solver.add_inputs(x_start, y_start, h, n, ids=ids)
+        assert len(added) == len(ids)
+        self._solver.start()
+        try:
+            self._solver.wait()
+        finally:
+            self._solver.stop()
+        return self._solver.fetch_results(ids)
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            while not self._pending:
+                if self._closing:
+                    return
+                self._pending_event.clear()
+                await self._pending_event.wait()
+
+            # Coalesce submissions arriving within the latency window
+            if self._nbr_pending < self._solver.input_capacity and not self._closing:
+                self._batch_full_event.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full_event.wait(), self._max_latency)
+                except asyncio.TimeoutError:
+                    pass
+
+            parts = self._take_batch()
+            futures = [future for part in parts for future in part[5]]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor,
+                    self._run_batch,
+                    range(parts[0][0].start, parts[-1][0].stop),
+                    np.concatenate([part[1] for part in parts]),
+                    np.concatenate([part[2] for part in parts]),
+                    np.concatenate([part[3] for part in parts]),
+                    np.concatenate([part[4] for part in parts])
+                )
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for future, package_id, x, y in zip(
+                    futures, results['id'].tolist(), results['x'].tolist(), results['y'].tolist()):
+                if not future.done():
+                    future.set_result({'id': package_id, 'x': x, 'y': y})
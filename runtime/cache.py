@@ -0,0 +1,180 @@
+import sqlite3
+import time
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+
+from framework.codec import get_codec
+from runtime.interface import broadcast_inputs
+from runtime.ordering import step_counts
+from utils import num
+
+# Maximum number of keys looked up with a single query, stays below the sqlite limit of query parameters
+LOOKUP_CHUNK_SIZE = 500
+
+
+class ResultCache:
+    def __init__(self, path: str, max_size=1 << 30):
+        """
+        Persistent cache of solver results, stored in a sqlite database.
+        Results are keyed by the uuid of the solver, the packed inputs x, y and h and the number of steps. If a
+        dataset was solved with fewer steps before, the calculation is resumed from the cached final state.
+        The least recently used results are evicted if the cached data exceeds max_size.
+        :param path: path of the database file
+        :param max_size: maximum size of the cached data in bytes
+        """
+        self.max_size = max_size
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'uuid TEXT, key BLOB, steps INTEGER, x REAL, y BLOB, size INTEGER, last_used INTEGER, '
+            'PRIMARY KEY (uuid, key, steps))'
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+        self._connection.commit()
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        self.nbr_hits = 0
+        self.nbr_resumed = 0
+        self.nbr_misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the cached data in bytes, as of the last store or opening of the cache.
+        """
+        return self._size
+
+    @staticmethod
+    def keys(system_size: int, number_type: num.NumberType, x_start, y_start, h) -> List[bytes]:
+        """
+        Keys of the datasets, their input records packed with id and n set to zero.
+        """
+        records = get_codec(system_size, number_type).pack_input_records(
+            np.zeros(len(x_start), dtype=np.int64), x_start, y_start, h, 0)
+        return [record.tobytes() for record in records]
+
+    def lookup(self, uuid: str, keys: List[bytes], steps: np.ndarray, system_size: int):
+        """
+        Looks up the results with the most steps not exceeding the given number of steps.
+        The keys are queried in chunks of LOOKUP_CHUNK_SIZE.
+        :return: cached steps (0 if nothing is cached), x and y (of shape (len(keys), system_size))
+        """
+        cached_steps = np.zeros(len(keys), dtype=np.int64)
+        cached_x = np.zeros(len(keys))
+        cached_y = np.zeros((len(keys), system_size))
+        # Positions of each key in the inputs, the same dataset may occur several times
+        positions = {}
+        for i, key in enumerate(keys):
+            positions.setdefault(key, []).append(i)
+        unique_keys = list(positions)
+        max_steps = steps.tolist()
+        rowids = {}
+        for offset in range(0, len(unique_keys), LOOKUP_CHUNK_SIZE):
+            chunk = unique_keys[offset:offset + LOOKUP_CHUNK_SIZE]
+            rows = self._connection.execute(
+                'SELECT rowid, key, steps, x, y FROM results WHERE uuid = ? AND key IN (%s)'
+                % ', '.join('?' * len(chunk)),
+                [uuid] + chunk
+            )
+            for rowid, key, row_steps, x, y in rows:
+                for i in positions[key]:
+                    if cached_steps[i] < row_steps <= max_steps[i]:
+                        rowids[i] = rowid
+                        cached_steps[i] = row_steps
+                        cached_x[i] = x
+                        cached_y[i] = np.frombuffer(y, dtype=np.float64)
+        used = set(rowids.values())
+        if len(used) > 0:
+            now = time.time_ns()
+            self._connection.executemany('UPDATE results SET last_used = ? WHERE rowid = ?',
+                                         [(now, rowid) for rowid in used])
+            self._connection.commit()
+        return cached_steps, cached_x, cached_y
+
+    def store(self, uuid: str, keys: List[bytes], steps: np.ndarray, x: np.ndarray, y: np.ndarray):
+        """
+        Stores results and evicts the least recently used ones if the cache exceeds its maximum size.
+        """
+        now = time.time_ns()
+        rows = []
+        for key, dataset_steps, dataset_x, dataset_y in zip(keys, steps.tolist(), x.tolist(), y):
+            packed_y = np.ascontiguousarray(dataset_y, dtype=np.float64).tobytes()
+            rows.append((uuid, key, dataset_steps, dataset_x, packed_y, len(uuid) + len(key) + len(packed_y) + 16, now))
+        with self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self._evict()
+
+    def _evict(self):
+        """
+        Evicts the least recently used results while the cache exceeds its maximum size, runs in the transaction of
+        store. The size is summed up within the transaction, so results stored by other processes are included.
+        """
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        while self._size > self.max_size:
+            rows = self._connection.execute('SELECT rowid, size FROM results ORDER BY last_used LIMIT 1024').fetchall()
+            if len(rows) == 0:
+                break
+            evicted = []
+            for rowid, size in rows:
+                if self._size <= self.max_size:
+                    break
+                evicted.append((rowid,))
+                self._size -= size
+            self._connection.executemany('DELETE FROM results WHERE rowid = ?', evicted)
+
+    def solve_batches(self, solve_batches: Callable[..., Iterator[Dict]], reserve_ids: Callable[[int], range],
+                      uuid: str, system_size: int, number_type: num.NumberType, x_start, y_start, h, n,
+                      **kwargs) -> Iterator[Dict]:
+        """
+        Solves input datasets using cached results where possible.
+        Cached results are yielded first, the remaining datasets are solved by solve_batches and stored.
+        Datasets cached with fewer steps are solved for the remaining steps starting from the cached x and y.
+        :param solve_batches: solve_batches method of the solver to use
+        :param reserve_ids: reserve_ids method of the same solver, the ids of the cached results are reserved with it
+                            so they are unique among the ids of the solved datasets
+        :param uuid: uuid of the solver
+        :param number_type: number type of the solver
+        :param kwargs: additional arguments of solve_batches
+        :return: generator of dictionaries with arrays of index (position of the dataset in the inputs), id, x and y
+        """
+        x_start, y_start, h, n = broadcast_inputs(system_size, x_start, y_start, h, n)
+        steps = step_counts(n)
+        keys = self.keys(system_size, number_type, x_start, y_start, h)
+        cached_steps, cached_x, cached_y = self.lookup(uuid, keys, steps, system_size)
+
+        hit = cached_steps == steps
+        resumed = (cached_steps > 0) & ~hit
+        self.nbr_hits += int(hit.sum())
+        self.nbr_resumed += int(resumed.sum())
+        self.nbr_misses += int((cached_steps == 0).sum())
+        if hit.any():
+            ids = reserve_ids(int(hit.sum()))
+            yield {
+                'index': np.flatnonzero(hit),
+                'id': np.arange(ids.start, ids.stop, dtype=np.int64),
+                'x': cached_x[hit],
+                'y': cached_y[hit]
+            }
+
+        todo = np.flatnonzero(~hit)
+        if len(todo) == 0:
+            return
+        for batch in solve_batches(
+                np.where(resumed, cached_x, x_start)[todo],
+                np.where(resumed[:, np.newaxis], cached_y, y_start)[todo],
+                h[todo],
+                np.where(resumed, steps - cached_steps, n)[todo],
+                **kwargs):
+            index = todo[batch['index']]
+            self.store(uuid, [keys[i] for i in index], steps[index], batch['x'], batch['y'])
+            batch['index'] = index
+            yield batch
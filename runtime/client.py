@@ -0,0 +1,23 @@
+import json
+import socket
+from typing import Dict
+
+import numpy as np
+
+
+def request(socket_path: str, **inputs) -> Dict:
+    """
+    Solves ivps using a running SolverServer, does not require opae.
+    :param socket_path: path of the unix socket of the server
+    :param inputs: any of the solver inputs x, y, h and n as scalars or lists
+    :return: dictionary with lists of id, x and y
+    """
+    inputs = {key: np.asarray(value).tolist() for key, value in inputs.items()}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(inputs).encode() + b'\n')
+        with connection.makefile('rb') as fd:
+            response = json.loads(fd.readline())
+    if 'error' in response:
+        raise Exception(response['error'])
+    return response
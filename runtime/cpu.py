@@ -0,0 +1,226 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator
+
+import numpy as np
+
+from framework import expr_parser
+from runtime.interface import broadcast_inputs, merge_results
+from runtime.ordering import ORDERS, lpt_order, step_counts
+
+
+class CpuSolver:
+    def __init__(self, config, batch_size=4096, nbr_threads=None):
+        """
+        Solves the ivps of a solver configuration on the cpu, e.g. if no fpga is available or in addition to the fpga,
+        see MultiSolver. The runge kutta method and problem components of the config are evaluated vectorized over
+        all datasets of a batch with numpy in double precision, expressions are evaluated in the same order as on the
+        fpga. Results of fixed point and single precision solvers therefore differ by their rounding errors.
+        Implements the batch interface of Solver (add_inputs, start, wait, stop and fetch_results).
+        :param config: configuration of solver (just load it from the .slv)
+        :param batch_size: maximum number of datasets of a batch
+        :param nbr_threads: number of threads a batch is split over, defaults to the number of cpus
+        """
+        method = config['method']
+        for stage_index, a in enumerate(method['A']):
+            if any(el != 0 for el in a[stage_index:]):
+                raise Exception('Only explicit runge kutta methods can be solved on the cpu.')
+        self._a = [[float(el) for el in a] for a in method['A']]
+        self._b = [float(el) for el in method['b']]
+        self._c = [float(el) for el in method['c']]
+        self._system_size = len(config['problem']['components'])
+        self._components = [
+            expr_parser.function(component, self._system_size) for component in config['problem']['components']
+        ]
+        self._batch_size = batch_size
+        self._nbr_threads = nbr_threads if nbr_threads is not None else os.cpu_count() or 1
+        self._executor = None
+        self._current_input_id = 0
+        # Inputs of the current batch as lists of ids, x_start, y_start, h and n arrays
+        self._inputs = None
+        self._nbr_inputs = 0
+        self._running = None
+        self._outputs = None
+        self._start_time = None
+        self._last_duration = None
+        self.stop()
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self._nbr_threads)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._executor.shutdown()
+        self._executor = None
+
+    @property
+    def system_size(self) -> int:
+        return self._system_size
+
+    @property
+    def input_capacity(self) -> int:
+        return self._batch_size
+
+    @property
+    def inputs_per_chunk(self) -> int:
+        """
+        The cpu has no chunks, batches of any size are solved efficiently.
+        """
+        return 1
+
+    @property
+    def last_duration(self) -> float:
+        """
+        Duration in seconds from start until wait returned the results of the last batch.
+        """
+        return self._last_duration
+
+    def integrate(self, x_start, y_start, h, n):
+        """
+        Solves the given datasets in the calling thread, each dataset takes max(n, 1) steps like on the fpga.
+        :param y_start: solver inputs, of shape (number of datasets, system_size)
+        :return: x and y (of shape (number of datasets, system_size)) after the last step
+        """
+        steps = step_counts(n)
+        # Sorted by descending step count the datasets still running are always the first ones
+        order = lpt_order(steps)
+        steps = steps[order]
+        x = np.array(x_start, dtype=np.float64)[order]
+        y = np.array(y_start, dtype=np.float64)[order].T.copy()
+        h = np.asarray(h, dtype=np.float64)[order]
+
+        for step in range(int(steps[0]) if len(steps) > 0 else 0):
+            nbr_active = int(np.searchsorted(-steps, -step, side='left'))
+            x_step = x[:nbr_active]
+            y_step = y[:, :nbr_active]
+            h_step = h[:nbr_active]
+
+            v = []
+            for a, c in zip(self._a, self._c):
+                rhs_x = x_step + c * h_step
+                rhs_y = y_step
+                if any(el != 0 for el in a):
+                    rhs_y = y_step + h_step * sum(el * v_j for el, v_j in zip(a, v) if el != 0)
+                v.append(np.array([
+                    np.broadcast_to(component(rhs_x, rhs_y), (nbr_active,)) for component in self._components
+                ]))
+            y[:, :nbr_active] = y_step + h_step * sum(b * v_i for b, v_i in zip(self._b, v) if b != 0)
+            x[:nbr_active] = x_step + h_step
+
+        x_result = np.empty_like(x)
+        y_result = np.empty_like(y.T)
+        x_result[order] = x
+        y_result[order] = y.T
+        return x_result, y_result
+
+    def reserve_ids(self, nbr_ids: int) -> range:
+        """
+        Reserves ids for datasets added later on with add_inputs, see Solver.reserve_ids.
+        """
+        ids = range(self._current_input_id + 1, self._current_input_id + 1 + nbr_ids)
+        self._current_input_id += nbr_ids
+        return ids
+
+    def add_inputs(self, x_start, y_start, h, n, ids: range = None) -> range:
+        """
+        Adds as many of the given input datasets as fit into the current batch, see Solver.add_inputs.
+        """
+        x_start, y_start, h, n = broadcast_inputs(self._system_size, x_start, y_start, h, n)
+        nbr_added = min(len(x_start), self._batch_size - self._nbr_inputs)
+        if ids is None:
+            ids = self.reserve_ids(nbr_added)
+        else:
+            if len(ids) != len(x_start):
+                raise Exception('Exactly one id per dataset must be given.')
+            ids = ids[:nbr_added]
+        if nbr_added == 0:
+            return ids
+
+        self._inputs['id'].append(np.arange(ids.start, ids.stop))
+        self._inputs['x'].append(x_start[:nbr_added])
+        self._inputs['y'].append(y_start[:nbr_added])
+        self._inputs['h'].append(h[:nbr_added])
+        self._inputs['n'].append(n[:nbr_added])
+        self._nbr_inputs += nbr_added
+        return ids
+
+    def start(self):
+        """
+        Starts solving the current batch, the datasets are dealt to the threads by descending step count.
+        """
+        inputs = {
+            key: np.concatenate(values) if len(values) > 0 else np.empty((0, self._system_size) if key == 'y' else 0)
+            for key, values in self._inputs.items()
+        }
+        order = lpt_order(inputs['n'])
+        self._start_time = time.monotonic()
+        self._running = []
+        for thread in range(min(self._nbr_threads, self._nbr_inputs)):
+            part = order[thread::self._nbr_threads]
+            future = self._executor.submit(
+                self.integrate, inputs['x'][part], inputs['y'][part], inputs['h'][part], inputs['n'][part])
+            self._running.append((inputs['id'][part], future))
+
+    def wait(self):
+        """
+        Blocks until the started batch is solved.
+        """
+        results = [(ids, future.result()) for ids, future in self._running]
+        self._outputs = {
+            'id': np.concatenate([np.empty(0, dtype=np.int64)] + [ids for ids, _ in results]),
+            'x': np.concatenate([np.empty(0)] + [x for _, (x, _) in results]),
+            'y': np.concatenate([np.empty((0, self._system_size))] + [y for _, (_, y) in results])
+        }
+        self._running = None
+        self._last_duration = time.monotonic() - self._start_time
+
+    def stop(self):
+        """
+        Releases the inputs of the current batch, the outputs can still be fetched.
+        """
+        self._inputs = {'id': [], 'x': [], 'y': [], 'h': [], 'n': []}
+        self._nbr_inputs = 0
+
+    def fetch_results(self, ids: range) -> Dict:
+        """
+        Return the outputs of the given ids from the last batch, ordered like the ids, see Solver.fetch_results.
+        """
+        outputs = self._outputs
+        positions = np.full(len(ids), -1, dtype=np.int64)
+        in_range = (outputs['id'] >= ids.start) & (outputs['id'] < ids.stop)
+        positions[outputs['id'][in_range] - ids.start] = np.flatnonzero(in_range)
+        if np.any(positions < 0):
+            raise Exception('Results of %d dataset(s) are missing.' % int(np.sum(positions < 0)))
+        return {
+            'id': outputs['id'][positions],
+            'x': outputs['x'][positions],
+            'y': outputs['y'][positions]
+        }
+
+    def solve_batches(self, x_start, y_start, h, n, order='input') -> Iterator[Dict]:
+        """
+        Solves any number of input datasets in batches of batch_size, see Solver.solve_batches.
+        :return: generator of dictionaries with arrays of index (position of the dataset in the inputs), id, x and y
+        """
+        x_start, y_start, h, n = broadcast_inputs(self._system_size, x_start, y_start, h, n)
+        assert order in ORDERS
+        positions = np.arange(len(x_start)) if order == 'input' else lpt_order(n)
+        for offset in range(0, len(x_start), self._batch_size):
+            batch = positions[offset:offset + self._batch_size]
+            ids = self.add_inputs(x_start[batch], y_start[batch], h[batch], n[batch])
+            self.start()
+            try:
+                self.wait()
+            finally:
+                self.stop()
+            results = self.fetch_results(ids)
+            results['index'] = batch
+            yield results
+
+    def solve(self, x_start, y_start, h, n, order='input') -> Dict:
+        """
+        Solves any number of input datasets, see solve_batches.
+        :return: dictionary with arrays of id, x and y, ordered like the inputs
+        """
+        return merge_results(self.solve_batches(x_start, y_start, h, n, order=order), self._system_size)
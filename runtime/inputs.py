@@ -0,0 +1,251 @@
+import csv
+import zipfile
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from runtime.interface import broadcast_inputs
+
+PARAMETERS = ['x', 'y', 'h', 'n']
+
+
+class InputSource:
+    def __init__(self, problem: Dict):
+        """
+        Provides the input datasets of a run in chunks, so the inputs never have to be held in memory at once.
+        Parameters not given by the source are taken from the problem configuration.
+        :param problem: problem section of the solver configuration, containing components, x, y, h and n
+        """
+        self.problem = problem
+        self.system_size = len(problem['components'])
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def read(self, offset: int, count: int) -> Dict[str, np.ndarray]:
+        """
+        Reads consecutive datasets, sources are only read sequentially.
+        :return: dictionary with arrays of the parameters given by the source, y may be given by component as y[i]
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def chunks(self, chunk_size: int) -> Iterator[Tuple[int, Tuple]]:
+        """
+        Iterates over all datasets in chunks.
+        :param chunk_size: maximum number of datasets per chunk
+        :return: generator of (offset, (x_start, y_start, h, n)), the arrays are shaped like in broadcast_inputs
+        """
+        for offset in range(0, len(self), chunk_size):
+            count = min(chunk_size, len(self) - offset)
+            yield offset, self._complete(count, self.read(offset, count))
+
+    def _complete(self, count: int, values: Dict[str, np.ndarray]):
+        """
+        Fills in parameters missing in values from the problem configuration.
+        Raises an exception if a number of steps is not integral, as it would be truncated silently.
+        """
+        if 'n' in values:
+            n = np.asarray(values['n'])
+            fractional = n != np.round(n)
+            if np.any(fractional):
+                raise Exception('The number of steps n must be an integer, got %s.' % n[fractional][0])
+        y_start = values.get('y')
+        if y_start is None:
+            y_start = np.empty((count, self.system_size))
+            y_start[:] = self.problem['y']
+            for i in range(self.system_size):
+                if 'y[%d]' % i in values:
+                    y_start[:, i] = values['y[%d]' % i]
+        x_start, y_start, h, n = broadcast_inputs(
+            self.system_size,
+            values.get('x', self.problem['x']),
+            y_start,
+            values.get('h', self.problem['h']),
+            values.get('n', self.problem['n'])
+        )
+        shape = (count,)
+        return (
+            np.broadcast_to(x_start, shape),
+            np.broadcast_to(y_start, shape + (self.system_size,)),
+            np.broadcast_to(h, shape),
+            np.broadcast_to(n, shape)
+        )
+
+
+class ProblemSource(InputSource):
+    def __init__(self, problem, amount: int):
+        """
+        Repeats the single ivp of the problem configuration.
+        :param amount: number of datasets
+        """
+        super().__init__(problem)
+        self.amount = amount
+
+    def __len__(self):
+        return self.amount
+
+    def read(self, offset, count):
+        return {}
+
+
+class _NpyStream:
+    def __init__(self, fd):
+        """
+        Sequential reader of an array stored in the .npy format, used to read the members of a .npz file in chunks.
+        """
+        self._fd = fd
+        if np.lib.format.read_magic(fd) == (1, 0):
+            shape, fortran_order, self.dtype = np.lib.format.read_array_header_1_0(fd)
+        else:
+            shape, fortran_order, self.dtype = np.lib.format.read_array_header_2_0(fd)
+        if len(shape) < 1:
+            raise Exception('Input arrays must have one entry per dataset.')
+        if fortran_order and len(shape) > 1:
+            raise Exception('Arrays in fortran order are not supported.')
+        self.shape = shape
+
+    def read(self, count: int) -> np.ndarray:
+        row_shape = self.shape[1:]
+        nbr_bytes = count * int(np.prod(row_shape)) * self.dtype.itemsize
+        data = self._fd.read(nbr_bytes)
+        if len(data) != nbr_bytes:
+            raise Exception('Unexpected end of array data.')
+        return np.frombuffer(data, dtype=self.dtype).reshape((count,) + row_shape)
+
+
+class NpzSource(InputSource):
+    def __init__(self, problem, path: str):
+        """
+        Reads datasets from a .npz file (compressed or not) containing the arrays x, y (of shape
+        (number of datasets, system_size)), h and n. Missing arrays are taken from the problem configuration, but at
+        least one array must be given to define the number of datasets.
+        """
+        super().__init__(problem)
+        self._zip = zipfile.ZipFile(path)
+        self._streams = {}
+        for parameter in PARAMETERS:
+            if parameter + '.npy' in self._zip.namelist():
+                self._streams[parameter] = _NpyStream(self._zip.open(parameter + '.npy'))
+        if len(self._streams) == 0:
+            raise Exception('Input file does not contain any of the arrays %s.' % ', '.join(PARAMETERS))
+        lengths = set(stream.shape[0] for stream in self._streams.values())
+        if len(lengths) != 1:
+            raise Exception('All arrays of the input file must have the same length.')
+        self._length = lengths.pop()
+
+    def __len__(self):
+        return self._length
+
+    def read(self, offset, count):
+        return {parameter: stream.read(count) for parameter, stream in self._streams.items()}
+
+    def close(self):
+        self._zip.close()
+
+
+class CsvSource(InputSource):
+    def __init__(self, problem, path: str):
+        """
+        Reads datasets from a CSV file with a header row naming the columns.
+        Columns can be x, h, n and the components y[0], y[1], ..., missing columns are taken from the problem
+        configuration.
+        """
+        super().__init__(problem)
+        self._fd = open(path, newline='')
+        self._reader = csv.reader(self._fd)
+        self._columns = [column.strip() for column in next(self._reader)]
+        known = ['x', 'h', 'n'] + ['y[%d]' % i for i in range(self.system_size)]
+        for column in self._columns:
+            if column not in known:
+                raise Exception('Unknown input column: %s' % column)
+
+        # Count the rows once, the data is read in chunks later on
+        self._length = sum(1 for row in self._reader if len(row) > 0)
+        self._fd.seek(0)
+        self._reader = csv.reader(self._fd)
+        next(self._reader)
+
+    def __len__(self):
+        return self._length
+
+    def read(self, offset, count):
+        rows = []
+        while len(rows) < count:
+            row = next(self._reader)
+            if len(row) > 0:
+                rows.append(row)
+        data = np.array(rows, dtype=np.float64).reshape(count, len(self._columns))
+        return {column: data[:, i] for i, column in enumerate(self._columns)}
+
+    def close(self):
+        self._fd.close()
+
+
+class GridSource(InputSource):
+    def __init__(self, problem, spec: Dict):
+        """
+        Cartesian product of parameter values, expanded chunk by chunk.
+        The spec maps parameter names (x, h, n or a component y[i]) to either a list of values or to
+        {"linspace": [start, stop, num]}, e.g. {"y[0]": {"linspace": [0, 1, 100]}, "y[1]": [1, 2, 4]}.
+        The last parameter of the spec varies fastest.
+        """
+        super().__init__(problem)
+        known = ['x', 'h', 'n'] + ['y[%d]' % i for i in range(self.system_size)]
+        self._parameters = []
+        self._axes = []
+        for parameter, values in spec.items():
+            if parameter not in known:
+                raise Exception('Unknown grid parameter: %s' % parameter)
+            if isinstance(values, dict):
+                if 'linspace' not in values:
+                    raise Exception('Grid parameter %s must be a list of values or a linspace.' % parameter)
+                start, stop, num = values['linspace']
+                values = np.linspace(start, stop, int(num))
+            axis = np.asarray(values, dtype=np.float64)
+            if axis.ndim != 1 or len(axis) == 0:
+                raise Exception('Grid parameter %s must have at least one value.' % parameter)
+            self._parameters.append(parameter)
+            self._axes.append(axis)
+        if len(self._axes) == 0:
+            raise Exception('The grid spec must contain at least one parameter.')
+        self._shape = tuple(len(axis) for axis in self._axes)
+
+    def __len__(self):
+        return int(np.prod(self._shape, dtype=np.int64))
+
+    def read(self, offset, count):
+        grid_index = np.unravel_index(np.arange(offset, offset + count), self._shape)
+        return {
+            parameter: axis[index]
+            for parameter, axis, index in zip(self._parameters, self._axes, grid_index)
+        }
+
+
+def open_source(problem: Dict, amount: int = None, input_path: str = None, grid: Dict = None) -> InputSource:
+    """
+    Creates the input source of a run.
+    :param problem: problem section of the solver configuration
+    :param amount: number of repetitions of the configured ivp, used if neither input_path nor grid is given
+    :param input_path: .npz or .csv file with one dataset per ivp
+    :param grid: parameter grid spec, see GridSource
+    """
+    if input_path is not None and grid is not None:
+        raise Exception('Only one of input file and grid can be given.')
+    if input_path is not None:
+        if input_path.endswith('.npz'):
+            return NpzSource(problem, input_path)
+        if input_path.endswith('.csv'):
+            return CsvSource(problem, input_path)
+        raise Exception('Unsupported input file format, use .npz or .csv.')
+    if grid is not None:
+        return GridSource(problem, grid)
+    return ProblemSource(problem, amount)
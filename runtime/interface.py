@@ -1,103 +1,403 @@
-import math
-from typing import List, Dict
+import threading
+import time
+from typing import List, Dict, Iterable, Iterator, Tuple
 
-from opae import fpga
+import numpy as np
 
-from framework import data_desc
+from framework.codec import CHUNK_SIZE, INTEGER_TYPE, get_codec
+from runtime.ordering import ORDERS, TailReport, lpt_order, step_counts
+from runtime.tracing import Tracer
+from runtime.wait import WaitPolicy, SpinWait
 from utils import num
 
-CHUNK_SIZE = 256
+# Largest id fitting into the id field of the records, id 0 marks empty slots
+MAX_INPUT_ID = (1 << INTEGER_TYPE.nbr_bits) - 1
+
+
+def broadcast_inputs(system_size, x_start, y_start, h, n):
+    """
+    Broadcasts solver inputs to arrays with one entry per dataset.
+    :param system_size: size of the ode system
+    :param x_start: solver input, scalar or array
+    :param y_start: solver input, of shape (system_size,) or (number of datasets, system_size)
+    :param h: solver input, scalar or array
+    :param n: solver input, scalar or array
+    :return: x_start, y_start, h, n with x_start, h, n of shape (number of datasets,)
+             and y_start of shape (number of datasets, system_size)
+    """
+    y_start = np.asarray(y_start, dtype=np.float64)
+    if y_start.shape[-1:] != (system_size,):
+        raise Exception('Initial values y_start must have system_size (%d) components.' % system_size)
+    shape = np.broadcast_shapes(np.shape(x_start), y_start.shape[:-1], np.shape(h), np.shape(n))
+    if len(shape) > 1:
+        raise Exception('Solver inputs must be scalars or one-dimensional arrays.')
+    nbr_datasets = shape[0] if len(shape) == 1 else 1
+    return (
+        np.broadcast_to(np.asarray(x_start, dtype=np.float64), (nbr_datasets,)),
+        np.broadcast_to(y_start, (nbr_datasets, system_size)),
+        np.broadcast_to(np.asarray(h, dtype=np.float64), (nbr_datasets,)),
+        np.broadcast_to(np.asarray(n, dtype=np.int64), (nbr_datasets,))
+    )
+
+
+def merge_results(batches, system_size) -> Dict:
+    """
+    Merges result batches as yielded by Solver.solve_batches into one result ordered by the index of the datasets.
+    :param batches: iterable of dictionaries with arrays of index, id, x and y
+    :param system_size: size of the ode system
+    :return: dictionary with arrays of id, x and y
+    """
+    batches = list(batches)
+    index = np.concatenate([np.empty(0, dtype=np.int64)] + [batch['index'] for batch in batches])
+    order = np.argsort(index, kind='stable')
+    return {
+        'id': np.concatenate([np.empty(0, dtype=np.int64)] + [batch['id'] for batch in batches])[order],
+        'x': np.concatenate([np.empty(0)] + [batch['x'] for batch in batches])[order],
+        'y': np.concatenate([np.empty((0, system_size))] + [batch['y'] for batch in batches])[order]
+    }
+
+
+class _BufferPair:
+    def __init__(self, input_buffer, output_buffer):
+        """
+        Shared input and output buffer used by one calculation.
+        :param input_buffer: allocated shared buffer the inputs are written to
+        :param output_buffer: allocated shared buffer of the same size the outputs are read from
+        """
+        self.input_buffer = input_buffer
+        self.output_buffer = output_buffer
+
+        # Zero-copy views on the shared buffers
+        self.input_view = np.frombuffer(self.input_buffer, dtype=np.uint8)
+        self.output_view = np.frombuffer(self.output_buffer, dtype=np.uint8)
+
+        self.input_buffer.fill(0)
+        self.output_buffer.fill(0)
+
+        # Number of used input slots and number of slots processed by the last calculation
+        self.nbr_inputs = 0
+        self.nbr_started_slots = 0
+        # Number of solver steps of the used input slots
+        self.nbr_steps = 0
+        # Number of bytes at the start of each buffer written since the buffers were zeroed
+        self.input_used = 0
+        self.output_used = 0
+
+    def reset(self):
+        """
+        Zeroes the used regions of both buffers and releases all inputs.
+        """
+        self.input_view[:self.input_used] = 0
+        self.output_view[:self.output_used] = 0
+        self.input_used = 0
+        self.output_used = 0
+        self.nbr_inputs = 0
+        self.nbr_started_slots = 0
+        self.nbr_steps = 0
+
+
+class BufferPool:
+    def __init__(self, token=None, tracer: Tracer = None):
+        """
+        Opens an afu and keeps its shared buffers allocated across Solver sessions.
+        Allocating and zeroing shared buffers is expensive, released buffer pairs are therefore kept by the pool and
+        handed out again by acquire. Only the regions used by the previous session are zeroed on release.
+        Use as context manager and pass it to each Solver:
+
+            with BufferPool() as buffer_pool:
+                with Solver(config, buffer_size, buffer_pool=buffer_pool) as solver:
+                    ...
+
+        :param token: opae token of the afu to use, the first afu found is used if not given
+        :param tracer: records the time spent opening the afu, nothing is recorded if not given
+        """
+        self._token = token
+        self._tracer = tracer if tracer is not None else Tracer()
+        self._lock = threading.Lock()
+        self._fpga = None
+        self._handle = None
+        # Released buffer pairs by buffer size
+        self._free = {}
+        self.nbr_allocated = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        from opae import fpga
+
+        token = self._token
+        if token is None:
+            # TODO enable guid filter if segfault in opae is fixed
+            tokens = fpga.enumerate(type=fpga.ACCELERATOR)
+            if tokens is None or len(tokens) < 1:
+                raise Exception('No usable afu could be found on fpga.')
+            token = tokens[0]
+        with self._tracer.span('open'):
+            self._fpga = fpga.open(token, fpga.OPEN_SHARED)
+            self._handle = self._fpga.__enter__()
+
+    def close(self):
+        """
+        Frees all buffers and closes the afu, buffer pairs still acquired must not be used afterwards.
+        """
+        with self._lock:
+            self._free = {}
+        self._fpga.__exit__(None, None, None)
+        self._fpga = None
+        self._handle = None
+
+    @property
+    def handle(self):
+        """
+        Handle of the opened afu.
+        """
+        return self._handle
+
+    def acquire(self, buffer_size) -> _BufferPair:
+        """
+        Returns a zeroed buffer pair of the given size, a new one is allocated if none was released before.
+        """
+        with self._lock:
+            free = self._free.get(buffer_size)
+            if free:
+                return free.pop()
+            self.nbr_allocated += 1
+        return self._allocate(buffer_size)
+
+    def _allocate(self, buffer_size) -> _BufferPair:
+        from opae import fpga
+
+        return _BufferPair(fpga.allocate_shared_buffer(self._handle, buffer_size),
+                           fpga.allocate_shared_buffer(self._handle, buffer_size))
+
+    def release(self, buffers: _BufferPair):
+        """
+        Returns an acquired buffer pair to the pool, it must not be used by the caller afterwards.
+        """
+        buffers.reset()
+        with self._lock:
+            self._free.setdefault(len(buffers.input_view), []).append(buffers)
 
 
 class Solver:
-    def __init__(self, config, buffer_size):
+    def __init__(self, config, buffer_size, nbr_buffers=1, wait_policy: WaitPolicy = None, timeout=None, token=None,
+                 tracer: Tracer = None, buffer_pool: BufferPool = None):
         """
         Interface to a already loaded solver described by config.
         :param config: configuration of solver (just load it from the .slv)
         :param buffer_size: buffer size in bytes to be used for data input / output,
                             the system must support ram pages of this size (without hugepage typically max 4096 bytes)
+        :param nbr_buffers: number of input / output buffer pairs, at least two are required for pipelined solving
+        :param wait_policy: strategy used by wait to detect the completion of a calculation, defaults to SpinWait
+        :param timeout: maximum duration of a calculation in seconds, None to wait forever
+        :param token: opae token of the afu to use, the first afu found is used if not given
+        :param tracer: records the time spent in the steps of a calculation, nothing is recorded if not given
+        :param buffer_pool: opened pool the afu handle and buffers are taken from, token is ignored if given.
+                            The afu is opened for this session only if not given.
         """
         self._config = config
+        self._token = token
+        self._buffer_pool = buffer_pool
+        # Pool opened by the solver itself if none is given
+        self._own_buffer_pool = None
+        self._tracer = tracer if tracer is not None else Tracer()
         self._system_size = len(config['problem']['components'])
-        self._csr_addresses = config['build_info']['csr_addresses']
-        default_factory = num.NumberType.from_config(config.get('numeric', {}))
-        num.set_default_type(default_factory)
-        # Shift all addresses
-        for key, val in self._csr_addresses.items():
-            self._csr_addresses[key] = val << 2
+        # Number type of the solver, passed explicitly so solvers with different types can be used concurrently
+        self._number_type = num.NumberType.from_config(config.get('numeric', {}))
+        self._codec = get_codec(self._system_size, self._number_type)
+        # Shift all addresses, the config is left unchanged as it may be shared by several solvers
+        self._csr_addresses = {key: val << 2 for key, val in config['build_info']['csr_addresses'].items()}
         # Buffer handling
         self._buffer_size = buffer_size
-        self._input_buffer = None
-        self._output_buffer = None
+        self._nbr_buffers = nbr_buffers
+        self._buffers = []
+        # Buffer pair used by add_inputs, start and fetch_outputs
+        self._buffer = None
+        # Buffer pair the fpga is currently configured with
+        self._active_buffer = None
         self._current_input_id = 0
-
-        # Input buffer positions
-        self._input_data_offset = 0
-        self._input_data_chunk = 0
-
-        # Input buffer positions
+        # Completion handling
+        self._wait_policy = wait_policy if wait_policy is not None else SpinWait()
+        self._timeout = timeout
+        self._nbr_solver = config.get('nbr_solver') or 1
+        self._start_time = None
+        self._expected_steps = 0
+        self._last_duration = None
+
+        # Input buffer positions, inputs are placed in slots of the chunks
+        self._input_data_size = self._codec.input_record_size
+        self._inputs_per_chunk = self._codec.inputs_per_chunk
+        self._input_capacity = self._codec.input_capacity(buffer_size)
+
+        # Output buffer positions
+        self._output_data_size = self._codec.output_record_size
         self._output_data_offset = 0
         self._output_data_chunk = 0
 
     def __enter__(self):
-        # TODO enable guid filter if segfault in opae is fixed
-        tokens = fpga.enumerate(type=fpga.ACCELERATOR)  # , guid=self._config['build_info']['uuid'])
-        if tokens is None or len(tokens) < 1:
-            raise Exception('No usable afu could be found on fpga.')
-        self._fpga = fpga.open(tokens[0], fpga.OPEN_SHARED)
-        self._handle = self._fpga.__enter__()
-
-        self._input_buffer = fpga.allocate_shared_buffer(self._handle, self._buffer_size)
-        self._handle.write_csr64(self._csr_addresses['input_addr'], self._input_buffer.io_address() >> 6)
-        self._output_buffer = fpga.allocate_shared_buffer(self._handle, self._buffer_size)
-        self._handle.write_csr64(self._csr_addresses['output_addr'], self._output_buffer.io_address() >> 6)
-
-        self._input_buffer.fill(0)
-        self._output_buffer.fill(0)
+        buffer_pool = self._buffer_pool
+        if buffer_pool is None:
+            self._own_buffer_pool = BufferPool(self._token, self._tracer)
+            self._own_buffer_pool.open()
+            buffer_pool = self._own_buffer_pool
+        self._handle = buffer_pool.handle
+
+        with self._tracer.span('allocate', nbr_buffers=self._nbr_buffers, buffer_size=self._buffer_size):
+            self._buffers = [buffer_pool.acquire(self._buffer_size) for _ in range(self._nbr_buffers)]
+        self.select_buffer(0)
+        self._activate_buffer()
 
         self.stop()
 
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._fpga.__exit__(exc_type, exc_val, exc_tb)
+        if self._own_buffer_pool is not None:
+            self._own_buffer_pool.close()
+            self._own_buffer_pool = None
+        else:
+            for buffers in self._buffers:
+                self._buffer_pool.release(buffers)
+        self._buffers = []
+        self._buffer = None
+        self._active_buffer = None
         self._handle = None
 
+    @property
+    def input_view(self) -> np.ndarray:
+        """
+        Writable uint8 view on the selected shared input buffer, no data is copied.
+        """
+        return self._buffer.input_view
+
+    @property
+    def output_view(self) -> np.ndarray:
+        """
+        uint8 view on the selected shared output buffer, no data is copied.
+        """
+        return self._buffer.output_view
+
+    @property
+    def system_size(self) -> int:
+        return self._system_size
+
+    @property
+    def number_type(self) -> num.NumberType:
+        """
+        Number type of x and y used by the solver, as configured in the numeric section of the config.
+        """
+        return self._number_type
+
+    @property
+    def nbr_buffers(self) -> int:
+        return self._nbr_buffers
+
+    @property
+    def nbr_solver(self) -> int:
+        return self._nbr_solver
+
+    def select_buffer(self, index: int):
+        """
+        Selects the buffer pair used by add_inputs, start and fetch_outputs.
+        While the fpga is working on one buffer pair, inputs can be added to or outputs fetched from another one.
+        :param index: index of the buffer pair
+        """
+        self._buffer = self._buffers[index]
+
+    def _activate_buffer(self):
+        """
+        Configures the fpga to use the selected buffer pair, must not be called while the fpga is enabled.
+        """
+        if self._active_buffer is not self._buffer:
+            with self._tracer.span('csr_write', register='input_addr, output_addr'):
+                self._handle.write_csr64(
+                    self._csr_addresses['input_addr'], self._buffer.input_buffer.io_address() >> 6)
+                self._handle.write_csr64(
+                    self._csr_addresses['output_addr'], self._buffer.output_buffer.io_address() >> 6)
+            self._active_buffer = self._buffer
+
     def start(self):
         """
-        Start calculation on the fpga.
+        Start calculation on the fpga using the selected buffer pair.
         Calculates the chunk_size and writes it to the fpga. Sets the enb bit on the fpga.
         :return:
         """
-        nbr_chunks = int(math.ceil((self._input_data_chunk + self._input_data_offset) / CHUNK_SIZE))
+        self._activate_buffer()
+        nbr_chunks = self._codec.input_chunks(self._buffer.nbr_inputs)
         self.buffer_size = nbr_chunks
-
+        # The fpga processes every slot of the used chunks, empty slots result in outputs with id 0
+        self._buffer.nbr_started_slots = nbr_chunks * self._inputs_per_chunk
+        # The fpga writes one output per started slot
+        self._buffer.output_used = min(self._buffer_size, max(
+            self._buffer.output_used, self._codec.output_chunks(self._buffer.nbr_started_slots) * CHUNK_SIZE))
+        # Every slot is processed for at least one step, the steps are distributed over all solver instances.
+        # The pipeline latency of the steps is unknown, see WaitPolicy.wait
+        nbr_empty_slots = self._buffer.nbr_started_slots - self._buffer.nbr_inputs
+        self._expected_steps = (self._buffer.nbr_steps + nbr_empty_slots) / self._nbr_solver
+
+        self._start_time = time.monotonic()
         self.enb = True
+        self._tracer.instant('start', nbr_inputs=self._buffer.nbr_inputs, expected_steps=self._expected_steps)
+
+    def wait(self):
+        """
+        Blocks until the started calculation is finished, using the configured wait policy.
+        Raises a TimeoutError if the calculation takes longer than the configured timeout.
+        """
+        with self._tracer.span('wait', expected_steps=self._expected_steps):
+            self._wait_policy.wait(lambda: self.fin, self._start_time, self._expected_steps, self._timeout)
+        self._last_duration = time.monotonic() - self._start_time
+
+    @property
+    def last_duration(self) -> float:
+        """
+        Duration in seconds from start until wait detected the completion of the last calculation.
+        """
+        return self._last_duration
 
     def stop(self):
         """
         Stop calculation on the fpga.
-        Resets system to allow a restart.
+        Resets system to allow a restart, the inputs of the buffer pair the fpga was working on are released.
         :return:
         """
         self.enb = False
+        self._tracer.instant('stop')
 
-        self._input_data_offset = 0
-        self._input_data_chunk = 0
+        self._active_buffer.nbr_inputs = 0
+        self._active_buffer.nbr_steps = 0
 
         self._output_data_offset = 0
         self._output_data_chunk = 0
 
+    @property
+    def input_capacity(self) -> int:
+        """
+        Number of datasets fitting into the input buffer.
+        """
+        return self._input_capacity
+
+    @property
+    def inputs_per_chunk(self) -> int:
+        """
+        Number of datasets fitting into one chunk of the input buffer.
+        """
+        return self._inputs_per_chunk
+
     def input_full(self) -> bool:
         """
         Returns true if all possible inputs of given buffer size are used.
         You can't add more inputs. Either increase buffer size or restart the solver with new input.
         :return: true if input is full
         """
-        input_data_size = len(data_desc.get_input_desc(self._system_size)) // 8
-        return (self._input_data_chunk + self._input_data_offset) + input_data_size > self._buffer_size
+        return self._buffer.nbr_inputs >= self._input_capacity
 
-    def add_input(self, x_start: float, y_start: List[float], h: int, n: int) -> int:
+    def add_input(self, x_start: float, y_start: List[float], h: float, n: int) -> int:
         """
         Adds a given input dataset to the fpga communication buffer.
         :param x_start: solver input
@@ -109,41 +409,80 @@ class Solver:
         assert len(y_start) == self._system_size
         assert not self.input_full()
 
-        self._current_input_id = self._current_input_id + 1
-
-        packed_data = data_desc.pack_input_data(self._system_size, {
-            'id': int(self._current_input_id),
-            'x_start': num.get_default_type().create_constant(x_start),
-            'y_start': list(map(num.get_default_type().create_constant, reversed(y_start))),
-            'h': num.get_default_type().create_constant(h),
-            'n': int(n)
-        })
-        packed_data_len = len(packed_data)
-
-        offset = self._input_data_chunk + self._input_data_offset
-        for i in range(packed_data_len):
-            self._input_buffer[offset + i] = packed_data[i]
+        return self.add_inputs(x_start, y_start, h, n)[0]
 
-        self._input_data_offset += packed_data_len
-        if CHUNK_SIZE - self._input_data_offset < packed_data_len:
-            self._input_data_chunk += CHUNK_SIZE
-            self._input_data_offset = 0
+    def reserve_ids(self, nbr_ids: int) -> range:
+        """
+        Reserves ids for datasets added later on with add_inputs.
+        Ids wrap around to 1 if they would exceed MAX_INPUT_ID, they only need to be unique within a buffer.
+        :param nbr_ids: number of ids to reserve
+        :return: consecutive ids
+        """
+        if self._current_input_id + nbr_ids > MAX_INPUT_ID:
+            self._current_input_id = 0
+        ids = range(self._current_input_id + 1, self._current_input_id + 1 + nbr_ids)
+        self._current_input_id += nbr_ids
+        return ids
 
-        return self._current_input_id
+    def add_inputs(self, x_start, y_start, h, n, ids: range = None) -> range:
+        """
+        Adds as many of the given input datasets as fit into the fpga communication buffer with a single write.
+        Scalar inputs (and y_start of shape (system_size,)) are broadcasted over all datasets.
+        :param x_start: solver inputs, of shape (number of datasets,)
+        :param y_start: solver inputs, of shape (number of datasets, system_size)
+        :param h: solver inputs, of shape (number of datasets,)
+        :param n: solver inputs, of shape (number of datasets,)
+        :param ids: ids previously reserved by reserve_ids, one per dataset. New ids are assigned if not given.
+        :return: ids referring to the datasets added, can be used to match results. Its length is the number of
+                 datasets consumed, the remaining ones must be added after a restart of the solver.
+        """
+        x_start, y_start, h, n = broadcast_inputs(self._system_size, x_start, y_start, h, n)
+        buffer = self._buffer
+        nbr_added = min(len(x_start), self._input_capacity - buffer.nbr_inputs)
+        if ids is None:
+            ids = self.reserve_ids(nbr_added)
+        else:
+            if len(ids) != len(x_start):
+                raise Exception('Exactly one id per dataset must be given.')
+            ids = ids[:nbr_added]
+        if nbr_added == 0:
+            return ids
+
+        with self._tracer.span('pack', nbr_inputs=nbr_added):
+            first_slot = buffer.nbr_inputs % self._inputs_per_chunk
+            chunk_offset = (buffer.nbr_inputs // self._inputs_per_chunk) * CHUNK_SIZE
+            image = self._codec.pack_input_batch(
+                np.arange(ids.start, ids.stop),
+                x_start[:nbr_added],
+                y_start[:nbr_added],
+                h[:nbr_added],
+                n[:nbr_added],
+                first_slot=first_slot
+            )
+            # Skip the slots already in use, cut chunk padding exceeding the buffer
+            image = image[first_slot * self._input_data_size:self._buffer_size - chunk_offset]
+            offset = chunk_offset + first_slot * self._input_data_size
+            buffer.input_view[offset:offset + len(image)] = image
+            buffer.input_used = max(buffer.input_used, offset + len(image))
+
+        buffer.nbr_inputs += nbr_added
+        buffer.nbr_steps += int(np.maximum(n[:nbr_added], 1).sum())
+
+        return ids
 
     def fetch_output(self) -> Dict:
         """
         Return the solver outputs one after another. The order is the output order of the solver.
         :return: dictionary with id, x, y
         """
-        packed_data_len = len(data_desc.get_output_desc(self._system_size)) // 8
+        packed_data_len = self._output_data_size
 
         offset = self._output_data_offset + self._output_data_chunk
         if offset + packed_data_len > self._buffer_size:
             return None
-        packed_data = self._output_buffer[offset:offset + packed_data_len]
+        packed_data = self._buffer.output_view[offset:offset + packed_data_len]
 
-        unpacked_data = data_desc.unpack_output_data(self._system_size, bytes(packed_data))
+        unpacked_data = self._codec.unpack_output_records(packed_data.reshape(1, -1))
 
         self._output_data_offset += packed_data_len
         if CHUNK_SIZE - self._output_data_offset < packed_data_len:
@@ -151,18 +490,189 @@ class Solver:
             self._output_data_offset = 0
 
         return {
-            'id': num.UnsignedIntegerNumberType(32).value_of(unpacked_data['id']),
-            'x': num.get_default_type().value_of(unpacked_data['x']),
-            'y': list(map(num.get_default_type().value_of, reversed(unpacked_data['y'])))
+            'id': int(unpacked_data['id'][0]),
+            'x': float(unpacked_data['x'][0]),
+            'y': unpacked_data['y'][0].tolist()
         }
 
+    def fetch_outputs(self) -> Dict:
+        """
+        Return all solver outputs of the last calculation on the selected buffer pair at once.
+        The order is the output order of the solver.
+        :return: dictionary with arrays of id, x and y (of shape (number of outputs, system_size))
+        """
+        nbr_chunks = self._codec.output_chunks(self._buffer.nbr_started_slots)
+        if nbr_chunks * CHUNK_SIZE > self._buffer_size:
+            raise Exception('Outputs of the last calculation exceed the output buffer.')
+
+        with self._tracer.span('decode', nbr_chunks=nbr_chunks):
+            unpacked_data = self._codec.unpack_output_batch(self._buffer.output_view[0:nbr_chunks * CHUNK_SIZE])
+
+        # Empty input slots and unused output slots result in id 0, valid ids start at 1
+        written = unpacked_data['id'] != 0
+        return {
+            'id': unpacked_data['id'][written].astype(np.int64),
+            'x': unpacked_data['x'][written],
+            'y': unpacked_data['y'][written]
+        }
+
+    def fetch_results(self, ids: range) -> Dict:
+        """
+        Return the solver outputs of the given ids from the last calculation on the selected buffer pair, ordered like
+        the ids.
+        Raises an exception if an output is missing or received twice.
+        :param ids: ids of the last started calculation, as returned by add_inputs
+        :return: dictionary with arrays of id, x and y (of shape (len(ids), system_size))
+        """
+        outputs = self.fetch_outputs()
+
+        # Ids are assigned consecutively, track completion indexed by id
+        index = outputs['id'] - ids.start
+        awaited = (index >= 0) & (index < len(ids))
+        index = index[awaited]
+        received = np.bincount(index, minlength=len(ids))
+        if np.any(received > 1):
+            raise Exception('Already got results for this id.')
+        if np.any(received == 0):
+            raise Exception('Did not receive all outputs.')
+
+        results = {
+            'id': np.arange(ids.start, ids.stop, dtype=np.int64),
+            'x': np.empty(len(ids), dtype=np.float64),
+            'y': np.empty((len(ids), self._system_size), dtype=np.float64)
+        }
+        results['x'][index] = outputs['x'][awaited]
+        results['y'][index] = outputs['y'][awaited]
+        return results
+
+    def solve_batches(self, x_start, y_start, h, n, pipelined=False, order='input',
+                      tail_report: TailReport = None) -> Iterator[Dict]:
+        """
+        Solves any number of input datasets by splitting them into batches fitting into the input buffer.
+        The calculation is restarted for every batch, the results of a batch are yielded as soon as it is finished.
+        Inputs are broadcasted like in add_inputs.
+        :param pipelined: overlap host and fpga work by using multiple buffer pairs, while the fpga is working on
+                          batch k, the results of batch k-1 are fetched and yielded and batch k+1 is added
+        :param order: input: add the datasets in input order,
+                      lpt: add the datasets with the most steps first to balance the load of the solver instances
+        :param tail_report: collects the predicted tail of each batch if given
+        :return: generator of dictionaries with arrays of index (position of the dataset in the inputs), id, x and y
+        """
+        return self.solve_chunks([(0, (x_start, y_start, h, n))], pipelined=pipelined, order=order,
+                                 tail_report=tail_report)
+
+    def solve_chunks(self, chunks: Iterable[Tuple[int, Tuple]], pipelined=False, order='input',
+                     tail_report: TailReport = None) -> Iterator[Dict]:
+        """
+        Solves input datasets given in chunks, like solve_batches but the batches of all chunks are solved in a single
+        run. The next chunk is only taken once the previous one is added, and in pipelined mode the first batch of a
+        chunk is added while the last batch of the previous chunk is running. Batches do not span chunks.
+        :param chunks: iterable of (offset, (x_start, y_start, h, n)) as yielded by InputSource.chunks, offset is the
+                       position of the first dataset of the chunk in all inputs. Inputs are broadcasted like in
+                       add_inputs.
+        :param order: order the datasets of each chunk are added in, see solve_batches
+        :return: generator of dictionaries with arrays of index (position of the dataset in all inputs), id, x and y
+        """
+        assert order in ORDERS
+        if pipelined and self._nbr_buffers < 2:
+            raise Exception('Pipelined solving requires at least two buffer pairs.')
+        nbr_buffers = self._nbr_buffers if pipelined else 1
+        chunks = iter(chunks)
+
+        def next_chunk():
+            """
+            Takes the next non empty chunk as (index, x_start, y_start, h, n) in the order of adding, None at the end.
+            """
+            for chunk_offset, inputs in chunks:
+                x_start, y_start, h, n = broadcast_inputs(self._system_size, *inputs)
+                index = np.arange(chunk_offset, chunk_offset + len(x_start))
+                if order == 'lpt':
+                    positions = lpt_order(n)
+                    index, x_start, y_start, h, n = \
+                        index[positions], x_start[positions], y_start[positions], h[positions], n[positions]
+                if len(index) > 0:
+                    return index, x_start, y_start, h, n
+            return None
+
+        def add_batch(buffer_index, chunk, offset):
+            self.select_buffer(buffer_index)
+            _, x_start, y_start, h, n = chunk
+            ids = self.add_inputs(x_start[offset:], y_start[offset:], h[offset:], n[offset:])
+            if len(ids) == 0:
+                raise Exception('Input buffer is too small for a single dataset.')
+            return buffer_index, ids, chunk, offset
+
+        def fetch_batch(buffer_index, ids, chunk, offset):
+            self.select_buffer(buffer_index)
+            results = self.fetch_results(ids)
+            results['index'] = chunk[0][offset:offset + len(ids)]
+            return results
+
+        def report_tail(buffer_index, ids, chunk, offset):
+            nbr_empty_slots = self._buffers[buffer_index].nbr_started_slots - len(ids)
+            steps = np.concatenate([step_counts(chunk[4][offset:offset + len(ids)]),
+                                    np.ones(nbr_empty_slots, np.int64)])
+            tail_report.add(steps, self._last_duration)
+
+        def next_batch(batch):
+            buffer_index, ids, chunk, offset = batch
+            offset += len(ids)
+            if offset == len(chunk[0]):
+                chunk, offset = next_chunk(), 0
+                if chunk is None:
+                    return None
+            return add_batch((buffer_index + 1) % nbr_buffers, chunk, offset)
+
+        chunk = next_chunk()
+        if chunk is None:
+            return
+        running = add_batch(0, chunk, 0)
+        self.start()
+        finished = None
+        pending = None
+        while running is not None:
+            if pipelined:
+                # Host work overlapping the running calculation
+                if finished is not None:
+                    yield fetch_batch(*finished)
+                    finished = None
+                pending = next_batch(running)
+
+            try:
+                self.wait()
+            finally:
+                self.stop()
+            if tail_report is not None:
+                report_tail(*running)
+
+            finished = running
+            if not pipelined:
+                yield fetch_batch(*finished)
+                finished = None
+                pending = next_batch(running)
+
+            running = pending
+            if running is not None:
+                self.select_buffer(running[0])
+                self.start()
+        if finished is not None:
+            yield fetch_batch(*finished)
+
+    def solve(self, x_start, y_start, h, n, order='input') -> Dict:
+        """
+        Solves any number of input datasets, see solve_batches.
+        :return: dictionary with arrays of id, x and y, ordered like the inputs
+        """
+        return merge_results(self.solve_batches(x_start, y_start, h, n, order=order), self._system_size)
+
     @property
     def buffer_size(self):
         return self._handle.read_csr64(self._csr_addresses['buffer_size'])
 
     @buffer_size.setter
     def buffer_size(self, value):
-        self._handle.write_csr64(self._csr_addresses['buffer_size'], value)
+        with self._tracer.span('csr_write', register='buffer_size'):
+            self._handle.write_csr64(self._csr_addresses['buffer_size'], value)
 
     @property
     def enb(self):
@@ -170,7 +680,8 @@ class Solver:
 
     @enb.setter
     def enb(self, value):
-        self._handle.write_csr64(self._csr_addresses['enb'], value)
+        with self._tracer.span('csr_write', register='enb'):
+            self._handle.write_csr64(self._csr_addresses['enb'], value)
 
     @property
     def fin(self):
@@ -0,0 +1,198 @@
+import math
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+
+from runtime.cpu import CpuSolver
+from runtime.interface import Solver, broadcast_inputs, merge_results
+from runtime.ordering import ORDERS, lpt_order
+from runtime.tracing import Tracer
+from runtime.wait import WaitPolicy
+
+
+class MultiSolver:
+    def __init__(self, config, buffer_size, tokens: List, wait_policy_factory: Callable[[], WaitPolicy] = None,
+                 timeout=None, tracer: Tracer = None, cpu_solver: CpuSolver = None):
+        """
+        Interface to the same solver loaded on several fpga cards.
+        The input datasets are split into batches, each card is served by its own worker thread taking batches
+        in proportion to the throughput measured on the card. If a cpu solver is given, the cpu is used like an
+        additional card, solving its share of the datasets while the cards work on the rest.
+        :param config: configuration of solver (just load it from the .slv)
+        :param buffer_size: buffer size in bytes used on each card, see Solver
+        :param tokens: opae tokens of the afus to use, one per card
+        :param wait_policy_factory: creates the wait policy of each card, defaults to SpinWait
+        :param timeout: maximum duration of a calculation in seconds, None to wait forever
+        :param tracer: shared by the solvers of all cards, see Solver
+        :param cpu_solver: unopened cpu solver used in addition to the cards, it is counted as the last device
+        """
+        if len(tokens) < 1 and cpu_solver is None:
+            raise Exception('At least one afu or a cpu solver is required.')
+        self._system_size = len(config['problem']['components'])
+        self._solvers = [
+            Solver(config, buffer_size,
+                   wait_policy=wait_policy_factory() if wait_policy_factory is not None else None,
+                   timeout=timeout, token=token, tracer=tracer)
+            for token in tokens
+        ]
+        if cpu_solver is not None:
+            self._solvers.append(cpu_solver)
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._offset = 0
+        self._nbr_datasets = 0
+        # Positions of the datasets in the inputs if they are reordered
+        self._positions = None
+        # Ids are assigned in input order, continuing over all calls of solve_batches
+        self._next_id = 1
+        self._first_id = 1
+        # Measured solver steps per second of each card, None until its first batch finished
+        self._throughput = [None] * len(self._solvers)
+        # Number of datasets solved by each device since the solver was created
+        self.nbr_solved = [0] * len(self._solvers)
+
+    def __enter__(self):
+        opened = []
+        try:
+            for solver in self._solvers:
+                opened.append(solver.__enter__())
+        except BaseException as e:
+            for solver in reversed(opened):
+                solver.__exit__(type(e), e, e.__traceback__)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for solver in reversed(self._solvers):
+            solver.__exit__(exc_type, exc_val, exc_tb)
+
+    @property
+    def nbr_devices(self) -> int:
+        return len(self._solvers)
+
+    def reserve_ids(self, nbr_ids: int) -> range:
+        """
+        Reserves ids not assigned to any dataset solved by solve_batches, see Solver.reserve_ids.
+        """
+        with self._lock:
+            ids = range(self._next_id, self._next_id + nbr_ids)
+            self._next_id += nbr_ids
+        return ids
+
+    def _take(self, device: int) -> range:
+        """
+        Assigns the next batch of datasets to a card.
+        The batch size is the share of the remaining datasets corresponding to the throughput of the card,
+        limited by its input capacity. Batches are never smaller than one chunk, as a partly filled chunk takes
+        as long as a full one.
+        :return: positions of the datasets in the inputs, empty if all datasets are assigned
+        """
+        solver = self._solvers[device]
+        with self._lock:
+            if self._stopped:
+                return range(0)
+            remaining = self._nbr_datasets - self._offset
+            if None in self._throughput:
+                # Equal shares until every card finished a batch
+                share = 1 / len(self._solvers)
+            else:
+                share = self._throughput[device] / sum(self._throughput)
+            size = min(remaining, solver.input_capacity,
+                       max(solver.inputs_per_chunk, int(math.ceil(remaining * share))))
+            batch = range(self._offset, self._offset + size)
+            self._offset += size
+            return batch
+
+    def _work(self, device: int, finished: queue.Queue, x_start, y_start, h, n):
+        """
+        Solves batches on one card until all datasets are assigned, runs in the worker thread of the card.
+        Finished batches are put into the finished queue, followed by None when the worker stops.
+        """
+        solver = self._solvers[device]
+        steps = np.maximum(n, 1)
+        try:
+            while True:
+                batch = self._take(device)
+                if len(batch) == 0:
+                    return
+                timing_start = time.monotonic()
+                ids = solver.add_inputs(
+                    x_start[batch.start:batch.stop], y_start[batch.start:batch.stop],
+                    h[batch.start:batch.stop], n[batch.start:batch.stop]
+                )
+                solver.start()
+                try:
+                    solver.wait()
+                finally:
+                    solver.stop()
+                results = solver.fetch_results(ids)
+                results['index'] = np.arange(batch.start, batch.stop) if self._positions is None \
+                    else self._positions[batch.start:batch.stop]
+                # Ids of the cards overlap, renumber by position in the inputs
+                results['id'] = results['index'] + self._first_id
+
+                duration = time.monotonic() - timing_start
+                with self._lock:
+                    if duration > 0:
+                        self._throughput[device] = int(steps[batch.start:batch.stop].sum()) / duration
+                    self.nbr_solved[device] += len(batch)
+                finished.put(results)
+        except BaseException:
+            with self._lock:
+                self._stopped = True
+            raise
+        finally:
+            finished.put(None)
+
+    def solve_batches(self, x_start, y_start, h, n, order='input') -> Iterator[Dict]:
+        """
+        Solves any number of input datasets on all cards. Inputs are broadcasted like in Solver.add_inputs.
+        The ids are unique over all cards, they are assigned consecutively in the order of the inputs.
+        :param order: order the datasets are distributed in, see Solver.solve_batches
+        :return: generator of dictionaries with arrays of index (position of the dataset in the inputs), id, x and y,
+                 yielded in the order the batches finish
+        """
+        x_start, y_start, h, n = broadcast_inputs(self._system_size, x_start, y_start, h, n)
+        assert order in ORDERS
+        self._positions = None
+        if order == 'lpt':
+            self._positions = lpt_order(n)
+            x_start, y_start, h, n = x_start[self._positions], y_start[self._positions], h[self._positions], \
+                n[self._positions]
+        self._offset = 0
+        self._nbr_datasets = len(x_start)
+        self._first_id = self._next_id
+        self._next_id += self._nbr_datasets
+        self._stopped = False
+
+        finished = queue.Queue()
+        with ThreadPoolExecutor(max_workers=len(self._solvers)) as executor:
+            workers = [
+                executor.submit(self._work, device, finished, x_start, y_start, h, n)
+                for device in range(len(self._solvers))
+            ]
+            try:
+                nbr_running = len(workers)
+                while nbr_running > 0:
+                    batch = finished.get()
+                    if batch is None:
+                        nbr_running -= 1
+                    else:
+                        yield batch
+            finally:
+                # Stop assigning batches if the generator is closed early
+                with self._lock:
+                    self._stopped = True
+            for worker in workers:
+                worker.result()
+
+    def solve(self, x_start, y_start, h, n, order='input') -> Dict:
+        """
+        Solves any number of input datasets on all cards, see solve_batches.
+        :return: dictionary with arrays of id, x and y, ordered like the inputs
+        """
+        return merge_results(self.solve_batches(x_start, y_start, h, n, order=order), self._system_size)
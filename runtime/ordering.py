@@ -0,0 +1,180 @@
+import collections
+import heapq
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+# Each solver instance has an input fifo of 4 ivps and feeds unfinished ivps back into its pipeline through a fifo of
+# 4 ivps, see generator.dispatcher and generator.solver
+INPUT_FIFO_DEPTH = 4
+CYCLE_FIFO_DEPTH = 4
+
+ORDERS = ['input', 'lpt']
+
+
+def step_counts(n) -> np.ndarray:
+    """
+    Number of steps the fpga calculates for each dataset, every dataset takes at least one step.
+    """
+    return np.maximum(np.asarray(n, dtype=np.int64), 1)
+
+
+def lpt_order(n) -> np.ndarray:
+    """
+    Longest processing time first ordering of datasets.
+    Feeding the datasets with the most steps first lets the dispatcher fill up idle solver instances with short
+    datasets at the end, which balances the finish times of all instances.
+    :param n: number of steps of each dataset
+    :return: permutation of the datasets sorted by descending step count, equal step counts keep their order
+    """
+    return np.argsort(-step_counts(n), kind='stable')
+
+
+def pipeline_depth(config) -> Optional[int]:
+    """
+    Latency of one solver step in cycles, the number of stages of the solver pipeline recorded in the pipe stats of
+    the build.
+    :param config: configuration of the solver
+    :return: number of pipeline stages, None if the solver was built without pipe stats
+    """
+    return config['build_info'].get('pipe_stats', {}).get('nbr_stages')
+
+
+class _Pipeline:
+    def __init__(self, depth: int):
+        """
+        Model of the pipeline of a solver instance. It starts one step per cycle and each step takes depth cycles,
+        so up to depth ivps are calculated interleaved. Up to CYCLE_FIFO_DEPTH further ivps wait for their next step
+        in the cycle fifo. With k ivps in flight, each one advances by min(1 / depth, 1 / k) steps per cycle.
+        The virtual time counts the steps each ivp in flight advanced since the start, the end of an ivp is the
+        virtual time it is finished at.
+        :param depth: latency of one step in cycles
+        """
+        self.depth = depth
+        self.capacity = depth + CYCLE_FIFO_DEPTH
+        self.waiting = collections.deque()
+        self._in_flight = []
+        self._virtual_time = 0.0
+        self._time = 0.0
+        self.end = 0.0
+
+    def _rate(self) -> float:
+        return min(1 / self.depth, 1 / len(self._in_flight))
+
+    def next_finish(self) -> float:
+        """
+        Cycle the next ivp in flight is finished at, inf if the pipeline is empty.
+        """
+        if not self._in_flight:
+            return math.inf
+        return self._time + (self._in_flight[0] - self._virtual_time) / self._rate()
+
+    def add(self, steps: int):
+        """
+        Adds an ivp to the input fifo, it enters the pipeline as soon as the pipeline has capacity left.
+        """
+        self.waiting.append(steps)
+        self._admit()
+
+    def _admit(self):
+        while self.waiting and len(self._in_flight) < self.capacity:
+            heapq.heappush(self._in_flight, self._virtual_time + self.waiting.popleft())
+
+    def advance(self, time: float):
+        """
+        Advances the pipeline to the given cycle.
+        """
+        while self._in_flight and self.next_finish() <= time:
+            self._time = self.next_finish()
+            self._virtual_time = heapq.heappop(self._in_flight)
+            self.end = self._time
+            self._admit()
+        if self._in_flight:
+            self._virtual_time += (time - self._time) * self._rate()
+        self._time = time
+
+
+def predict_schedule(steps, nbr_solver: int, depth: int) -> np.ndarray:
+    """
+    Simulates the dispatcher, which assigns each dataset in buffer order to the first solver instance with space left
+    in its input fifo, and the pipelines of the solver instances, see _Pipeline.
+    The transfers between host and fpga are not modelled.
+    :param steps: step count of each dataset in buffer order
+    :param nbr_solver: number of solver instances
+    :param depth: latency of one step in cycles, see pipeline_depth
+    :return: cycle each solver instance is finished at
+    """
+    pipelines = [_Pipeline(depth) for _ in range(nbr_solver)]
+    now = 0.0
+    for dataset_steps in np.asarray(steps).tolist():
+        while True:
+            for pipeline in pipelines:
+                pipeline.advance(now)
+            ready = [pipeline for pipeline in pipelines if len(pipeline.waiting) < INPUT_FIFO_DEPTH]
+            if ready:
+                break
+            now = min(pipeline.next_finish() for pipeline in pipelines)
+        ready[0].add(dataset_steps)
+    for pipeline in pipelines:
+        pipeline.advance(math.inf)
+    return np.array([pipeline.end for pipeline in pipelines])
+
+
+def predict_makespan(steps, nbr_solver: int, depth: int) -> float:
+    """
+    Number of cycles until all solver instances are finished, see predict_schedule.
+    """
+    return float(np.max(predict_schedule(steps, nbr_solver, depth)))
+
+
+class TailReport:
+    def __init__(self, nbr_solver: int, depth: int):
+        """
+        Collects the predicted makespan and tail of calculations, for the order the datasets were added in and for
+        lpt order. The tail is the time from the first solver instance running out of datasets until the last one is
+        finished, i.e. the time some solver instances are idle at the end. Predictions are in cycles of the solver
+        clock, see predict_schedule. The achieved duration is measured on the host and therefore includes the
+        transfers and the start up of the calculation.
+        :param nbr_solver: number of solver instances
+        :param depth: latency of one step in cycles, see pipeline_depth
+        """
+        self.nbr_solver = nbr_solver
+        self.depth = depth
+        self.nbr_batches = 0
+        self.predicted = 0.0
+        self.predicted_tail = 0.0
+        self.predicted_lpt = 0.0
+        self.predicted_lpt_tail = 0.0
+        self.duration = 0.0
+
+    def add(self, steps, duration: float):
+        """
+        Adds a finished calculation.
+        :param steps: step count of each used slot in buffer order, including empty slots
+        :param duration: measured duration of the calculation in seconds
+        """
+        steps = np.asarray(steps)
+        ends = predict_schedule(steps, self.nbr_solver, self.depth)
+        lpt_ends = predict_schedule(steps[lpt_order(steps)], self.nbr_solver, self.depth)
+        self.nbr_batches += 1
+        self.predicted += np.max(ends)
+        self.predicted_tail += np.max(ends) - np.min(ends)
+        self.predicted_lpt += np.max(lpt_ends)
+        self.predicted_lpt_tail += np.max(lpt_ends) - np.min(lpt_ends)
+        self.duration += duration
+
+    def summary(self) -> Dict:
+        """
+        :return: dictionary with the number of batches, the predicted makespan and tail in cycles in the order the
+                 datasets were added in (predicted, predicted_tail) and in lpt order (predicted_lpt,
+                 predicted_lpt_tail) and the achieved duration in seconds
+        """
+        return {
+            'batches': self.nbr_batches,
+            'predicted': float(self.predicted),
+            'predicted_tail': float(self.predicted_tail),
+            'predicted_lpt': float(self.predicted_lpt),
+            'predicted_lpt_tail': float(self.predicted_lpt_tail),
+            'achieved': self.duration
+        }
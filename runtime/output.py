@@ -0,0 +1,147 @@
+import json
+from typing import Dict
+
+import numpy as np
+
+
+class ResultWriter:
+    def __init__(self, path: str, system_size: int, nbr_datasets: int):
+        """
+        Streams solver results to a file while they are decoded.
+        Batches as yielded by Solver.solve_batches can be written in any order, each result is placed at the
+        position (index) of its dataset in the inputs.
+        :param path: path of the output file
+        :param system_size: size of the ode system
+        :param nbr_datasets: number of results to be written
+        """
+        self.path = path
+        self.system_size = system_size
+        self.nbr_datasets = nbr_datasets
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, batch: Dict):
+        """
+        Writes a batch of results.
+        :param batch: dictionary with arrays of index, id, x and y
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class NpyWriter(ResultWriter):
+    """
+    Writes a NumPy .npy file containing a structured array with the fields id, x and y (of shape (system_size,)).
+    The file is memory-mapped, load it with np.load(path, mmap_mode='r') to avoid reading it at once.
+    """
+    def __init__(self, path, system_size, nbr_datasets):
+        super().__init__(path, system_size, nbr_datasets)
+        dtype = np.dtype([('id', '<i8'), ('x', '<f8'), ('y', '<f8', (system_size,))])
+        self._data = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(nbr_datasets,))
+
+    def write(self, batch):
+        self._data['id'][batch['index']] = batch['id']
+        self._data['x'][batch['index']] = batch['x']
+        self._data['y'][batch['index']] = batch['y']
+
+    def close(self):
+        if self._data is not None:
+            self._data.flush()
+            self._data = None
+
+
+class RawWriter(ResultWriter):
+    """
+    Writes the columns id (int64), x (float64) and y (float64, of shape (nbr_datasets, system_size)) one after
+    another as little-endian raw data. Offset, dtype and shape of each column are described by a JSON sidecar
+    file (path + '.json'), each column can be memory-mapped with np.memmap.
+    """
+    def __init__(self, path, system_size, nbr_datasets):
+        super().__init__(path, system_size, nbr_datasets)
+        columns = [
+            ('id', '<i8', [nbr_datasets]),
+            ('x', '<f8', [nbr_datasets]),
+            ('y', '<f8', [nbr_datasets, system_size])
+        ]
+        self.layout = {'columns': []}
+        offset = 0
+        for name, dtype, shape in columns:
+            self.layout['columns'].append({'name': name, 'dtype': dtype, 'shape': shape, 'offset': offset})
+            offset += np.dtype(dtype).itemsize * int(np.prod(shape))
+
+        with open(path, 'wb') as fd:
+            fd.truncate(offset)
+        self._columns = {}
+        if offset > 0:
+            for column in self.layout['columns']:
+                self._columns[column['name']] = np.memmap(
+                    path, dtype=column['dtype'], mode='r+', offset=column['offset'], shape=tuple(column['shape']))
+        with open(path + '.json', 'w') as fd:
+            json.dump(self.layout, fd, indent=4)
+
+    def write(self, batch):
+        for name, column in self._columns.items():
+            column[batch['index']] = batch[name]
+
+    def close(self):
+        for column in self._columns.values():
+            column.flush()
+        self._columns = {}
+
+
+def read_raw(path: str) -> Dict:
+    """
+    Memory-maps the columns of a file written by RawWriter.
+    :return: dictionary with arrays of id, x and y
+    """
+    with open(path + '.json') as fd:
+        layout = json.load(fd)
+    return {
+        column['name']: np.memmap(path, dtype=column['dtype'], mode='r', offset=column['offset'],
+                                  shape=tuple(column['shape']))
+        if np.prod(column['shape']) > 0 else np.empty(column['shape'], dtype=column['dtype'])
+        for column in layout['columns']
+    }
+
+
+class JsonWriter(ResultWriter):
+    """
+    Writes all results as indented JSON list of objects with id, x and y, intended for debugging only.
+    The results are kept in memory until the writer is closed.
+    """
+    def __init__(self, path, system_size, nbr_datasets):
+        super().__init__(path, system_size, nbr_datasets)
+        self._results = [None] * nbr_datasets
+
+    def write(self, batch):
+        for index, package_id, x, y in zip(
+                batch['index'].tolist(), batch['id'].tolist(), batch['x'].tolist(), batch['y'].tolist()):
+            self._results[index] = {'id': package_id, 'x': x, 'y': y}
+
+    def close(self):
+        if self._results is not None:
+            with open(self.path, 'w') as fd:
+                json.dump([result for result in self._results if result is not None], fd, sort_keys=True, indent=4)
+            self._results = None
+
+
+OUTPUT_FORMATS = {
+    'npy': NpyWriter,
+    'raw': RawWriter,
+    'json': JsonWriter
+}
+
+
+def open_writer(output_format: str, path: str, system_size: int, nbr_datasets: int) -> ResultWriter:
+    """
+    Creates a result writer by the name of its format, see OUTPUT_FORMATS.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise NotImplementedError('Unknown output format: %s' % output_format)
+    return OUTPUT_FORMATS[output_format](path, system_size, nbr_datasets)
@@ -1,32 +1,189 @@
-import os
+import asyncio
+import functools
+import itertools
 import time
+import uuid
+from typing import Dict, List, Optional, Tuple
 
-from runtime.interface import Solver
-from utils import slv
+import numpy as np
+
+from runtime import wait
+from runtime.cache import ResultCache
+from runtime.cpu import CpuSolver
+from runtime.inputs import InputSource, open_source
+from runtime.interface import BufferPool, Solver, broadcast_inputs, merge_results
+from runtime.multi import MultiSolver
+from runtime.ordering import TailReport, pipeline_depth
+from runtime.output import open_writer
+from runtime.scheduler import Job, JobScheduler
+from runtime.server import SolverServer
+from runtime.tracing import ChromeTracer, Tracer
+from utils import num, slv
 from utils.dict_update import deep_update
 
 
-def _load_bitstream(gbs_path: str):
+# Byte offsets of the afu id registers in the device feature header
+AFU_ID_L = 0x0008
+AFU_ID_H = 0x0010
+
+
+def _devices() -> List[Tuple]:
     """
-    Loads a bitstream given by file to a connected FPGA card.
+    Enumerates the connected FPGA cards, the fpga device and the afu of a card are matched by their pci address.
+    :return: list of (device token, afu token) tuples, one per card, the afu token is None if no afu is found
     """
     from opae import fpga
 
-    tokens = fpga.enumerate(type=fpga.DEVICE)
-    if tokens is None or len(tokens) < 1:
-        raise Exception('Could not find any compatible FPGA.')
-    with open(gbs_path, 'rb') as fd, fpga.open(tokens[0]) as device:
+    def pci_address(token):
+        properties = fpga.properties(token)
+        return properties.bus, properties.device
+
+    devices = fpga.enumerate(type=fpga.DEVICE) or []
+    accelerators = {pci_address(token): token for token in fpga.enumerate(type=fpga.ACCELERATOR) or []}
+    return [(token, accelerators.get(pci_address(token))) for token in devices]
+
+
+def _loaded_afu_id(afu_token=None) -> Optional[uuid.UUID]:
+    """
+    Reads the id of the afu currently loaded on a connected FPGA card from its device feature header.
+    :param afu_token: opae token of the afu to read, the first afu found is used if not given
+    :return: afu id or None if no afu is loaded
+    """
+    from opae import fpga
+
+    if afu_token is None:
+        tokens = fpga.enumerate(type=fpga.ACCELERATOR)
+        if tokens is None or len(tokens) < 1:
+            return None
+        afu_token = tokens[0]
+    with fpga.open(afu_token, fpga.OPEN_SHARED) as handle:
+        afu_id_l = handle.read_csr64(AFU_ID_L)
+        afu_id_h = handle.read_csr64(AFU_ID_H)
+    return uuid.UUID(bytes=afu_id_h.to_bytes(8, 'big') + afu_id_l.to_bytes(8, 'big'))
+
+
+def _load_bitstream(slv_path: str, afu_id: str = None, force_reload=False, device: Tuple = None) -> bool:
+    """
+    Loads the bitstream embedded in a solver file to a connected FPGA card.
+    The card is only reconfigured if the loaded afu differs from afu_id or if force_reload is set.
+    :param slv_path: path of the solver file, the bitstream is extracted to the gbs cache on demand
+    :param afu_id: uuid of the afu contained in the bitstream, the card is always reconfigured if not given
+    :param force_reload: reconfigure even if the afu is already loaded
+    :param device: (device token, afu token) of the card as returned by _devices, the first card is used if not given
+    :return: true if the card was reconfigured
+    """
+    from opae import fpga
+
+    device_token, afu_token = device if device is not None else (None, None)
+    if not force_reload and afu_id is not None and _loaded_afu_id(afu_token) == uuid.UUID(afu_id):
+        return False
+
+    if device_token is None:
+        tokens = fpga.enumerate(type=fpga.DEVICE)
+        if tokens is None or len(tokens) < 1:
+            raise Exception('Could not find any compatible FPGA.')
+        device_token = tokens[0]
+    gbs_path = slv.extract_gbs(slv_path)
+    with open(gbs_path, 'rb') as fd, fpga.open(device_token) as device:
         device.reconfigure(0, fd)
+    return True
+
+
+RUN_MODES = ['single', 'chunked', 'pipelined']
+
+# Where ivps are solved: on the fpga, on the cpu only or split between fpga and cpu
+BACKENDS = ['fpga', 'cpu', 'hybrid']
 
+# Number of datasets read from an input source at once
+INPUT_CHUNK_SIZE = 1048576
 
-def run(slv_path: str, runtime_config=None, amount_data=None):
+
+def _solve_source(solve_chunks, source: InputSource, **kwargs):
+    """
+    Solves all datasets of an input source, its chunks are read as the solver takes them.
+    :param solve_chunks: function solving chunks of datasets like Solver.solve_chunks, see _cached
+    :param kwargs: additional arguments of solve_chunks
+    :return: generator of dictionaries with arrays of index (position of the dataset in the source), id, x and y
+    """
+    return solve_chunks(source.chunks(INPUT_CHUNK_SIZE), **kwargs)
+
+
+def _per_chunk(solve_batches):
+    """
+    Adapts a solve_batches method to the interface of Solver.solve_chunks, the chunks are solved one after another.
+    """
+    def solve_chunks(chunks, **kwargs):
+        for offset, (x_start, y_start, h, n) in chunks:
+            for batch in solve_batches(x_start, y_start, h, n, **kwargs):
+                batch['index'] += offset
+                yield batch
+
+    return solve_chunks
+
+
+def _store_results(batches, system_size: int, nbr_datasets: int, output: str = None, output_format='npy'):
+    """
+    Writes result batches to an output file as soon as they are finished, or collects them if no output is given.
+    :param batches: iterable of dictionaries with arrays of index, id, x and y
+    :param nbr_datasets: number of results expected
+    :param output: path of the output file
+    :param output_format: name of the file format, see output.OUTPUT_FORMATS
+    :return: list of dictionaries with id, x and y if no output is given, otherwise None
+    """
+    if output is None:
+        results = merge_results(batches, system_size)
+        return [
+            {'id': package_id, 'x': x, 'y': y}
+            for package_id, x, y in zip(results['id'].tolist(), results['x'].tolist(), results['y'].tolist())
+        ]
+    with open_writer(output_format, output, system_size, nbr_datasets) as writer:
+        for batch in batches:
+            writer.write(batch)
+    return None
+
+
+def run(slv_path: str, runtime_config=None, amount_data=None, mode='chunked', wait_policy='spin', timeout=None,
+        force_reload=False, nbr_devices=1, output: str = None, output_format='npy', input_path: str = None,
+        grid: Dict = None, trace: str = None, order='input', report_tail=False, cache: str = None,
+        cache_size=1 << 30, backend='fpga', cpu_threads=None):
     """
     Loads and run a given solver.
-    :return:
+    :param mode: single: solve only as many ivps as fit into one buffer,
+                 chunked: split all ivps into buffer sized batches, the solver is restarted for each batch
+                 pipelined: like chunked, but adding and fetching of batches overlaps the fpga calculation
+    :param wait_policy: name of the policy used to wait for the fpga, see wait.WAIT_POLICIES
+    :param timeout: maximum duration of one batch in seconds
+    :param force_reload: reconfigure the fpga even if the solver is already loaded
+    :param nbr_devices: number of fpga cards to use, 0 to use all connected cards.
+                        Using more than one card is only supported in chunked mode.
+    :param output: path of a file the results are streamed to while they are decoded
+    :param output_format: format of the output file, see output.OUTPUT_FORMATS
+    :param input_path: .npz or .csv file with the inputs of each ivp, see inputs.NpzSource and inputs.CsvSource
+    :param grid: parameter grid spec, see inputs.GridSource
+                 The configured ivp is solved amount_data times if neither input_path nor grid is given.
+    :param trace: path of a file the timing of the runtime steps is written to in the Chrome trace event format
+    :param order: order the ivps of a chunk are added in, input or lpt (longest processing time first),
+                  see Solver.solve_batches. Only input is supported in single mode.
+    :param report_tail: print the predicted tail of the calculations in the order used and in lpt order, see
+                        ordering.TailReport. Only supported if a single card is used.
+    :param cache: path of a result cache database, see cache.ResultCache.
+                  Only supported in chunked or pipelined mode with the fpga backend.
+    :param cache_size: maximum size of the cached results in bytes
+    :param backend: fpga: solve on the fpga cards,
+                    cpu: solve on the cpu without accessing an fpga, see cpu.CpuSolver,
+                    hybrid: split the ivps between the fpga cards and the cpu by their measured throughput.
+                    The cpu and hybrid backends are only supported in chunked mode.
+    :param cpu_threads: number of threads used by the cpu backend, defaults to the number of cpus
+    :return: list of dictionaries with id, x and y if no output is given, otherwise None
     """
-    runtime_path = os.path.dirname(os.path.realpath(__file__))
-    gbs_path = os.path.join(runtime_path, 'solver.gbs')
-    config = slv.unpack(slv_path, gbs_path)
+    assert mode in RUN_MODES
+    assert backend in BACKENDS
+    assert (nbr_devices == 1 and backend == 'fpga') or mode == 'chunked'
+    assert (nbr_devices == 1 and backend == 'fpga') or not report_tail
+    assert cache is None or (mode != 'single' and backend == 'fpga')
+    # Single mode keeps the first batch only, with lpt it would contain arbitrary positions of the inputs
+    assert mode != 'single' or order == 'input'
+    config = slv.read_config(slv_path)
 
     # Patch loaded configs with runtime configuration
     if runtime_config is not None:
@@ -38,57 +195,199 @@ def run(slv_path: str, runtime_config=None, amount_data=None):
         info_msg += ' with version ' + config['build_info']['version']
     if len(info_msg) > 0:
         print('Solver was build' + info_msg + '...')
+    if report_tail and pipeline_depth(config) is None:
+        raise Exception('The tail report requires a solver built with pipe stats.')
 
+    tracer = ChromeTracer() if trace is not None else None
+    result_cache = ResultCache(cache, cache_size) if cache is not None else None
+    try:
+        with open_source(config['problem'], amount_data, input_path, grid) as source:
+            if backend == 'cpu':
+                return _run_cpu(config, source, output, output_format, order, cpu_threads)
+            if nbr_devices != 1 or backend == 'hybrid':
+                cpu_solver = CpuSolver(config, nbr_threads=cpu_threads) if backend == 'hybrid' else None
+                return _run_multi(slv_path, config, source, nbr_devices, wait_policy, timeout, force_reload,
+                                  output, output_format, tracer, order, result_cache, cpu_solver)
+            return _run_single(slv_path, config, source, mode, wait_policy, timeout, force_reload,
+                               output, output_format, tracer, order, report_tail, result_cache)
+    finally:
+        if tracer is not None:
+            tracer.save(trace)
+        if result_cache is not None:
+            print('Result cache: %d hit(s), %d resumed, %d miss(es)...' % (
+                result_cache.nbr_hits, result_cache.nbr_resumed, result_cache.nbr_misses))
+            result_cache.close()
+
+
+def _cached(solver, config, result_cache: Optional[ResultCache]):
+    """
+    Returns a function solving chunks of datasets with a solver like Solver.solve_chunks, using the result cache if any.
+    Only a Solver without result cache solves all chunks in a single run, otherwise the chunks are solved one after
+    another.
+    """
+    if result_cache is None:
+        return solver.solve_chunks if isinstance(solver, Solver) else _per_chunk(solver.solve_batches)
+    uuid = config['build_info'].get('uuid')
+    if uuid is None:
+        raise Exception('The result cache requires a solver with an uuid.')
+    return _per_chunk(functools.partial(result_cache.solve_batches, solver.solve_batches, solver.reserve_ids, uuid,
+                                        len(config['problem']['components']),
+                                        num.NumberType.from_config(config.get('numeric', {}))))
+
+
+def _run_single(slv_path: str, config, source: InputSource, mode, wait_policy, timeout, force_reload,
+                output=None, output_format='npy', tracer: Tracer = None, order='input', report_tail=False,
+                result_cache: ResultCache = None):
+    """
+    Runs a given solver on one fpga card, see run.
+    """
     # Load bitstream on FPGA
     print('Loading bitstream on fpga...')
-    _load_bitstream(gbs_path)
+    if not _load_bitstream(slv_path, config['build_info'].get('uuid'), force_reload):
+        print('Solver is already loaded, skipped reconfiguration...')
 
     # Access AFU (get Interface Object)
     print('Aquiring ownership of afu...')
-    with Solver(config, 2097152) as solver:
-        print('Preparing input...')
-        nbr_inputs = 0
-        awaiting_ids = {}
-        while nbr_inputs < amount_data and not solver.input_full():
-            package_id = solver.add_input(
-                config['problem']['x'],
-                config['problem']['y'],
-                config['problem']['h'],
-                config['problem']['n']
-            )
-            nbr_inputs += 1
-            awaiting_ids[package_id] = False
+    with Solver(config, 2097152, nbr_buffers=2 if mode == 'pipelined' else 1,
+                wait_policy=wait.from_name(wait_policy), timeout=timeout, tracer=tracer) as solver:
+        print('Solving %d ivp(s)...' % len(source))
+        tail_report = TailReport(solver.nbr_solver, pipeline_depth(config)) if report_tail else None
+        batches = _solve_source(_cached(solver, config, result_cache), source,
+                                pipelined=mode == 'pipelined', order=order, tail_report=tail_report)
+        nbr_results = len(source)
+        if mode == 'single':
+            batches = itertools.islice(batches, 1)
+            nbr_results = min(len(source), solver.input_capacity)
+        results = _store_results(batches, source.system_size, nbr_results, output, output_format)
+        print('Solver finished...')
+        if nbr_results < len(source):
+            print('Only %d of %d ivp(s) fit into the buffer.' % (nbr_results, len(source)))
+        if tail_report is not None:
+            summary = tail_report.summary()
+            print('Tail of %d calculation(s): predicted %d of %d cycles, in lpt order %d of %d cycles, '
+                  'achieved duration %.6f s...' % (
+                      summary['batches'], summary['predicted_tail'], summary['predicted'],
+                      summary['predicted_lpt_tail'], summary['predicted_lpt'], summary['achieved']))
 
-        print('Starting solver...')
-        solver.start()
+    return results
+
+
+def _run_multi(slv_path: str, config, source: InputSource, nbr_devices, wait_policy, timeout, force_reload,
+               output=None, output_format='npy', tracer: Tracer = None, order='input',
+               result_cache: ResultCache = None, cpu_solver: CpuSolver = None):
+    """
+    Runs a given solver on several fpga cards and the cpu solver if given, see run.
+    """
+    devices = _devices()
+    if nbr_devices > len(devices):
+        raise Exception('Only %d FPGA card(s) found, %d requested.' % (len(devices), nbr_devices))
+    if nbr_devices > 0:
+        devices = devices[:nbr_devices]
+    if len(devices) < 1 or any(afu_token is None for _, afu_token in devices):
+        raise Exception('Could not find any compatible FPGA.')
 
-        while not solver.fin:
-            pass
+    # Load bitstream on all FPGAs
+    for index, device in enumerate(devices):
+        print('Loading bitstream on fpga %d...' % index)
+        if not _load_bitstream(slv_path, config['build_info'].get('uuid'), force_reload, device):
+            print('Solver is already loaded on fpga %d, skipped reconfiguration...' % index)
 
-        solver.stop()
+    # Access AFUs (get Interface Objects)
+    print('Aquiring ownership of %d afu(s)...' % len(devices))
+    with MultiSolver(config, 2097152, [afu_token for _, afu_token in devices],
+                     wait_policy_factory=lambda: wait.from_name(wait_policy), timeout=timeout,
+                     tracer=tracer, cpu_solver=cpu_solver) as solver:
+        print('Solving %d ivp(s)...' % len(source))
+        batches = _solve_source(_cached(solver, config, result_cache), source, order=order)
+        results = _store_results(batches, source.system_size, len(source), output, output_format)
+        nbr_solved = solver.nbr_solved
+        if cpu_solver is not None:
+            print('Solver finished, ivp(s) per fpga: %s, on cpu: %d...' % (
+                ', '.join(map(str, nbr_solved[:-1])), nbr_solved[-1]))
+        else:
+            print('Solver finished, ivp(s) per fpga: %s...' % ', '.join(map(str, nbr_solved)))
+
+    return results
+
+
+def _run_cpu(config, source: InputSource, output=None, output_format='npy', order='input', nbr_threads=None):
+    """
+    Runs a given solver on the cpu, see run.
+    """
+    with CpuSolver(config, nbr_threads=nbr_threads) as solver:
+        print('Solving %d ivp(s) on the cpu...' % len(source))
+        batches = _solve_source(_per_chunk(solver.solve_batches), source, order=order)
+        results = _store_results(batches, source.system_size, len(source), output, output_format)
         print('Solver finished...')
 
-        results = []
-        while not all(awaiting_ids.values()):
-            package_res = solver.fetch_output()
-            if package_res is None:
-                raise Exception('Did not receive all outputs.')
-            if package_res['id'] in awaiting_ids:
-                if awaiting_ids[package_res['id']]:
-                    raise Exception('Already got results for this id.')
-                awaiting_ids[package_res['id']] = True
-                results.append(package_res)
     return results
 
 
-def benchmark(slv_path: str, runtime_config=None, amount_data=1000):
+BENCHMARK_PERCENTILES = [50, 90, 99]
+
+
+def _summarize(samples: List[float]) -> Dict:
+    """
+    Summarizes timing samples by mean, minimum, maximum and the percentiles BENCHMARK_PERCENTILES.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    summary = {
+        'mean': float(samples.mean()),
+        'min': float(samples.min()),
+        'max': float(samples.max())
+    }
+    for percentile in BENCHMARK_PERCENTILES:
+        summary['p%d' % percentile] = float(np.percentile(samples, percentile))
+    return summary
+
+
+def _benchmark_iteration(solver: Solver, x_start, y_start, h, n) -> Dict:
+    """
+    Solves all given datasets once, the solver is restarted for each buffer sized batch.
+    :return: dictionary with the durations in seconds of the phases pack (adding inputs to the buffer),
+             compute (transfer and calculation on the fpga until fin is set), decode (fetching the results) and total
+    """
+    timing = {'pack': 0.0, 'compute': 0.0, 'decode': 0.0}
+    offset = 0
+    while offset < len(x_start):
+        timing_start = time.perf_counter()
+        ids = solver.add_inputs(x_start[offset:], y_start[offset:], h[offset:], n[offset:])
+        timing_packed = time.perf_counter()
+        solver.start()
+        try:
+            solver.wait()
+        finally:
+            timing_computed = time.perf_counter()
+            solver.stop()
+        solver.fetch_results(ids)
+        timing_decoded = time.perf_counter()
+
+        timing['pack'] += timing_packed - timing_start
+        timing['compute'] += timing_computed - timing_packed
+        timing['decode'] += timing_decoded - timing_computed
+        offset += len(ids)
+    timing['total'] = timing['pack'] + timing['compute'] + timing['decode']
+    return timing
+
+
+def benchmark(slv_path: str, runtime_config=None, amounts=(1, 10, 100, 1000, 10000), warmup=1, repetitions=10,
+              wait_policy='spin', timeout=None, force_reload=False, trace: str = None) -> Dict:
     """
     Loads and benchmark a given solver.
-    :return:
+    The card is programmed once, all amounts are measured using the same solver instance.
+    :param amounts: numbers of ivps to solve per iteration, each amount is benchmarked separately
+    :param warmup: number of unmeasured iterations per amount
+    :param repetitions: number of measured iterations per amount
+    :param wait_policy: name of the policy used to wait for the fpga, see wait.WAIT_POLICIES
+    :param timeout: maximum duration of the calculation in seconds
+    :param force_reload: reconfigure the fpga even if the solver is already loaded
+    :param trace: path of a file the timing of the runtime steps is written to in the Chrome trace event format
+    :return: json serializable dictionary with the solver build info, the benchmark settings and one result per
+             amount containing the throughput in ivps/s and steps/s (based on the median durations) and the timing
+             summaries of the phases pack, compute, decode and total
     """
-    runtime_path = os.path.dirname(os.path.realpath(__file__))
-    gbs_path = os.path.join(runtime_path, 'solver.gbs')
-    config = slv.unpack(slv_path, gbs_path)
+    assert repetitions > 0
+    config = slv.read_config(slv_path)
 
     # Patch loaded configs with runtime configuration
     if runtime_config is not None:
@@ -103,30 +402,164 @@ def benchmark(slv_path: str, runtime_config=None, amount_data=1000):
 
     # Load bitstream on FPGA
     print('Loading bitstream on fpga...')
-    _load_bitstream(gbs_path)
+    if not _load_bitstream(slv_path, config['build_info'].get('uuid'), force_reload):
+        print('Solver is already loaded, skipped reconfiguration...')
+
+    report = {
+        'solver': {
+            'path': slv_path,
+            'uuid': config['build_info'].get('uuid'),
+            'version': config['build_info'].get('version'),
+            'datetime': config['build_info'].get('datetime'),
+            'numeric': config.get('numeric', {}),
+            'nbr_solver': config.get('nbr_solver') or 1,
+            'system_size': len(config['problem']['components'])
+        },
+        'settings': {
+            'problem': {key: config['problem'][key] for key in ['x', 'y', 'h', 'n']},
+            'warmup': warmup,
+            'repetitions': repetitions,
+            'wait_policy': wait_policy
+        },
+        'results': []
+    }
 
     # Access AFU (get Interface Object)
     print('Aquiring ownership of afu...')
-    with Solver(config, 2097152) as solver:
-        print('Preparing input...')
-        nbr_inputs = 0
-        while nbr_inputs < amount_data and not solver.input_full():
-            solver.add_input(
-                config['problem']['x'],
+    tracer = ChromeTracer() if trace is not None else None
+    with Solver(config, 2097152, wait_policy=wait.from_name(wait_policy), timeout=timeout, tracer=tracer) as solver:
+        for amount_data in amounts:
+            x_start, y_start, h, n = broadcast_inputs(
+                solver.system_size,
+                np.full(amount_data, config['problem']['x']),
                 config['problem']['y'],
                 config['problem']['h'],
                 config['problem']['n']
             )
-            nbr_inputs += 1
-
-        print('Starting solver...')
-        timing_start = time.time()
-        solver.start()
+            nbr_steps = int(np.maximum(n, 1).sum())
 
-        while not solver.fin:
-            pass
+            print('Benchmarking %d ivp(s)...' % amount_data)
+            for _ in range(warmup):
+                _benchmark_iteration(solver, x_start, y_start, h, n)
+            timings = [_benchmark_iteration(solver, x_start, y_start, h, n) for _ in range(repetitions)]
 
-        timing_end = time.time()
-        solver.stop()
+            timing = {phase: _summarize([t[phase] for t in timings]) for phase in ['pack', 'compute', 'decode', 'total']}
+            report['results'].append({
+                'amount': amount_data,
+                'steps': nbr_steps,
+                'ivps_per_s': amount_data / timing['total']['p50'],
+                'steps_per_s': nbr_steps / timing['compute']['p50'],
+                'timing': timing
+            })
         print('Solver finished...')
-    return timing_end - timing_start
+    if tracer is not None:
+        tracer.save(trace)
+    return report
+
+
+def serve(slv_path: str, socket_path: str, runtime_config=None, max_latency=0.001, wait_policy='spin', timeout=None,
+          force_reload=False):
+    """
+    Loads a given solver and serves it on a unix socket until SIGINT or SIGTERM is received, see SolverServer.
+    :param socket_path: path of the unix socket
+    :param max_latency: time in seconds to wait for further requests before starting a batch
+    :param wait_policy: name of the policy used to wait for the fpga, see wait.WAIT_POLICIES
+    :param timeout: maximum duration of one batch in seconds
+    :param force_reload: reconfigure the fpga even if the solver is already loaded
+    """
+    config = slv.read_config(slv_path)
+
+    # Patch loaded configs with runtime configuration
+    if runtime_config is not None:
+        deep_update(config, runtime_config)
+    info_msg = ''
+    if config['build_info'].get('datetime') is not None:
+        info_msg += ' at ' + config['build_info']['datetime']
+    if config['build_info'].get('version') is not None:
+        info_msg += ' with version ' + config['build_info']['version']
+    if len(info_msg) > 0:
+        print('Solver was build' + info_msg + '...')
+
+    # Load bitstream on FPGA
+    print('Loading bitstream on fpga...')
+    if not _load_bitstream(slv_path, config['build_info'].get('uuid'), force_reload):
+        print('Solver is already loaded, skipped reconfiguration...')
+
+    # Access AFU (get Interface Object)
+    print('Aquiring ownership of afu...')
+    with Solver(config, 2097152, wait_policy=wait.from_name(wait_policy), timeout=timeout) as solver:
+        print('Serving on %s...' % socket_path)
+        asyncio.run(SolverServer(solver, config['problem'], socket_path, max_latency).serve_forever())
+        print('Solver stopped...')
+
+
+def _execute_jobs(bitstream: str, jobs: List[Job], buffer_pools: Dict[str, BufferPool], wait_policy='spin',
+                  timeout=None) -> Optional[float]:
+    """
+    Solves the jobs of one bitstream, see JobScheduler.process.
+    The bitstream is loaded from the solver file of the first job, consecutive jobs of the same solver file share a
+    solver session.
+    :param buffer_pools: buffer pool of the loaded bitstream by id, reused if the bitstream is still loaded
+    :return: duration of the reconfiguration in seconds, None if the bitstream was already loaded
+    """
+    slv_path = jobs[0].slv_path
+    config = slv.read_config(slv_path)
+
+    # The afu must be closed before the fpga is reconfigured
+    buffer_pool = buffer_pools.pop(bitstream, None)
+    for other_pool in buffer_pools.values():
+        other_pool.close()
+    buffer_pools.clear()
+
+    print('Loading bitstream of %s on fpga...' % slv_path)
+    timing_start = time.monotonic()
+    reconfigured = _load_bitstream(slv_path, config['build_info'].get('uuid'))
+    reconfiguration_time = time.monotonic() - timing_start if reconfigured else None
+    if not reconfigured:
+        print('Solver is already loaded, skipped reconfiguration...')
+
+    if reconfigured and buffer_pool is not None:
+        buffer_pool.close()
+        buffer_pool = None
+    if buffer_pool is None:
+        buffer_pool = BufferPool()
+        buffer_pool.open()
+    buffer_pools[bitstream] = buffer_pool
+
+    for job_slv_path, solver_jobs in itertools.groupby(jobs, key=lambda job: job.slv_path):
+        if job_slv_path != slv_path:
+            slv_path = job_slv_path
+            config = slv.read_config(slv_path)
+        with Solver(config, 2097152, wait_policy=wait.from_name(wait_policy), timeout=timeout,
+                    buffer_pool=buffer_pool) as solver:
+            for job in solver_jobs:
+                try:
+                    job.result = solver.solve(
+                        job.inputs.get('x', config['problem']['x']),
+                        job.inputs.get('y', config['problem']['y']),
+                        job.inputs.get('h', config['problem']['h']),
+                        job.inputs.get('n', config['problem']['n'])
+                    )
+                except Exception as e:
+                    job.error = e
+    return reconfiguration_time
+
+
+def run_jobs(scheduler: JobScheduler, wait_policy='spin', timeout=None) -> Dict:
+    """
+    Solves all jobs of a scheduler, grouped by bitstream to avoid reconfigurations of the fpga.
+    :param wait_policy: name of the policy used to wait for the fpga, see wait.WAIT_POLICIES
+    :param timeout: maximum duration of one batch in seconds
+    :return: report of the scheduler, see JobScheduler.report
+    """
+    # Keeps the afu and its buffers of the loaded solver across groups
+    buffer_pools = {}
+    try:
+        scheduler.process(lambda bitstream, jobs: _execute_jobs(bitstream, jobs, buffer_pools, wait_policy, timeout))
+    finally:
+        for buffer_pool in buffer_pools.values():
+            buffer_pool.close()
+    report = scheduler.report()
+    print('Solved %d job(s) with %d reconfiguration(s), %d in submission order, saved about %.3f s...' % (
+        report['jobs'], report['reconfigurations'], report['reconfigurations_in_order'], report['time_saved']))
+    return report
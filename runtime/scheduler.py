@@ -0,0 +1,166 @@
+import itertools
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import slv
+
+
+def bitstream_id(slv_path: str) -> str:
+    """
+    Identifies the bitstream embedded in a solver file by the uuid of its afu.
+    Solver files without uuid are identified by their real path.
+    """
+    uuid = slv.read_config(slv_path)['build_info'].get('uuid')
+    return uuid if uuid is not None else os.path.realpath(slv_path)
+
+
+class Job:
+    def __init__(self, job_id: int, slv_path: str, bitstream: str, inputs: Dict, submit_time: float):
+        """
+        Batch of ivps to be solved by a given solver.
+        :param job_id: consecutive number of the job in submission order
+        :param slv_path: path of the solver file
+        :param bitstream: id of the bitstream of the solver, see bitstream_id
+        :param inputs: solver inputs x, y, h and n, missing inputs are taken from the solver configuration
+        :param submit_time: time.monotonic() at submission
+        """
+        self.id = job_id
+        self.slv_path = slv_path
+        self.bitstream = bitstream
+        self.inputs = inputs
+        self.submit_time = submit_time
+        self.start_time = None
+        # Dictionary with arrays of id, x and y once the job is finished
+        self.result = None
+        self.error = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None or self.error is not None
+
+
+class JobScheduler:
+    def __init__(self, max_wait: float = 60.0, max_group_time: Optional[float] = None, clock=time.monotonic,
+                 bitstream_id: Callable[[str], str] = bitstream_id):
+        """
+        Queue of jobs for different solvers, reordered to solve the jobs of one bitstream in groups.
+        Solver files embedding the same bitstream share a group, even if their paths differ.
+        The jobs of the loaded bitstream are preferred, the bitstream is only changed if it has no jobs left,
+        if a job of another bitstream waits longer than max_wait or if the loaded bitstream was used for longer than
+        max_group_time while others have jobs waiting. The next bitstream is the one with the oldest waiting job,
+        jobs of the same bitstream are solved in submission order.
+        :param max_wait: maximum time in seconds a job waits for its bitstream before it is preferred,
+                         None to wait without limit
+        :param max_group_time: maximum time in seconds the loaded bitstream is kept while other jobs are waiting,
+                               None to keep it as long as it has jobs
+        :param clock: time source in seconds
+        :param bitstream_id: identifies the bitstream of a solver file
+        """
+        self.max_wait = max_wait
+        self.max_group_time = max_group_time
+        self._clock = clock
+        self._bitstream_id = bitstream_id
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._pending = []
+        self._finished = []
+        # Bitstream currently loaded and the time it was loaded
+        self._loaded = None
+        self._loaded_since = None
+        self._reconfiguration_times = []
+        # Bitstream that was already loaded when the first group was solved
+        self._initially_loaded = None
+
+    def submit(self, slv_path: str, x_start=None, y_start=None, h=None, n=None) -> Job:
+        """
+        Adds a job to the queue, inputs are broadcasted like in Solver.add_inputs.
+        Inputs not given are taken from the problem configuration of the solver.
+        The bitstream of the solver is identified on submission.
+        """
+        inputs = {
+            key: value
+            for key, value in [('x', x_start), ('y', y_start), ('h', h), ('n', n)]
+            if value is not None
+        }
+        bitstream = self._bitstream_id(slv_path)
+        with self._lock:
+            job = Job(next(self._job_ids), slv_path, bitstream, inputs, self._clock())
+            self._pending.append(job)
+        return job
+
+    @property
+    def nbr_pending(self) -> int:
+        return len(self._pending)
+
+    def next_group(self) -> Tuple[Optional[str], List[Job]]:
+        """
+        Removes the jobs to be solved next from the queue.
+        :return: id of the bitstream and its jobs in submission order, (None, []) if the queue is empty
+        """
+        with self._lock:
+            if len(self._pending) == 0:
+                return None, []
+            now = self._clock()
+            oldest = self._pending[0]
+
+            bitstream = self._loaded
+            if not any(job.bitstream == bitstream for job in self._pending):
+                bitstream = oldest.bitstream
+            elif oldest.bitstream != bitstream:
+                starving = self.max_wait is not None and now - oldest.submit_time > self.max_wait
+                exhausted = self.max_group_time is not None and self._loaded_since is not None \
+                    and now - self._loaded_since > self.max_group_time
+                if starving or exhausted:
+                    bitstream = oldest.bitstream
+
+            group = [job for job in self._pending if job.bitstream == bitstream]
+            self._pending = [job for job in self._pending if job.bitstream != bitstream]
+            if bitstream != self._loaded:
+                self._loaded = bitstream
+                self._loaded_since = now
+            return bitstream, group
+
+    def process(self, execute: Callable[[str, List[Job]], Optional[float]]):
+        """
+        Solves all jobs in the queue, including the ones submitted meanwhile.
+        :param execute: solves the given jobs of a bitstream by setting their result or error, returns the duration of
+                        the reconfiguration in seconds or None if the bitstream was already loaded
+        """
+        while True:
+            bitstream, jobs = self.next_group()
+            if bitstream is None:
+                return
+            start_time = self._clock()
+            for job in jobs:
+                job.start_time = start_time
+            reconfiguration_time = execute(bitstream, jobs)
+            with self._lock:
+                if reconfiguration_time is not None:
+                    self._reconfiguration_times.append(reconfiguration_time)
+                elif len(self._finished) == 0:
+                    self._initially_loaded = bitstream
+                self._finished.extend(jobs)
+
+    def report(self) -> Dict:
+        """
+        Compares the reconfigurations performed with the ones required if the jobs were solved in submission order.
+        The saved time is estimated by the mean of the measured reconfiguration times.
+        :return: dictionary with the number of jobs, the number of reconfigurations performed and required in
+                 submission order, the estimated time saved in seconds and the maximum wait of a job in seconds
+        """
+        with self._lock:
+            finished = sorted(self._finished, key=lambda job: job.id)
+            nbr_reconfigurations = len(self._reconfiguration_times)
+            mean_reconfiguration_time = sum(self._reconfiguration_times) / nbr_reconfigurations \
+                if nbr_reconfigurations > 0 else 0.0
+        bitstreams = [self._initially_loaded] + [job.bitstream for job in finished]
+        nbr_in_order = sum(1 for previous, bitstream in zip(bitstreams, bitstreams[1:]) if previous != bitstream)
+        return {
+            'jobs': len(finished),
+            'reconfigurations': nbr_reconfigurations,
+            'reconfigurations_in_order': nbr_in_order,
+            'time_saved': max(0, nbr_in_order - nbr_reconfigurations) * mean_reconfiguration_time,
+            'max_wait': max((job.start_time - job.submit_time for job in finished), default=0.0)
+        }
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+import signal
+import stat
+from typing import Dict
+
+from runtime.aio import AsyncSolver
+from runtime.interface import Solver
+
+# Maximum size of a single request line in bytes
+MAX_REQUEST_SIZE = 1 << 28
+
+
+class SolverServer:
+    def __init__(self, solver: Solver, problem: Dict, socket_path: str, max_latency=0.001):
+        """
+        Serves an opened solver on a unix socket.
+        Each request is a single line of json with the solver inputs x, y, h and n, broadcasted like in
+        Solver.add_inputs. Missing inputs are taken from the problem configuration. Requests of all clients are
+        coalesced into hardware batches, see AsyncSolver. Each request is answered by a line of json with the lists
+        id, x and y, ordered like the inputs, or with an error message. Use client.request to send requests.
+        :param solver: opened solver
+        :param problem: problem section of the solver configuration
+        :param socket_path: path of the unix socket
+        :param max_latency: time in seconds to wait for further requests before starting a batch
+        """
+        self._solver = solver
+        self._problem = problem
+        self._socket_path = socket_path
+        self._max_latency = max_latency
+        self._async_solver = None
+        self._writers = set()
+
+    async def _solve(self, request: Dict) -> Dict:
+        futures = self._async_solver.submit(
+            request.get('x', self._problem['x']),
+            request.get('y', self._problem['y']),
+            request.get('h', self._problem['h']),
+            request.get('n', self._problem['n'])
+        )
+        results = await asyncio.gather(*futures.values())
+        return {
+            'id': [result['id'] for result in results],
+            'x': [result['x'] for result in results],
+            'y': [result['y'] for result in results]
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if len(line) == 0:
+                    break
+                try:
+                    response = await self._solve(json.loads(line))
+                except Exception as e:
+                    response = {'error': str(e)}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def serve_forever(self):
+        """
+        Serves requests until SIGINT or SIGTERM is received.
+        Submitted datasets are still solved before returning, but the connections of all clients are closed.
+        """
+        # Remove a socket left over by a previous server
+        if os.path.exists(self._socket_path) and stat.S_ISSOCK(os.stat(self._socket_path).st_mode):
+            os.unlink(self._socket_path)
+
+        loop = asyncio.get_running_loop()
+        stopped = asyncio.Event()
+        for signum in [signal.SIGINT, signal.SIGTERM]:
+            loop.add_signal_handler(signum, stopped.set)
+
+        async with AsyncSolver(self._solver, self._max_latency) as async_solver:
+            self._async_solver = async_solver
+            server = await asyncio.start_unix_server(self._handle, path=self._socket_path, limit=MAX_REQUEST_SIZE)
+            try:
+                await stopped.wait()
+            finally:
+                server.close()
+                # Disconnect idle clients, otherwise closing the server waits for them
+                for writer in list(self._writers):
+                    writer.close()
+                await server.wait_closed()
+                os.unlink(self._socket_path)
+                for signum in [signal.SIGINT, signal.SIGTERM]:
+                    loop.remove_signal_handler(signum)
+
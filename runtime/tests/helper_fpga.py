@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+
+from framework import codec
+from runtime.interface import BufferPool, _BufferPair
+from utils import num
+
+CONFIG = {
+    'problem': {'components': ['y[1]', 'y[0]'], 'x': 0.0, 'y': [1.0, 2.0], 'h': 0.25, 'n': 4},
+    'build_info': {
+        'uuid': '00000000-0000-0000-0000-000000000001',
+        'csr_addresses': {'input_addr': 0x20, 'output_addr': 0x30, 'buffer_size': 0x40, 'enb': 0x50, 'fin': 0x60}
+    }
+}
+
+
+def expected_results(x_start, y_start, h, n):
+    """Outputs of the fake fpga, x is advanced by max(n, 1) steps and y is scaled by its number of steps."""
+    steps = np.maximum(n, 1)
+    return x_start + h * steps, y_start * steps[:, np.newaxis]
+
+
+class FakeBuffer(bytearray):
+    """Shared buffer in host memory, supports the part of the opae buffer interface used by the runtime."""
+    def __init__(self, size, io_address):
+        super().__init__(size)
+        self._io_address = io_address
+
+    def io_address(self):
+        return self._io_address
+
+    def fill(self, value):
+        self[:] = bytes([value]) * len(self)
+
+
+class FakeHandle:
+    def __init__(self, config):
+        """
+        Afu handle emulating the solver on the host, the calculation is done as soon as enb is set.
+        The fpga processes every slot of the used input chunks and writes one output per slot, in the order of the
+        slots unless reverse_outputs is set. drop_output and duplicate_output corrupt the outputs of the next
+        calculation by overwriting the output of the first input with an empty output or the output of the second
+        input. step_duration emulates the speed of a card, the calculation takes that many seconds per solver step.
+        """
+        self._addresses = {key: val << 2 for key, val in config['build_info']['csr_addresses'].items()}
+        self._codec = codec.get_codec(len(config['problem']['components']),
+                                      num.NumberType.from_config(config.get('numeric', {})))
+        self._csr = {}
+        # Allocated buffers by io address
+        self._buffers = {}
+        self.reverse_outputs = False
+        self.drop_output = False
+        self.duplicate_output = False
+        self.step_duration = 0
+        # Input buffer of each started calculation
+        self.started = []
+
+    def allocate(self, size) -> FakeBuffer:
+        buffer = FakeBuffer(size, (len(self._buffers) + 1) << 12)
+        self._buffers[buffer.io_address()] = buffer
+        return buffer
+
+    def read_csr64(self, address):
+        if address == self._addresses['fin']:
+            return self._csr.get(self._addresses['enb'], 0)
+        return self._csr.get(address, 0)
+
+    def write_csr64(self, address, value):
+        self._csr[address] = int(value)
+        if address == self._addresses['enb'] and value:
+            self._calculate()
+
+    def _calculate(self):
+        input_buffer = self._buffers[self._csr[self._addresses['input_addr']] << 6]
+        output_buffer = self._buffers[self._csr[self._addresses['output_addr']] << 6]
+        self.started.append(input_buffer)
+        nbr_chunks = self._csr[self._addresses['buffer_size']]
+
+        records = codec._chunks_to_records(
+            np.frombuffer(input_buffer, dtype=np.uint8)[:nbr_chunks * codec.CHUNK_SIZE], self._codec.input_record_size)
+        inputs = {'y_start': np.zeros((len(records), self._codec.system_size))}
+        for field_name, index, number_type, nbr_bits, bit_offset in self._codec._input_fields:
+            values = codec._from_raw(number_type, codec._extract_field(records, nbr_bits, bit_offset))
+            if index is None:
+                inputs[field_name] = values
+            else:
+                inputs[field_name][:, index] = values
+        x, y = expected_results(inputs['x_start'], inputs['y_start'], inputs['h'], inputs['n'].astype(np.int64))
+        outputs = {'id': inputs['id'], 'x': x, 'y': y}
+        if self.step_duration > 0:
+            time.sleep(self.step_duration * int(np.maximum(inputs['n'], 1)[inputs['id'] != 0].sum()))
+
+        output_records = np.zeros((len(records), self._codec.output_record_size), dtype=np.uint8)
+        for field_name, index, number_type, nbr_bits, bit_offset in self._codec._output_fields:
+            values = outputs[field_name] if index is None else outputs[field_name][:, index]
+            codec._insert_field(output_records, codec._to_raw(number_type, values), nbr_bits, bit_offset)
+        if self.drop_output:
+            output_records[0] = 0
+            self.drop_output = False
+        if self.duplicate_output:
+            output_records[0] = output_records[1]
+            self.duplicate_output = False
+        if self.reverse_outputs:
+            output_records = output_records[::-1]
+        image = codec._records_to_chunks(output_records)
+        np.frombuffer(output_buffer, dtype=np.uint8)[:len(image)] = image
+
+
+class FakeBufferPool(BufferPool):
+    """Buffer pool of a fake afu, see FakeHandle."""
+    def __init__(self, config):
+        super().__init__()
+        self.fake_handle = FakeHandle(config)
+
+    def open(self):
+        self._handle = self.fake_handle
+
+    def close(self):
+        self._free = {}
+        self._handle = None
+
+    def _allocate(self, buffer_size) -> _BufferPair:
+        return _BufferPair(self._handle.allocate(buffer_size), self._handle.allocate(buffer_size))
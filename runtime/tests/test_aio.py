@@ -0,0 +1,138 @@
+import asyncio
+import time
+from unittest import TestCase
+
+import numpy as np
+
+from framework.codec import CHUNK_SIZE
+from runtime.aio import AsyncSolver
+from runtime.interface import MAX_INPUT_ID, Solver
+from runtime.tests.helper_fpga import CONFIG, FakeBufferPool, expected_results
+
+
+class AsyncSolverTestCase(TestCase):
+    def setUp(self):
+        self.buffer_pool = FakeBufferPool(CONFIG)
+        self.buffer_pool.open()
+
+    def tearDown(self):
+        self.buffer_pool.close()
+
+    def _inputs(self, nbr_datasets):
+        x_start = np.arange(nbr_datasets) * 0.5
+        y_start = np.stack([x_start, x_start + 1], axis=1)
+        n = np.arange(nbr_datasets) % 5
+        return x_start, y_start, np.full(nbr_datasets, 0.25), n
+
+    def _run(self, submit, max_latency=0.01):
+        """Runs submit with an AsyncSolver on a fake afu, returns its result and the solver."""
+        async def run(solver):
+            async with AsyncSolver(solver, max_latency=max_latency) as async_solver:
+                return await submit(async_solver)
+
+        with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            return asyncio.run(run(solver)), solver
+
+    def test_submit(self):
+        """Check if submissions are coalesced into full batches and each future resolves to its own result."""
+        x_start, y_start, h, n = self._inputs(50)
+
+        async def submit(async_solver):
+            parts = [async_solver.submit(x_start[offset:offset + 10], y_start[offset:offset + 10],
+                                         h[offset:offset + 10], n[offset:offset + 10])
+                     for offset in range(0, 50, 10)]
+            single = await async_solver.solve(1.0, [2.0, 3.0], 0.5, 2)
+            return parts, [[await future for future in part.values()] for part in parts], single
+
+        (parts, results, single), solver = self._run(submit)
+        self.assertEqual(21, solver.input_capacity)
+        # 51 datasets in full batches of 21
+        self.assertEqual(3, len(self.buffer_pool.fake_handle.started))
+
+        x, y = expected_results(x_start, y_start, h, n)
+        self.assertEqual([list(range(offset + 1, offset + 11)) for offset in range(0, 50, 10)],
+                         [list(part) for part in parts])
+        self.assertEqual(list(range(1, 51)), [result['id'] for part in results for result in part])
+        self.assertEqual(x.tolist(), [result['x'] for part in results for result in part])
+        self.assertEqual(y.tolist(), [result['y'] for part in results for result in part])
+        self.assertEqual({'id': 51, 'x': 2.0, 'y': [4.0, 6.0]}, single)
+
+    def test_full_batch(self):
+        """Check if a full batch is started without waiting for the latency window."""
+        x_start, y_start, h, n = self._inputs(21)
+
+        async def submit(async_solver):
+            start = time.monotonic()
+            futures = async_solver.submit(x_start, y_start, h, n)
+            await asyncio.gather(*futures.values())
+            return time.monotonic() - start
+
+        duration, _ = self._run(submit, max_latency=60)
+        self.assertLess(duration, 10)
+        self.assertEqual(1, len(self.buffer_pool.fake_handle.started))
+
+    def test_out_of_order_outputs(self):
+        """Check if futures are resolved by id independent of the output order of the fpga."""
+        x_start, y_start, h, n = self._inputs(15)
+        self.buffer_pool.fake_handle.reverse_outputs = True
+
+        async def submit(async_solver):
+            futures = async_solver.submit(x_start, y_start, h, n)
+            return [await future for future in futures.values()]
+
+        results, _ = self._run(submit)
+        x, y = expected_results(x_start, y_start, h, n)
+        self.assertEqual(list(range(1, 16)), [result['id'] for result in results])
+        self.assertEqual(x.tolist(), [result['x'] for result in results])
+        self.assertEqual(y.tolist(), [result['y'] for result in results])
+
+    def test_failed_batch(self):
+        """Check if the futures of a failed batch get its exception and later submissions are still solved."""
+        x_start, y_start, h, n = self._inputs(5)
+
+        async def submit(async_solver):
+            self.buffer_pool.fake_handle.drop_output = True
+            failed = async_solver.submit(x_start, y_start, h, n)
+            errors = await asyncio.gather(*failed.values(), return_exceptions=True)
+            return errors, await async_solver.solve(1.0, [2.0, 3.0], 0.5, 2)
+
+        (errors, result), _ = self._run(submit)
+        self.assertEqual(['Did not receive all outputs.'] * 5, [str(error) for error in errors])
+        self.assertEqual({'id': 6, 'x': 2.0, 'y': [4.0, 6.0]}, result)
+
+    def test_closed(self):
+        """Check if submissions are rejected once the AsyncSolver is closed."""
+        async def submit(async_solver):
+            return async_solver
+
+        async_solver, _ = self._run(submit)
+        with self.assertRaises(Exception):
+            async_solver.submit(1.0, [2.0, 3.0], 0.5, 2)
+
+    def test_id_wrap(self):
+        """Check if ids wrap around to 1 at the end of the id space without mixing up results."""
+        x_start = np.arange(6) * 0.5
+        y_start = np.stack([x_start, x_start + 1], axis=1)
+
+        async def solve(solver):
+            async with AsyncSolver(solver, max_latency=0.01) as async_solver:
+                first = async_solver.submit(x_start[:3], y_start[:3], 0.25, 2)
+                second = async_solver.submit(x_start[3:], y_start[3:], 0.25, 2)
+                return [await future for future in list(first.values()) + list(second.values())]
+
+        with FakeBufferPool(CONFIG) as buffer_pool:
+            with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=buffer_pool) as solver:
+                solver._current_input_id = MAX_INPUT_ID - 3
+                self.assertEqual(range(MAX_INPUT_ID - 2, MAX_INPUT_ID + 1), solver.reserve_ids(3))
+                self.assertEqual(range(1, 3), solver.reserve_ids(2))
+
+                solver._current_input_id = MAX_INPUT_ID - 3
+                results = asyncio.run(solve(solver))
+                # Ids of one batch must be consecutive, the wrap splits the submissions into two batches
+                self.assertEqual(2, len(buffer_pool.fake_handle.started))
+
+        x, y = expected_results(x_start, y_start, np.full(6, 0.25), np.full(6, 2))
+        self.assertEqual([MAX_INPUT_ID - 2, MAX_INPUT_ID - 1, MAX_INPUT_ID, 1, 2, 3],
+                         [result['id'] for result in results])
+        self.assertEqual(x.tolist(), [result['x'] for result in results])
+        self.assertEqual(y.tolist(), [result['y'] for result in results])
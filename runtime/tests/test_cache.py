@@ -0,0 +1,119 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from runtime import cache as cache_module
+from runtime.cache import ResultCache
+from runtime.interface import merge_results
+from utils import num
+
+
+class _Solver:
+    """Solves x' = 1 with y kept constant, in batches of two datasets."""
+    def __init__(self):
+        self.next_id = 1
+        self.nbr_solved = 0
+
+    def reserve_ids(self, nbr_ids):
+        ids = range(self.next_id, self.next_id + nbr_ids)
+        self.next_id += nbr_ids
+        return ids
+
+    def solve_batches(self, x_start, y_start, h, n):
+        self.nbr_solved += len(x_start)
+        for offset in range(0, len(x_start), 2):
+            index = np.arange(offset, min(offset + 2, len(x_start)))
+            ids = self.reserve_ids(len(index))
+            yield {
+                'index': index,
+                'id': np.arange(ids.start, ids.stop),
+                'x': x_start[index] + h[index] * np.maximum(n[index], 1),
+                'y': y_start[index]
+            }
+
+
+class ResultCacheTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def solve(self, cache, x_start, n, solver=None):
+        solver = solver if solver is not None else _Solver()
+        batches = cache.solve_batches(solver.solve_batches, solver.reserve_ids, 'uuid', 2,
+                                      num.SignedFixedNumberType(37, 16), x_start, [1.0, 2.0], 0.5, n)
+        return merge_results(batches, 2)
+
+    def test_hit(self):
+        """Check if a second run is answered from the cache, also after reopening it."""
+        with ResultCache(self.path) as cache:
+            first = self.solve(cache, [0.0, 1.0, 2.0], 4)
+            self.assertEqual(3, cache.nbr_misses)
+        with ResultCache(self.path) as cache:
+            second = self.solve(cache, [0.0, 1.0, 2.0], 4)
+            self.assertEqual(3, cache.nbr_hits)
+        self.assertEqual([1, 2, 3], second['id'].tolist())
+        np.testing.assert_array_equal(first['x'], second['x'])
+        np.testing.assert_array_equal(first['y'], second['y'])
+
+    def test_resume(self):
+        """Check if datasets with more steps are resumed from the cached result."""
+        with ResultCache(self.path) as cache:
+            self.solve(cache, [0.0, 1.0], 4)
+            result = self.solve(cache, [0.0, 1.0, 2.0], [10, 4, 10])
+            self.assertEqual((1, 1, 1), (cache.nbr_hits, cache.nbr_resumed, cache.nbr_misses - 2))
+        self.assertEqual([5.0, 3.0, 7.0], result['x'].tolist())
+
+    def test_eviction(self):
+        """Check if the least recently used results are evicted."""
+        with ResultCache(self.path) as cache:
+            self.solve(cache, [0.0], 1)
+            entry_size = cache.size
+            cache.max_size = 2 * entry_size
+            self.solve(cache, [1.0], 1)
+            self.solve(cache, [0.0], 1)
+            self.solve(cache, [2.0], 1)
+            self.assertEqual(2 * entry_size, cache.size)
+            cache.nbr_hits = 0
+            self.solve(cache, [0.0, 1.0, 2.0], 1)
+            self.assertEqual(2, cache.nbr_hits)
+
+    def test_shared_eviction(self):
+        """Check if the size includes results stored by another process and replaced results are counted once."""
+        with ResultCache(self.path) as first, ResultCache(self.path) as second:
+            self.solve(first, [0.0, 1.0], 1)
+            entry_size = first.size // 2
+            first.store('uuid', ResultCache.keys(2, num.SignedFixedNumberType(37, 16), [0.0], [[1.0, 2.0]], [0.5]),
+                        np.array([1]), np.array([5.0]), np.array([[1.0, 2.0]]))
+            self.assertEqual(2 * entry_size, first.size)
+
+            second.max_size = 3 * entry_size
+            self.solve(second, [2.0, 3.0], 1)
+            self.assertEqual(3 * entry_size, second.size)
+            # The least recently used result stored by the first cache is evicted
+            second.nbr_hits = 0
+            self.solve(second, [0.0, 1.0], 1)
+            self.assertEqual(1, second.nbr_hits)
+
+    def test_ids(self):
+        """Check if cached and solved datasets of a run get unique ids."""
+        with ResultCache(self.path) as cache:
+            self.solve(cache, [0.0, 2.0], 4)
+            result = self.solve(cache, [0.0, 1.0, 2.0, 3.0], 4)
+        self.assertEqual([1, 3, 2, 4], result['id'].tolist())
+
+    def test_chunked_lookup(self):
+        """Check lookups spanning several query chunks, including repeated datasets."""
+        x_start = (np.arange(2 * cache_module.LOOKUP_CHUNK_SIZE + 10) % (cache_module.LOOKUP_CHUNK_SIZE + 3)) * 1.0
+        n = np.resize([2, 4, 5], len(x_start))
+        with ResultCache(self.path) as cache:
+            self.solve(cache, x_start, 4)
+            cache.nbr_misses = 0
+            result = self.solve(cache, x_start, n)
+            self.assertEqual((np.sum(n == 4), np.sum(n == 5), np.sum(n == 2)),
+                             (cache.nbr_hits, cache.nbr_resumed, cache.nbr_misses))
+        np.testing.assert_array_equal(x_start + 0.5 * n, result['x'])
@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+import numpy as np
+
+from runtime.cpu import CpuSolver
+
+EULER = {'A': [[]], 'b': [1], 'c': [0]}
+RK4 = {'A': [[], [0.5], [0, 0.5], [0, 0, 1]], 'b': [1 / 6, 1 / 3, 1 / 3, 1 / 6], 'c': [0, 0.5, 0.5, 1]}
+
+
+class CpuSolverTestCase(TestCase):
+    def test_euler(self):
+        """Check the step count and the explicit euler steps of y' = y."""
+        config = {'method': EULER, 'problem': {'components': ['y[0]']}}
+        n = np.array([0, 1, 2, 10, 5])
+        with CpuSolver(config, batch_size=3, nbr_threads=2) as solver:
+            result = solver.solve(0.5, [1.0], 0.1, n)
+        steps = np.maximum(n, 1)
+        self.assertEqual([1, 2, 3, 4, 5], result['id'].tolist())
+        self.assertTrue(np.allclose(0.5 + 0.1 * steps, result['x']))
+        self.assertTrue(np.allclose(1.1 ** steps, result['y'][:, 0]))
+
+    def test_rk4(self):
+        """Check the classic runge kutta method on y' = 2 y against its stability function."""
+        config = {'method': RK4, 'problem': {'components': ['2 * y[0]', 'x']}}
+        h = np.array([0.01, 0.1, 0.2])
+        with CpuSolver(config) as solver:
+            result = solver.solve(0, [[1.0, 0.0]], h, 20)
+        z = 2 * h
+        self.assertTrue(np.allclose((1 + z + z ** 2 / 2 + z ** 3 / 6 + z ** 4 / 24) ** 20, result['y'][:, 0]))
+        # y[1]' = x is integrated exactly
+        self.assertTrue(np.allclose((20 * h) ** 2 / 2, result['y'][:, 1]))
+
+    def test_implicit_method(self):
+        """Check if implicit methods are rejected."""
+        config = {'method': {'A': [[0.5]], 'b': [1], 'c': [0.5]}, 'problem': {'components': ['y[0]']}}
+        with self.assertRaises(Exception):
+            CpuSolver(config)
@@ -0,0 +1,116 @@
+import itertools
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from runtime import inputs
+
+PROBLEM = {'components': ['y[1]', 'y[0]'], 'x': 0.5, 'y': [1.0, 2.0], 'h': 0.25, 'n': 4}
+
+
+def _read_all(source, chunk_size):
+    """Concatenates all chunks of a source."""
+    chunks = list(source.chunks(chunk_size))
+    return [offset for offset, _ in chunks], [np.concatenate(values) for values in zip(*[c for _, c in chunks])]
+
+
+class InputSourceTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_npz(self):
+        """Check if the arrays of compressed and uncompressed .npz files are streamed in chunks."""
+        x = np.arange(20) * 0.5
+        y = np.stack([x, -x], axis=1)
+        n = np.arange(20)
+        for save in [np.savez, np.savez_compressed]:
+            with self.subTest(save=save.__name__):
+                path = os.path.join(self.directory.name, save.__name__ + '.npz')
+                save(path, x=x, y=y, n=n)
+                with inputs.open_source(PROBLEM, input_path=path) as source:
+                    self.assertIsInstance(source, inputs.NpzSource)
+                    self.assertEqual(20, len(source))
+                    offsets, (x_start, y_start, h, n_start) = _read_all(source, 7)
+                self.assertEqual([0, 7, 14], offsets)
+                np.testing.assert_array_equal(x, x_start)
+                np.testing.assert_array_equal(y, y_start)
+                np.testing.assert_array_equal(np.full(20, 0.25), h)
+                np.testing.assert_array_equal(n, n_start)
+
+    def test_npz_lengths(self):
+        """Check if arrays of different lengths are rejected."""
+        path = os.path.join(self.directory.name, 'inputs.npz')
+        np.savez(path, x=np.zeros(3), n=np.zeros(4))
+        with self.assertRaises(Exception):
+            inputs.NpzSource(PROBLEM, path)
+
+    def test_csv(self):
+        """Check if CSV columns are read and missing parameters are taken from the config."""
+        path = os.path.join(self.directory.name, 'inputs.csv')
+        with open(path, 'w') as file:
+            file.write('x, y[1], n\n1.0, 5.0, 3\n\n2.0, 6.0, 4\n3.0, 7.0, 5\n')
+        with inputs.open_source(PROBLEM, input_path=path) as source:
+            self.assertIsInstance(source, inputs.CsvSource)
+            self.assertEqual(3, len(source))
+            offsets, (x_start, y_start, h, n) = _read_all(source, 2)
+        self.assertEqual([0, 2], offsets)
+        self.assertEqual([1.0, 2.0, 3.0], x_start.tolist())
+        self.assertEqual([[1.0, 5.0], [1.0, 6.0], [1.0, 7.0]], y_start.tolist())
+        self.assertEqual([0.25] * 3, h.tolist())
+        self.assertEqual([3, 4, 5], n.tolist())
+
+    def test_csv_unknown_column(self):
+        """Check if unknown columns are rejected."""
+        path = os.path.join(self.directory.name, 'inputs.csv')
+        with open(path, 'w') as file:
+            file.write('x, y[2]\n1.0, 2.0\n')
+        with self.assertRaises(Exception):
+            inputs.CsvSource(PROBLEM, path)
+
+    def test_csv_fractional_steps(self):
+        """Check if a number of steps which is not an integer is rejected instead of truncated."""
+        path = os.path.join(self.directory.name, 'inputs.csv')
+        with open(path, 'w') as file:
+            file.write('x, n\n1.0, 3\n2.0, 4.5\n')
+        with inputs.CsvSource(PROBLEM, path) as source:
+            with self.assertRaisesRegex(Exception, '4.5'):
+                _read_all(source, 2)
+
+    def test_grid(self):
+        """Check the expansion of linspace and list grid parameters, the last one varying fastest."""
+        spec = {'y[1]': {'linspace': [0, 1, 3]}, 'h': [0.5, 0.125], 'n': [1, 2, 3, 4]}
+        source = inputs.open_source(PROBLEM, grid=spec)
+        self.assertIsInstance(source, inputs.GridSource)
+        self.assertEqual(24, len(source))
+        expected = list(itertools.product([0.0, 0.5, 1.0], [0.5, 0.125], [1, 2, 3, 4]))
+
+        # Any range of the grid can be read without expanding the datasets before it
+        self.assertEqual({'y[1]': [1.0, 1.0], 'h': [0.125, 0.125], 'n': [3, 4]},
+                         {key: value.tolist() for key, value in source.read(22, 2).items()})
+
+        offsets, (x_start, y_start, h, n) = _read_all(source, 5)
+        self.assertEqual([0, 5, 10, 15, 20], offsets)
+        self.assertEqual(expected, list(zip(y_start[:, 1].tolist(), h.tolist(), n.tolist())))
+        self.assertEqual([0.5] * 24, x_start.tolist())
+        self.assertEqual([1.0] * 24, y_start[:, 0].tolist())
+
+    def test_grid_errors(self):
+        """Check if unknown parameters and malformed specs are rejected."""
+        for spec in [{'y[2]': [1]}, {'h': {'range': [0, 1]}}, {}, {'h': []}, {'n': {'linspace': [1, 2, 0]}},
+                     {'h': [[0.5]]}, {'n': [1, 2.5]}]:
+            with self.subTest(spec=spec):
+                with self.assertRaises(Exception):
+                    _read_all(inputs.GridSource(PROBLEM, spec), 5)
+
+    def test_problem(self):
+        """Check if the configured ivp is repeated without any input file or grid."""
+        source = inputs.open_source(PROBLEM, amount=3)
+        _, (x_start, y_start, h, n) = _read_all(source, 2)
+        self.assertEqual([0.5] * 3, x_start.tolist())
+        self.assertEqual([[1.0, 2.0]] * 3, y_start.tolist())
+        self.assertEqual([4] * 3, n.tolist())
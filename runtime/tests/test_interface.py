@@ -0,0 +1,167 @@
+from unittest import TestCase
+
+import numpy as np
+
+from framework.codec import CHUNK_SIZE
+from runtime.interface import Solver
+from runtime.tests.helper_fpga import CONFIG, FakeBufferPool, expected_results
+from runtime.wait import WaitPolicy
+
+
+class SolverTestCase(TestCase):
+    def setUp(self):
+        self.buffer_pool = FakeBufferPool(CONFIG)
+        self.buffer_pool.open()
+
+    def tearDown(self):
+        self.buffer_pool.close()
+
+    def test_add_inputs(self):
+        """Check if datasets added in parts are placed like a single batch, limited by the input capacity."""
+        x_start = np.arange(40) * 0.5
+        y_start = np.stack([x_start, -x_start], axis=1)
+        with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            ids = [solver.add_inputs(x_start[offset:offset + 5], y_start[offset:offset + 5], 0.25, 3)
+                   for offset in range(0, 20, 5)]
+            self.assertEqual([range(1, 6), range(6, 11), range(11, 16), range(16, 21)], ids)
+            image = solver._codec.pack_input_batch(np.arange(1, 21), x_start[:20], y_start[:20], 0.25, 3)
+            np.testing.assert_array_equal(image, solver.input_view[:len(image)])
+
+            rest = solver.add_inputs(x_start[20:], y_start[20:], 0.25, 3)
+            self.assertEqual(solver.input_capacity - 20, len(rest))
+            self.assertTrue(solver.input_full())
+            self.assertEqual(0, len(solver.add_inputs(x_start, y_start, 0.25, 3)))
+
+    def test_fetch_outputs(self):
+        """Check if the outputs of all added datasets are fetched, empty slots of the last chunk are skipped."""
+        x_start = np.arange(7) * 0.5
+        y_start = np.stack([x_start, x_start + 1], axis=1)
+        n = np.arange(7) % 3
+        with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            ids = solver.add_inputs(x_start, y_start, 0.25, n)
+            solver.start()
+            solver.wait()
+            solver.stop()
+            outputs = solver.fetch_outputs()
+        x, y = expected_results(x_start, y_start, np.full(7, 0.25), n)
+        self.assertEqual(list(ids), outputs['id'].tolist())
+        np.testing.assert_array_equal(x, outputs['x'])
+        np.testing.assert_array_equal(y, outputs['y'])
+
+    def test_buffer_reuse(self):
+        """Check if released buffer pairs are reused and only their used regions are zeroed."""
+        with Solver(CONFIG, 4 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            solver.solve(np.arange(10) * 0.5, [1.0, 2.0], 0.25, 3)
+            buffers = solver._buffer
+            self.assertEqual(solver._codec.input_chunks(10) * CHUNK_SIZE, buffers.input_used)
+            self.assertEqual(solver._codec.output_chunks(buffers.nbr_started_slots) * CHUNK_SIZE, buffers.output_used)
+            # Bytes beyond the used regions are not zeroed on release
+            buffers.output_view[-1] = 1
+        with Solver(CONFIG, 4 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            self.assertIs(buffers, solver._buffer)
+            self.assertEqual(1, self.buffer_pool.nbr_allocated)
+            self.assertEqual((0, 0), (buffers.input_used, buffers.output_used))
+            self.assertFalse(buffers.input_view.any())
+            self.assertEqual([1], buffers.output_view[buffers.output_view != 0].tolist())
+
+    def _inputs(self, nbr_datasets):
+        x_start = np.arange(nbr_datasets) * 0.5
+        y_start = np.stack([x_start, x_start + 1], axis=1)
+        n = np.arange(nbr_datasets) % 5
+        return x_start, y_start, np.full(nbr_datasets, 0.25), n
+
+    def test_batches(self):
+        """Check if datasets exceeding the input capacity are solved in batches."""
+        x_start, y_start, h, n = self._inputs(50)
+        with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            result = solver.solve(x_start, y_start, h, n)
+            self.assertEqual(3, len(self.buffer_pool.fake_handle.started))
+        x, y = expected_results(x_start, y_start, h, n)
+        self.assertEqual(list(range(1, 51)), result['id'].tolist())
+        np.testing.assert_array_equal(x, result['x'])
+        np.testing.assert_array_equal(y, result['y'])
+
+    def test_out_of_order_outputs(self):
+        """Check if outputs are matched to their ids independent of the output order."""
+        x_start, y_start, h, n = self._inputs(20)
+        self.buffer_pool.fake_handle.reverse_outputs = True
+        with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            ids = solver.add_inputs(x_start, y_start, h, n)
+            solver.start()
+            solver.wait()
+            solver.stop()
+            self.assertEqual(list(range(20, 0, -1)), solver.fetch_outputs()['id'].tolist())
+            result = solver.fetch_results(ids)
+        x, y = expected_results(x_start, y_start, h, n)
+        self.assertEqual(list(range(1, 21)), result['id'].tolist())
+        np.testing.assert_array_equal(x, result['x'])
+        np.testing.assert_array_equal(y, result['y'])
+
+    def test_incomplete_outputs(self):
+        """Check if missing and duplicated outputs are detected."""
+        x_start, y_start, h, n = self._inputs(20)
+        with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            for corruption, message in [('drop_output', 'Did not receive'), ('duplicate_output', 'Already got')]:
+                with self.subTest(corruption=corruption):
+                    setattr(self.buffer_pool.fake_handle, corruption, True)
+                    with self.assertRaisesRegex(Exception, message):
+                        solver.solve(x_start, y_start, h, n)
+
+    def test_pipelined(self):
+        """Check if pipelined solving alternates the buffer pairs and yields the same results as chunked solving."""
+        x_start, y_start, h, n = self._inputs(100)
+        with Solver(CONFIG, 3 * CHUNK_SIZE, nbr_buffers=2, buffer_pool=self.buffer_pool) as solver:
+            chunked = solver.solve(x_start, y_start, h, n)
+            started = self.buffer_pool.fake_handle.started
+            del started[:]
+            batches = list(solver.solve_batches(x_start, y_start, h, n, pipelined=True))
+        self.assertEqual(5, len(batches))
+        addresses = [buffer.io_address() for buffer in started]
+        self.assertEqual([addresses[0], addresses[1]] * 2 + [addresses[0]], addresses)
+        self.assertNotEqual(addresses[0], addresses[1])
+
+        pipelined = {
+            'index': np.concatenate([batch['index'] for batch in batches]),
+            'x': np.concatenate([batch['x'] for batch in batches]),
+            'y': np.concatenate([batch['y'] for batch in batches])
+        }
+        self.assertEqual(list(range(100)), pipelined['index'].tolist())
+        np.testing.assert_array_equal(chunked['x'], pipelined['x'])
+        np.testing.assert_array_equal(chunked['y'], pipelined['y'])
+
+    def test_solve_chunks(self):
+        """Check if the batches of all chunks are solved in a single pipeline, indexed by position in all inputs."""
+        x_start, y_start, h, n = self._inputs(105)
+        bounds = [0, 50, 50, 80, 105]
+        chunks = [(start, (x_start[start:stop], y_start[start:stop], h[start:stop], n[start:stop]))
+                  for start, stop in zip(bounds, bounds[1:])]
+        x, y = expected_results(x_start, y_start, h, n)
+        for order in ['input', 'lpt']:
+            with self.subTest(order=order):
+                started = self.buffer_pool.fake_handle.started
+                del started[:]
+                with Solver(CONFIG, 3 * CHUNK_SIZE, nbr_buffers=2, buffer_pool=self.buffer_pool) as solver:
+                    batches = list(solver.solve_chunks(iter(chunks), pipelined=True, order=order))
+                # Batches of 21 datasets, the last batch of each chunk is partly filled
+                self.assertEqual([21, 21, 8, 21, 9, 21, 4], [len(batch['id']) for batch in batches])
+                addresses = [buffer.io_address() for buffer in started]
+                self.assertEqual([addresses[0], addresses[1]] * 3 + [addresses[0]], addresses)
+
+                index = np.concatenate([batch['index'] for batch in batches])
+                self.assertEqual(list(range(105)), sorted(index.tolist()))
+                if order == 'input':
+                    self.assertEqual(list(range(105)), index.tolist())
+                np.testing.assert_array_equal(x[index], np.concatenate([batch['x'] for batch in batches]))
+                np.testing.assert_array_equal(y[index], np.concatenate([batch['y'] for batch in batches]))
+
+    def test_timeout_stops_solver(self):
+        """Check if the solver is stopped if waiting for a batch times out."""
+        class _TimeoutWait(WaitPolicy):
+            def wait(self, is_finished, start_time, expected_steps, timeout=None):
+                raise TimeoutError()
+
+        x_start, y_start, h, n = self._inputs(10)
+        with Solver(CONFIG, 3 * CHUNK_SIZE, wait_policy=_TimeoutWait(), buffer_pool=self.buffer_pool) as solver:
+            with self.assertRaises(TimeoutError):
+                solver.solve(x_start, y_start, h, n)
+            self.assertEqual(0, solver.enb)
@@ -0,0 +1,137 @@
+from unittest import TestCase, mock
+
+import numpy as np
+
+from framework.codec import CHUNK_SIZE
+from runtime import interface
+from runtime import runtime as runtime_module
+from runtime.cpu import CpuSolver
+from runtime.inputs import ProblemSource
+from runtime.multi import MultiSolver
+from runtime.tests.helper_fpga import CONFIG, FakeBufferPool, expected_results
+from runtime.tests.test_cpu import EULER
+
+
+class MultiSolverTestCase(TestCase):
+    def setUp(self):
+        # One fake afu per token, opened by the solver of the card
+        self.buffer_pools = {}
+        self.opened_tokens = []
+        patcher = mock.patch.object(interface, 'BufferPool', side_effect=self._buffer_pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _buffer_pool(self, token, tracer=None):
+        self.opened_tokens.append(token)
+        if token not in self.buffer_pools:
+            self.buffer_pools[token] = FakeBufferPool(CONFIG)
+        return self.buffer_pools[token]
+
+    def _inputs(self, nbr_datasets):
+        x_start = np.arange(nbr_datasets) * 0.5
+        y_start = np.stack([x_start, x_start + 1], axis=1)
+        n = np.arange(nbr_datasets) % 5
+        return x_start, y_start, np.full(nbr_datasets, 0.25), n
+
+    def test_distribution(self):
+        """Check if batches are shared equally until each card is measured, and by throughput afterwards."""
+        with MultiSolver(CONFIG, 32 * CHUNK_SIZE, ['afu0', 'afu1']) as solver:
+            self.assertEqual(7, solver._solvers[0].inputs_per_chunk)
+            solver._nbr_datasets = 200
+            self.assertEqual(range(0, 100), solver._take(0))
+
+            solver._throughput = [1.0, 3.0]
+            self.assertEqual(range(100, 175), solver._take(1))
+            self.assertEqual(range(175, 182), solver._take(0))
+            # Batches are at least one chunk but never exceed the remaining datasets
+            solver._throughput = [3.0, 1.0]
+            self.assertEqual(range(182, 196), solver._take(0))
+            self.assertEqual(range(196, 200), solver._take(1))
+            self.assertEqual(0, len(solver._take(0)))
+
+    def test_solve(self):
+        """Check if every dataset is solved exactly once and reassembled by its index, the faster card solves more."""
+        x_start, y_start, h, n = self._inputs(1000)
+        with MultiSolver(CONFIG, 4 * CHUNK_SIZE, ['afu0', 'afu1']) as solver:
+            self.buffer_pools['afu0'].fake_handle.step_duration = 3e-4
+            batches = list(solver.solve_batches(x_start, y_start, h, n))
+            nbr_solved = solver.nbr_solved
+
+        index = np.concatenate([batch['index'] for batch in batches])
+        self.assertEqual(list(range(1000)), sorted(index.tolist()))
+        for batch in batches:
+            np.testing.assert_array_equal(batch['index'] + 1, batch['id'])
+            x, y = expected_results(x_start[batch['index']], y_start[batch['index']], h[batch['index']],
+                                    n[batch['index']])
+            np.testing.assert_array_equal(x, batch['x'])
+            np.testing.assert_array_equal(y, batch['y'])
+
+        self.assertEqual(1000, sum(nbr_solved))
+        self.assertGreater(nbr_solved[1], 2 * nbr_solved[0])
+        started = {token: len(pool.fake_handle.started) for token, pool in self.buffer_pools.items()}
+        self.assertGreater(started['afu1'], started['afu0'])
+
+    def test_solve_order(self):
+        """Check if results are returned in input order with consecutive ids over several calls."""
+        x_start, y_start, h, n = self._inputs(100)
+        with MultiSolver(CONFIG, 4 * CHUNK_SIZE, ['afu0', 'afu1', 'afu2']) as solver:
+            first = solver.solve(x_start, y_start, h, n, order='lpt')
+            second = solver.solve(x_start[:10], y_start[:10], h[:10], n[:10])
+        x, y = expected_results(x_start, y_start, h, n)
+        self.assertEqual(list(range(1, 101)), first['id'].tolist())
+        np.testing.assert_array_equal(x, first['x'])
+        np.testing.assert_array_equal(y, first['y'])
+        self.assertEqual(list(range(101, 111)), second['id'].tolist())
+        np.testing.assert_array_equal(x[:10], second['x'])
+
+    def test_hybrid(self):
+        """Check if the cpu solves its share of the datasets next to a slow card."""
+        config = dict(CONFIG, method=EULER)
+        x_start, y_start, h, n = self._inputs(1000)
+        with MultiSolver(config, 4 * CHUNK_SIZE, ['afu0'], cpu_solver=CpuSolver(config, batch_size=64)) as solver:
+            self.buffer_pools['afu0'].fake_handle.step_duration = 1e-4
+            result = solver.solve(x_start, y_start, h, n)
+            nbr_solved = solver.nbr_solved
+        self.assertEqual(1000, sum(nbr_solved))
+        self.assertGreater(nbr_solved[0], 0)
+        self.assertGreater(nbr_solved[1], 0)
+
+        x, fpga_y = expected_results(x_start, y_start, h, n)
+        # Explicit euler steps of y[0]' = y[1], y[1]' = y[0]
+        cpu_y = np.array([
+            np.linalg.matrix_power([[1, step_h], [step_h, 1]], steps) @ y
+            for y, step_h, steps in zip(y_start, h, np.maximum(n, 1))
+        ])
+        self.assertEqual(list(range(1, 1001)), result['id'].tolist())
+        np.testing.assert_allclose(x, result['x'])
+        on_fpga = np.all(result['y'] == fpga_y, axis=1)
+        np.testing.assert_allclose(cpu_y[~on_fpga], result['y'][~on_fpga])
+        self.assertEqual(nbr_solved[1], np.count_nonzero(~on_fpga))
+
+    def _run_multi(self, nbr_devices, devices):
+        source = ProblemSource(CONFIG['problem'], 100)
+        with mock.patch.object(runtime_module, '_devices', return_value=devices), \
+                mock.patch.object(runtime_module, '_load_bitstream', return_value=False) as load_bitstream:
+            results = runtime_module._run_multi('solver.slv', CONFIG, source, nbr_devices, 'spin', None, False)
+        return results, [call.args[3] for call in load_bitstream.call_args_list]
+
+    def test_run_multi_devices(self):
+        """Check if the number of devices selects the first cards, 0 selects all of them."""
+        devices = [('device%d' % index, 'afu%d' % index) for index in range(3)]
+        problem = CONFIG['problem']
+        x, y = expected_results(np.full(100, problem['x']), np.tile(problem['y'], (100, 1)), np.full(100, problem['h']),
+                                np.full(100, problem['n']))
+        for nbr_devices, used in [(1, devices[:1]), (2, devices[:2]), (0, devices)]:
+            with self.subTest(nbr_devices=nbr_devices):
+                del self.opened_tokens[:]
+                results, loaded = self._run_multi(nbr_devices, devices)
+                self.assertEqual(used, loaded)
+                self.assertEqual([afu_token for _, afu_token in used], self.opened_tokens)
+                self.assertEqual(list(range(1, 101)), [result['id'] for result in results])
+                np.testing.assert_array_equal(x, [result['x'] for result in results])
+                np.testing.assert_array_equal(y, [result['y'] for result in results])
+
+        with self.assertRaisesRegex(Exception, 'Only 3 FPGA card'):
+            self._run_multi(4, devices)
+        with self.assertRaisesRegex(Exception, 'compatible FPGA'):
+            self._run_multi(0, devices[:2] + [('device2', None)])
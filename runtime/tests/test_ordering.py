@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+import numpy as np
+
+from runtime import ordering, runtime
+
+
+class OrderingTestCase(TestCase):
+    def test_lpt_order(self):
+        """Check if datasets are sorted by descending step count, keeping the order of equal step counts."""
+        self.assertEqual([3, 1, 4, 0, 2], ordering.lpt_order([0, 5, 1, 9, 5]).tolist())
+
+    def test_predict_makespan(self):
+        """Check the pipeline model against hand calculated schedules."""
+        # A single ivp takes its steps times the pipeline depth
+        self.assertAlmostEqual(30, ordering.predict_makespan([10], 4, depth=3))
+        # Less ivps than pipeline stages are bound by the latency of the steps
+        self.assertAlmostEqual(10, ordering.predict_makespan([1] * 5, 1, depth=10))
+        # The depth plus the cycle fifo are in flight at once and share the pipeline, which starts one step per cycle
+        self.assertAlmostEqual(6, ordering.predict_makespan([1] * 6, 1, depth=2))
+        self.assertAlmostEqual(60, ordering.predict_makespan([10] * 6, 1, depth=2))
+        # The first solver instance takes as many ivps as it can hold before the next one is used
+        self.assertEqual([10, 0], ordering.predict_schedule([1] * 5, 2, depth=10).tolist())
+
+    def test_lpt_shortens_makespan(self):
+        """Check if lpt ordering shortens the predicted makespan and tail for skewed step counts."""
+        steps = np.array([10] * 60 + [100])
+        in_order = ordering.predict_schedule(steps, 4, depth=4)
+        lpt = ordering.predict_schedule(steps[ordering.lpt_order(steps)], 4, depth=4)
+        self.assertLess(np.max(lpt), np.max(in_order))
+        self.assertLess(np.max(lpt) - np.min(lpt), np.max(in_order) - np.min(in_order))
+
+        report = ordering.TailReport(4, depth=4)
+        report.add(steps, 0.5)
+        report.add(steps, 0.25)
+        summary = report.summary()
+        self.assertEqual(2, summary['batches'])
+        self.assertAlmostEqual(2 * np.max(in_order), summary['predicted'])
+        self.assertAlmostEqual(2 * np.max(lpt), summary['predicted_lpt'])
+        self.assertLess(summary['predicted_lpt_tail'], summary['predicted_tail'])
+        self.assertEqual(0.75, summary['achieved'])
+
+    def test_pipeline_depth(self):
+        """Check if the pipeline depth is taken from the pipe stats of the build."""
+        self.assertEqual(12, ordering.pipeline_depth({'build_info': {'pipe_stats': {'nbr_stages': 12}}}))
+        self.assertIsNone(ordering.pipeline_depth({'build_info': {}}))
+
+    def test_single_mode_rejects_lpt(self):
+        """Check if lpt ordering is rejected in single mode, which keeps only the first batch."""
+        with self.assertRaises(AssertionError):
+            runtime.run('missing.slv', amount_data=10, mode='single', order='lpt', output='missing.npy')
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from runtime import output
+
+
+class ResultWriterTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'results')
+        self.ids = np.arange(1, 8, dtype=np.int64)
+        self.x = np.arange(7) * 0.5
+        self.y = np.stack([self.x, -self.x], axis=1)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, output_format, nbr_datasets=7):
+        """Writes the results in batches finishing out of order."""
+        with output.open_writer(output_format, self.path, 2, nbr_datasets) as writer:
+            for index in [np.array([4, 5, 6]), np.array([2, 0]), np.array([3, 1])]:
+                index = index[index < nbr_datasets]
+                writer.write({'index': index, 'id': self.ids[index], 'x': self.x[index], 'y': self.y[index]})
+
+    def test_npy(self):
+        """Check if .npy files contain a structured array ordered by the index of the datasets."""
+        self._write('npy')
+        data = np.load(self.path, mmap_mode='r')
+        self.assertEqual(['id', 'x', 'y'], list(data.dtype.names))
+        np.testing.assert_array_equal(self.ids, data['id'])
+        np.testing.assert_array_equal(self.x, data['x'])
+        np.testing.assert_array_equal(self.y, data['y'])
+
+    def test_raw(self):
+        """Check the round trip through RawWriter and read_raw and the layout of the JSON sidecar."""
+        self._write('raw')
+        with open(self.path + '.json') as fd:
+            layout = json.load(fd)
+        self.assertEqual({'columns': [
+            {'name': 'id', 'dtype': '<i8', 'shape': [7], 'offset': 0},
+            {'name': 'x', 'dtype': '<f8', 'shape': [7], 'offset': 56},
+            {'name': 'y', 'dtype': '<f8', 'shape': [7, 2], 'offset': 112}
+        ]}, layout)
+        self.assertEqual(224, os.path.getsize(self.path))
+
+        data = output.read_raw(self.path)
+        np.testing.assert_array_equal(self.ids, data['id'])
+        np.testing.assert_array_equal(self.x, data['x'])
+        np.testing.assert_array_equal(self.y, data['y'])
+
+    def test_raw_empty(self):
+        """Check if empty results can be written and read."""
+        self._write('raw', nbr_datasets=0)
+        data = output.read_raw(self.path)
+        self.assertEqual([(0,), (0,), (0, 2)], [data[name].shape for name in ['id', 'x', 'y']])
+
+    def test_json(self):
+        """Check if JSON files contain the results ordered by the index of the datasets."""
+        self._write('json')
+        with open(self.path) as fd:
+            data = json.load(fd)
+        self.assertEqual([
+            {'id': package_id, 'x': x, 'y': y}
+            for package_id, x, y in zip(self.ids.tolist(), self.x.tolist(), self.y.tolist())
+        ], data)
+
+    def test_unknown_format(self):
+        """Check if unknown output formats are rejected."""
+        with self.assertRaises(NotImplementedError):
+            output.open_writer('csv', self.path, 2, 7)
@@ -0,0 +1,187 @@
+import json
+import sys
+import types
+import uuid
+from unittest import TestCase, mock
+
+import numpy as np
+
+from framework.codec import CHUNK_SIZE
+from runtime import interface
+from runtime import runtime as runtime_module
+from runtime.inputs import ProblemSource
+from runtime.interface import Solver
+from runtime.scheduler import JobScheduler
+from runtime.tests.helper_fpga import CONFIG, FakeBufferPool
+from utils import slv
+
+AFU_ID = '00000000-0000-0000-0000-000000000001'
+
+
+class _FakeOpae:
+    """opae fpga module with one card, its afu id is read from the device feature header."""
+    DEVICE = 'device'
+    ACCELERATOR = 'accelerator'
+    OPEN_SHARED = 1
+
+    def __init__(self, afu_id):
+        self.afu_id = uuid.UUID(afu_id)
+        self.accelerators = ['afu0']
+        self.reconfigure = mock.Mock()
+
+    def enumerate(self, type):
+        return ['device0'] if type == self.DEVICE else self.accelerators
+
+    def open(self, token, flags=0):
+        fake_opae = self
+
+        class _Handle:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, exc_type, exc_val, exc_tb):
+                pass
+
+            def read_csr64(self, address):
+                assert token in fake_opae.accelerators
+                afu_id = fake_opae.afu_id.bytes
+                if address == runtime_module.AFU_ID_L:
+                    return int.from_bytes(afu_id[8:], 'big')
+                assert address == runtime_module.AFU_ID_H
+                return int.from_bytes(afu_id[:8], 'big')
+
+            def reconfigure(self, slot, fd):
+                fake_opae.reconfigure(token, slot, fd.read())
+
+        return _Handle()
+
+
+class LoadBitstreamTestCase(TestCase):
+    def setUp(self):
+        self.fpga = _FakeOpae(AFU_ID)
+        for patcher in [mock.patch.dict(sys.modules, {'opae': types.SimpleNamespace(fpga=self.fpga)}),
+                        mock.patch.object(slv, 'extract_gbs', return_value=__file__)]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_loaded_afu_id(self):
+        """Check if the afu id is read from the afu given or the first afu found."""
+        self.assertEqual(uuid.UUID(AFU_ID), runtime_module._loaded_afu_id('afu0'))
+        self.assertEqual(uuid.UUID(AFU_ID), runtime_module._loaded_afu_id())
+        self.fpga.accelerators = []
+        self.assertIsNone(runtime_module._loaded_afu_id())
+
+    def test_loaded_afu_skips_reconfiguration(self):
+        """Check if the card is not reconfigured if the afu of the solver is loaded."""
+        self.assertFalse(runtime_module._load_bitstream('solver.slv', AFU_ID))
+        self.assertFalse(runtime_module._load_bitstream('solver.slv', AFU_ID, device=('device0', 'afu0')))
+        self.fpga.reconfigure.assert_not_called()
+
+    def test_reconfiguration(self):
+        """Check if the card is reconfigured with the gbs file if another afu is loaded or a reload is forced."""
+        with open(__file__, 'rb') as gbs:
+            gbs_content = gbs.read()
+        other_id = '00000000-0000-0000-0000-000000000002'
+        for afu_id, force_reload in [(other_id, False), (AFU_ID, True), (None, False)]:
+            with self.subTest(afu_id=afu_id, force_reload=force_reload):
+                self.fpga.reconfigure.reset_mock()
+                self.assertTrue(runtime_module._load_bitstream('solver.slv', afu_id, force_reload))
+                self.fpga.reconfigure.assert_called_once_with('device0', 0, gbs_content)
+
+        # Without any afu the loaded id is unknown, the card is reconfigured
+        self.fpga.accelerators = []
+        self.assertTrue(runtime_module._load_bitstream('solver.slv', AFU_ID))
+
+        self.fpga.accelerators = ['afu0']
+        self.fpga.reconfigure.reset_mock()
+        self.assertTrue(runtime_module._load_bitstream('solver.slv', other_id, device=('device1', 'afu0')))
+        self.fpga.reconfigure.assert_called_once_with('device1', 0, gbs_content)
+
+
+class BenchmarkTestCase(TestCase):
+    def test_summarize(self):
+        """Check the statistics of the timing samples."""
+        summary = runtime_module._summarize([3.0, 1.0, 10.0, 2.0, 4.0])
+        self.assertEqual(['mean', 'min', 'max', 'p50', 'p90', 'p99'], list(summary))
+        self.assertEqual((4.0, 1.0, 10.0, 3.0), (summary['mean'], summary['min'], summary['max'], summary['p50']))
+        self.assertAlmostEqual(7.6, summary['p90'])
+        self.assertAlmostEqual(9.76, summary['p99'])
+        self.assertEqual({'mean': 0.5, 'min': 0.5, 'max': 0.5, 'p50': 0.5, 'p90': 0.5, 'p99': 0.5},
+                         runtime_module._summarize([0.5]))
+
+    def test_report(self):
+        """Check the json report of a benchmark on a fake afu."""
+        buffer_pool = FakeBufferPool(CONFIG)
+        with mock.patch.object(slv, 'read_config', return_value=CONFIG), \
+                mock.patch.object(runtime_module, '_load_bitstream', return_value=False), \
+                mock.patch.object(interface, 'BufferPool', return_value=buffer_pool):
+            report = runtime_module.benchmark('solver.slv', amounts=(1, 30), warmup=2, repetitions=3)
+        self.assertEqual(report, json.loads(json.dumps(report)))
+        # Each iteration solves all datasets of an amount in a single batch
+        self.assertEqual(2 * (2 + 3), len(buffer_pool.fake_handle.started))
+
+        self.assertEqual({'path': 'solver.slv', 'uuid': CONFIG['build_info']['uuid'], 'version': None,
+                          'datetime': None, 'numeric': {}, 'nbr_solver': 1, 'system_size': 2}, report['solver'])
+        self.assertEqual({'problem': {'x': 0.0, 'y': [1.0, 2.0], 'h': 0.25, 'n': 4}, 'warmup': 2, 'repetitions': 3,
+                          'wait_policy': 'spin'}, report['settings'])
+        self.assertEqual([1, 30], [result['amount'] for result in report['results']])
+        for result in report['results']:
+            self.assertEqual(['amount', 'steps', 'ivps_per_s', 'steps_per_s', 'timing'], list(result))
+            self.assertEqual(4 * result['amount'], result['steps'])
+            timing = result['timing']
+            self.assertEqual(['pack', 'compute', 'decode', 'total'], list(timing))
+            for summary in timing.values():
+                self.assertEqual(['mean', 'min', 'max', 'p50', 'p90', 'p99'], list(summary))
+                self.assertTrue(0 <= summary['min'] <= summary['p50'] <= summary['p90'] <= summary['max'])
+            self.assertGreaterEqual(timing['total']['max'], timing['compute']['max'])
+            self.assertAlmostEqual(result['amount'] / timing['total']['p50'], result['ivps_per_s'])
+            self.assertAlmostEqual(result['steps'] / timing['compute']['p50'], result['steps_per_s'])
+
+
+class RunJobsTestCase(TestCase):
+    def test_shared_bitstream(self):
+        """Check if jobs of solver files with the same bitstream are solved with one reconfiguration."""
+        configs = {
+            'a.slv': CONFIG,
+            'b.slv': dict(CONFIG, build_info=dict(CONFIG['build_info'], uuid='00000000-0000-0000-0000-000000000002')),
+            'a2.slv': dict(CONFIG, problem=dict(CONFIG['problem'], x=1.0))
+        }
+        with mock.patch.object(slv, 'read_config', side_effect=configs.get), \
+                mock.patch.object(runtime_module, '_load_bitstream', return_value=True) as load_bitstream, \
+                mock.patch.object(runtime_module, 'BufferPool', side_effect=lambda: FakeBufferPool(CONFIG)):
+            scheduler = JobScheduler(max_wait=None)
+            jobs = [scheduler.submit(slv_path) for slv_path in ['a.slv', 'b.slv', 'a2.slv', 'a.slv']]
+            report = runtime_module.run_jobs(scheduler)
+
+        self.assertEqual(['a.slv', 'b.slv'], [call.args[0] for call in load_bitstream.call_args_list])
+        # The problem configuration of each solver file is used
+        self.assertEqual([[1.0], [1.0], [2.0], [1.0]], [job.result['x'].tolist() for job in jobs])
+        self.assertEqual((4, 2, 3), (report['jobs'], report['reconfigurations'], report['reconfigurations_in_order']))
+
+
+class SolveSourceTestCase(TestCase):
+    def test_single_pipeline(self):
+        """Check if all chunks of a source are solved in a single pipeline."""
+        with FakeBufferPool(CONFIG) as buffer_pool, \
+                Solver(CONFIG, 3 * CHUNK_SIZE, nbr_buffers=2, buffer_pool=buffer_pool) as solver, \
+                mock.patch.object(runtime_module, 'INPUT_CHUNK_SIZE', 50):
+            batches = list(runtime_module._solve_source(solver.solve_chunks, ProblemSource(CONFIG['problem'], 100),
+                                                        pipelined=True))
+            started = [buffer.io_address() for buffer in buffer_pool.fake_handle.started]
+        self.assertEqual([21, 21, 8] * 2, [len(batch['id']) for batch in batches])
+        self.assertEqual(list(range(100)), np.concatenate([batch['index'] for batch in batches]).tolist())
+        self.assertEqual(list(range(1, 101)), np.concatenate([batch['id'] for batch in batches]).tolist())
+        # The buffer pairs alternate across the chunk boundaries
+        self.assertEqual([started[0], started[1]] * 3, started)
+
+    def test_per_chunk(self):
+        """Check if solvers without solve_chunks solve the chunks one after another with the indices of the source."""
+        solve_batches = mock.Mock(side_effect=lambda x_start, y_start, h, n, order: iter([
+            {'index': np.arange(len(x_start)), 'x': x_start}
+        ]))
+        with mock.patch.object(runtime_module, 'INPUT_CHUNK_SIZE', 30):
+            batches = list(runtime_module._solve_source(
+                runtime_module._per_chunk(solve_batches), ProblemSource(CONFIG['problem'], 70), order='lpt'))
+        self.assertEqual(3, solve_batches.call_count)
+        self.assertEqual([0, 30, 60], [batch['index'][0] for batch in batches])
+        self.assertEqual(list(range(70)), np.concatenate([batch['index'] for batch in batches]).tolist())
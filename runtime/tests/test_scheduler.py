@@ -0,0 +1,111 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from runtime.scheduler import JobScheduler, bitstream_id
+from utils import slv
+
+
+def _bitstream_id(slv_path):
+    """Solver files named by their bitstream, followed by a number for further files of the same bitstream."""
+    return slv_path[0]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class JobSchedulerTestCase(TestCase):
+    def _process(self, scheduler, clock, duration=1.0, reconfiguration_time=10.0):
+        """Solves all jobs with a fake fpga, returns the order the solvers were used in."""
+        loaded = [None]
+        order = []
+
+        def execute(slv_path, jobs):
+            order.append((slv_path, [job.id for job in jobs]))
+            clock.now += duration * len(jobs)
+            for job in jobs:
+                job.result = {}
+            if loaded[0] == slv_path:
+                return None
+            loaded[0] = slv_path
+            clock.now += reconfiguration_time
+            return reconfiguration_time
+
+        scheduler.process(execute)
+        return order
+
+    def test_grouping(self):
+        """Check if jobs are grouped by solver in the order of their oldest job."""
+        clock = _Clock()
+        scheduler = JobScheduler(max_wait=None, clock=clock, bitstream_id=_bitstream_id)
+        for slv_path in ['a', 'b', 'a', 'c', 'b', 'a']:
+            scheduler.submit(slv_path)
+        order = self._process(scheduler, clock)
+        self.assertEqual([('a', [0, 2, 5]), ('b', [1, 4]), ('c', [3])], order)
+
+        report = scheduler.report()
+        self.assertEqual(6, report['jobs'])
+        self.assertEqual(3, report['reconfigurations'])
+        self.assertEqual(6, report['reconfigurations_in_order'])
+        self.assertAlmostEqual(30.0, report['time_saved'])
+
+    def test_loaded_preferred(self):
+        """Check if new jobs of the loaded solver are preferred until another job waits too long."""
+        clock = _Clock()
+        scheduler = JobScheduler(max_wait=5.0, clock=clock, bitstream_id=_bitstream_id)
+        scheduler.submit('a')
+        scheduler.submit('b')
+        self.assertEqual('a', scheduler.next_group()[0])
+
+        scheduler.submit('a')
+        clock.now = 4.0
+        self.assertEqual('a', scheduler.next_group()[0])
+
+        scheduler.submit('a')
+        clock.now = 6.0
+        self.assertEqual('b', scheduler.next_group()[0])
+        self.assertEqual('a', scheduler.next_group()[0])
+        self.assertEqual((None, []), scheduler.next_group())
+
+    def test_max_group_time(self):
+        """Check if the loaded solver is changed after max_group_time if other jobs are waiting."""
+        clock = _Clock()
+        scheduler = JobScheduler(max_wait=None, max_group_time=3.0, clock=clock,
+                                 bitstream_id=_bitstream_id)
+        scheduler.submit('a')
+        scheduler.submit('b')
+        self.assertEqual('a', scheduler.next_group()[0])
+
+        clock.now = 2.0
+        scheduler.submit('a')
+        self.assertEqual('a', scheduler.next_group()[0])
+
+        clock.now = 4.0
+        scheduler.submit('a')
+        self.assertEqual('b', scheduler.next_group()[0])
+
+    def test_same_bitstream(self):
+        """Check if the jobs of different solver files with the same bitstream are grouped."""
+        clock = _Clock()
+        scheduler = JobScheduler(max_wait=None, clock=clock, bitstream_id=_bitstream_id)
+        for slv_path in ['a', 'b', 'a2', 'a']:
+            scheduler.submit(slv_path)
+        bitstream, jobs = scheduler.next_group()
+        self.assertEqual(('a', ['a', 'a2', 'a']), (bitstream, [job.slv_path for job in jobs]))
+        self.assertEqual('b', scheduler.next_group()[0])
+
+    def test_bitstream_id(self):
+        """Check if solver files are identified by their uuid, or by their path if they have none."""
+        with tempfile.TemporaryDirectory() as directory:
+            gbs_path = os.path.join(directory, 'solver.gbs')
+            with open(gbs_path, 'wb') as gbs:
+                gbs.write(b'gbs')
+            paths = [os.path.join(directory, name) for name in ['first.slv', 'second.slv', 'third.slv']]
+            for path, build_info in zip(paths, [{'uuid': 'uuid'}, {'uuid': 'uuid'}, {}]):
+                slv.pack(gbs_path, {'build_info': build_info}, path)
+            self.assertEqual(['uuid', 'uuid', os.path.realpath(paths[2])], [bitstream_id(path) for path in paths])
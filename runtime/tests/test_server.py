@@ -0,0 +1,97 @@
+import asyncio
+import os
+import signal
+import socket
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from framework.codec import CHUNK_SIZE
+from runtime import client
+from runtime.interface import Solver
+from runtime.server import SolverServer
+from runtime.tests.helper_fpga import CONFIG, FakeBufferPool, expected_results
+
+
+class SolverServerTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, 'solver.sock')
+        self.buffer_pool = FakeBufferPool(CONFIG)
+        self.buffer_pool.open()
+
+    def tearDown(self):
+        self.buffer_pool.close()
+        self.directory.cleanup()
+
+    def _serve(self, clients):
+        """
+        Serves a solver on a fake afu while clients runs, the server is stopped by SIGTERM afterwards.
+        :return: result of clients and the connection of an idle client after the server stopped
+        """
+        async def run(solver):
+            server = SolverServer(solver, CONFIG['problem'], self.socket_path, max_latency=0.01)
+            serving = asyncio.ensure_future(server.serve_forever())
+            try:
+                while True:
+                    try:
+                        idle = await asyncio.open_unix_connection(self.socket_path)
+                        break
+                    except (FileNotFoundError, ConnectionRefusedError):
+                        await asyncio.sleep(0.001)
+                result = await clients()
+            finally:
+                signal.raise_signal(signal.SIGTERM)
+                await serving
+            return result, await idle[0].read()
+
+        with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=self.buffer_pool) as solver:
+            return asyncio.run(run(solver))
+
+    def test_concurrent_clients(self):
+        """Check if concurrent clients get the results of their own inputs and the socket is removed on shutdown."""
+        # A socket left over by a previous server is replaced
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(self.socket_path)
+        x_start = np.arange(40).reshape(4, 10) * 0.5
+
+        async def clients():
+            loop = asyncio.get_running_loop()
+            return await asyncio.gather(*[
+                loop.run_in_executor(None, lambda x=x: client.request(self.socket_path, x=x, n=3))
+                for x in x_start
+            ])
+
+        responses, idle = self._serve(clients)
+        self.assertEqual(b'', idle)
+        self.assertFalse(os.path.exists(self.socket_path))
+
+        problem = CONFIG['problem']
+        ids = [package_id for response in responses for package_id in response['id']]
+        self.assertEqual(list(range(1, 41)), sorted(ids))
+        for x, response in zip(x_start, responses):
+            expected_x, expected_y = expected_results(x, np.tile(problem['y'], (10, 1)), np.full(10, problem['h']),
+                                                      np.full(10, 3))
+            self.assertEqual(expected_x.tolist(), response['x'])
+            self.assertEqual(expected_y.tolist(), response['y'])
+
+    def test_error_reply(self):
+        """Check if invalid requests are answered with an error and the connection stays usable."""
+        async def clients():
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            replies = []
+            for line in [b'not json\n', b'{"x": [1, 2], "h": [1, 2, 3]}\n', b'{"x": 1.5}\n']:
+                writer.write(line)
+                replies.append(await reader.readline())
+            writer.close()
+            loop = asyncio.get_running_loop()
+            with self.assertRaises(Exception):
+                await loop.run_in_executor(None, lambda: client.request(self.socket_path, y=[[1, 2, 3]]))
+            return replies
+
+        replies, _ = self._serve(clients)
+        self.assertIn(b'"error"', replies[0])
+        self.assertIn(b'"error"', replies[1])
+        self.assertEqual(b'{"id": [1], "x": [2.5], "y": [[4.0, 8.0]]}\n', replies[2])
+        self.assertFalse(os.path.exists(self.socket_path))
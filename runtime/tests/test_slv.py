@@ -0,0 +1,106 @@
+import hashlib
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from utils import slv
+
+
+class SlvTestCase(TestCase):
+    config = {'problem': {'components': ['y[0]']}, 'build_info': {'uuid': '00000000-0000-0000-0000-000000000001'}}
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, 'cache')
+        self.slv_path = os.path.join(self.directory.name, 'solver.slv')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _pack(self, gbs_content, mtime_ns=None):
+        gbs_path = os.path.join(self.directory.name, 'solver.gbs')
+        with open(gbs_path, 'wb') as gbs:
+            gbs.write(gbs_content)
+        slv.pack(gbs_path, self.config, self.slv_path)
+        if mtime_ns is not None:
+            os.utime(self.slv_path, ns=(mtime_ns, mtime_ns))
+
+    def _cached_files(self):
+        return sorted(os.listdir(self.cache_dir))
+
+    def test_read_config(self):
+        """Check if the config is read from the header."""
+        self._pack(b'gbs')
+        self.assertEqual(self.config, slv.read_config(self.slv_path))
+
+    def test_extract(self):
+        """Check if the gbs file is extracted under its hash and reused while the slv file is unchanged."""
+        self._pack(b'gbs content', mtime_ns=10 ** 18)
+        gbs_path = slv.extract_gbs(self.slv_path, self.cache_dir)
+        digest = hashlib.sha256(b'gbs content').hexdigest()
+        self.assertEqual(os.path.join(self.cache_dir, digest + '.gbs'), gbs_path)
+        with open(gbs_path, 'rb') as gbs:
+            self.assertEqual(b'gbs content', gbs.read())
+        # Only the gbs file and the reference of the slv file, no temporary files
+        self.assertEqual(2, len(self._cached_files()))
+        self.assertEqual([digest + '.gbs'], [name for name in self._cached_files() if not name.endswith('.ref')])
+
+        # The gbs file embedded in the unchanged slv file is neither read nor written again
+        gbs_stat = os.stat(gbs_path)
+        with mock.patch.object(slv.mmap, 'mmap', side_effect=AssertionError('slv file read again')), \
+                mock.patch.object(slv, '_is_cached', side_effect=AssertionError('gbs file hashed again')):
+            self.assertEqual(gbs_path, slv.extract_gbs(self.slv_path, self.cache_dir))
+        self.assertEqual(gbs_stat.st_mtime_ns, os.stat(gbs_path).st_mtime_ns)
+
+    def test_invalidation(self):
+        """Check if a slv file of the same size is extracted again if its modification time changed."""
+        self._pack(b'gbs content 1', mtime_ns=10 ** 18)
+        first_path = slv.extract_gbs(self.slv_path, self.cache_dir)
+        self._pack(b'gbs content 2', mtime_ns=10 ** 18 + 1)
+        second_path = slv.extract_gbs(self.slv_path, self.cache_dir)
+        self.assertNotEqual(first_path, second_path)
+        with open(second_path, 'rb') as gbs:
+            self.assertEqual(b'gbs content 2', gbs.read())
+
+        # Reverting the slv file reuses the reference and the gbs file extracted before
+        self._pack(b'gbs content 1', mtime_ns=10 ** 18)
+        self.assertEqual(first_path, slv.extract_gbs(self.slv_path, self.cache_dir))
+        self.assertEqual(4, len(self._cached_files()))
+
+    def test_damaged_cache(self):
+        """Check if modified cached gbs files of the correct size are hashed and replaced if they are damaged."""
+        self._pack(b'gbs content', mtime_ns=10 ** 18)
+        gbs_path = slv.extract_gbs(self.slv_path, self.cache_dir)
+        with open(gbs_path, 'wb') as gbs:
+            gbs.write(b'gbs_content')
+        os.utime(gbs_path, ns=(10 ** 18, 10 ** 18))
+        self.assertEqual(gbs_path, slv.extract_gbs(self.slv_path, self.cache_dir))
+        with open(gbs_path, 'rb') as gbs:
+            self.assertEqual(b'gbs content', gbs.read())
+
+    def test_damaged_ref(self):
+        """Check if the gbs file is extracted again if the reference is damaged or its gbs file was removed."""
+        self._pack(b'gbs content', mtime_ns=10 ** 18)
+        gbs_path = slv.extract_gbs(self.slv_path, self.cache_dir)
+        ref_path, = [os.path.join(self.cache_dir, name) for name in self._cached_files() if name.endswith('.ref')]
+        for damage in ['truncate', 'remove']:
+            with self.subTest(damage=damage):
+                if damage == 'truncate':
+                    with open(ref_path, 'w') as ref:
+                        ref.write('abc')
+                else:
+                    os.unlink(gbs_path)
+                self.assertEqual(gbs_path, slv.extract_gbs(self.slv_path, self.cache_dir))
+                with open(gbs_path, 'rb') as gbs:
+                    self.assertEqual(b'gbs content', gbs.read())
+
+    def test_write_atomic(self):
+        """Check if a failed write leaves neither a partial nor a temporary file."""
+        os.makedirs(self.cache_dir)
+        path = os.path.join(self.cache_dir, 'file')
+        slv._write_atomic(path, b'old')
+        with self.assertRaises(TypeError):
+            slv._write_atomic(path, 'not bytes')
+        self.assertEqual(['file'], self._cached_files())
+        with open(path, 'rb') as file:
+            self.assertEqual(b'old', file.read())
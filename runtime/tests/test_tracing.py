@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from framework.codec import CHUNK_SIZE
+from runtime.interface import Solver
+from runtime.tests.helper_fpga import CONFIG, FakeBufferPool
+from runtime.tracing import ChromeTracer
+
+
+class ChromeTracerTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'trace.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _load(self, tracer):
+        tracer.save(self.path)
+        with open(self.path) as fd:
+            trace = json.load(fd)
+        self.assertEqual(['displayTimeUnit', 'traceEvents'], sorted(trace))
+        for event in trace['traceEvents']:
+            self.assertIn(event['ph'], ['X', 'i'])
+            keys = ['args', 'name', 'ph', 'pid', 'tid', 'ts'] + (['dur'] if event['ph'] == 'X' else ['s'])
+            self.assertEqual(sorted(keys), sorted(event))
+            self.assertGreaterEqual(event['ts'], 0)
+        return trace['traceEvents']
+
+    def test_events(self):
+        """Check if nested spans, instants and spans of other threads are saved as Chrome trace events."""
+        tracer = ChromeTracer()
+        with tracer.span('outer', nbr_inputs=3):
+            with tracer.span('inner'):
+                tracer.instant('start', expected_steps=1.5)
+        thread = threading.Thread(target=lambda: tracer.span('other').__enter__().__exit__(None, None, None))
+        thread.start()
+        thread.join()
+
+        events = {event['name']: event for event in self._load(tracer)}
+        self.assertEqual(['inner', 'other', 'outer', 'start'], sorted(events))
+        outer, inner, instant = events['outer'], events['inner'], events['start']
+        self.assertEqual({'nbr_inputs': 3}, outer['args'])
+        self.assertEqual({'expected_steps': 1.5}, instant['args'])
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertLessEqual(inner['ts'] + inner['dur'], outer['ts'] + outer['dur'])
+        self.assertTrue(inner['ts'] <= instant['ts'] <= inner['ts'] + inner['dur'])
+        self.assertEqual(outer['tid'], inner['tid'])
+        self.assertNotEqual(outer['tid'], events['other']['tid'])
+
+    def test_solver_trace(self):
+        """Check if the spans recorded by a solver can be saved."""
+        tracer = ChromeTracer()
+        with FakeBufferPool(CONFIG) as buffer_pool:
+            with Solver(CONFIG, 3 * CHUNK_SIZE, buffer_pool=buffer_pool, tracer=tracer) as solver:
+                solver.solve([0.0] * 30, [1.0, 2.0], 0.25, 3)
+        names = set(event['name'] for event in self._load(tracer))
+        self.assertTrue({'allocate', 'pack', 'start', 'wait', 'stop', 'decode'} <= names)
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Records spans of the runtime, the default implementation records nothing.
+    """
+    def span(self, name: str, **args):
+        """
+        Returns a context manager recording the time spent inside of it.
+        :param name: name of the span, e.g. pack, wait or decode
+        :param args: additional information shown with the span
+        """
+        return _NULL_SPAN
+
+    def instant(self, name: str, **args):
+        """
+        Records a single point in time.
+        """
+        pass
+
+
+class _Span:
+    def __init__(self, tracer, name, args):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        end = time.perf_counter_ns()
+        self._tracer.add_event({
+            'name': self._name,
+            'ph': 'X',
+            'ts': (self._start - self._tracer.origin) / 1000,
+            'dur': (end - self._start) / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': self._args
+        })
+
+
+class ChromeTracer(Tracer):
+    def __init__(self):
+        """
+        Records spans as Chrome trace events, the saved file can be opened in chrome://tracing or Perfetto.
+        Spans of all threads are recorded, e.g. of each card of a MultiSolver.
+        """
+        self.origin = time.perf_counter_ns()
+        self.events = []
+        self._lock = threading.Lock()
+
+    def span(self, name, **args):
+        return _Span(self, name, args)
+
+    def instant(self, name, **args):
+        self.add_event({
+            'name': name,
+            'ph': 'i',
+            's': 't',
+            'ts': (time.perf_counter_ns() - self.origin) / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args
+        })
+
+    def add_event(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def save(self, path: str):
+        """
+        Writes all recorded events in the Chrome trace event format.
+        """
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'w') as fd:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fd)
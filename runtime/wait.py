@@ -0,0 +1,93 @@
+import time
+from typing import Callable, Optional
+
+
+class WaitPolicy:
+    """
+    Strategy used to wait for the completion of a calculation on the fpga.
+    """
+    def wait(self, is_finished: Callable[[], bool], start_time: float, expected_steps: float,
+             timeout: Optional[float] = None):
+        """
+        Blocks until is_finished returns true.
+        :param is_finished: polls the completion state, typically a mmio read of the fin register
+        :param start_time: time.monotonic() at the start of the calculation
+        :param expected_steps: number of solver steps per solver instance of the calculation. A solver instance
+                               finishes at most one step per clock cycle, so this is a lower bound of the clock cycles.
+        :param timeout: maximum time in seconds since start_time, None to wait forever
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _check_timeout(start_time: float, timeout: Optional[float]):
+        if timeout is not None and time.monotonic() - start_time > timeout:
+            raise TimeoutError('Solver did not finish within %.3f s.' % timeout)
+
+
+class SpinWait(WaitPolicy):
+    """
+    Polls without pause, lowest latency but occupies a full core.
+    """
+    def wait(self, is_finished, start_time, expected_steps, timeout=None):
+        while not is_finished():
+            self._check_timeout(start_time, timeout)
+
+
+class BackoffWait(WaitPolicy):
+    def __init__(self, initial_sleep=1e-6, max_sleep=1e-3, factor=2.0):
+        """
+        Polls with an exponentially growing sleep in between.
+        :param initial_sleep: first sleep in seconds
+        :param max_sleep: upper limit of the sleep in seconds, bounds the added latency
+        :param factor: growth of the sleep after each poll
+        """
+        self.initial_sleep = initial_sleep
+        self.max_sleep = max_sleep
+        self.factor = factor
+
+    def wait(self, is_finished, start_time, expected_steps, timeout=None):
+        sleep = self.initial_sleep
+        while not is_finished():
+            self._check_timeout(start_time, timeout)
+            time.sleep(sleep)
+            sleep = min(sleep * self.factor, self.max_sleep)
+
+
+class DeadlineWait(WaitPolicy):
+    def __init__(self, clock_frequency=200e6, cycles_per_step=1.0, backoff: BackoffWait = None):
+        """
+        Sleeps until the expected end of the calculation and polls with a backoff afterwards.
+        The pipeline latency of the steps is not known to the runtime, with the default of one cycle per step the
+        deadline is the earliest possible end of the calculation.
+        :param clock_frequency: clock frequency of the solver logic in Hz
+        :param cycles_per_step: average clock cycles per solver step, e.g. measured cycles / expected steps
+        :param backoff: policy used after the deadline passed
+        """
+        self.clock_frequency = clock_frequency
+        self.cycles_per_step = cycles_per_step
+        self.backoff = backoff if backoff is not None else BackoffWait()
+
+    def wait(self, is_finished, start_time, expected_steps, timeout=None):
+        deadline = start_time + expected_steps * self.cycles_per_step / self.clock_frequency
+        if timeout is not None:
+            deadline = min(deadline, start_time + timeout)
+        remaining = deadline - time.monotonic()
+        if remaining > 0 and not is_finished():
+            time.sleep(remaining)
+        self.backoff.wait(is_finished, start_time, expected_steps, timeout)
+
+
+WAIT_POLICIES = {
+    'spin': SpinWait,
+    'backoff': BackoffWait,
+    'deadline': DeadlineWait
+}
+
+
+def from_name(name: str) -> WaitPolicy:
+    """
+    Creates a wait policy with default parameters by its name, see WAIT_POLICIES.
+    """
+    if name not in WAIT_POLICIES:
+        raise NotImplementedError('Unknown wait policy: %s' % name)
+    return WAIT_POLICIES[name]()
@@ -2,7 +2,14 @@ from enum import Enum
 from typing import Union
 
 import struct
-from myhdl import intbv
+
+import numpy as np
+
+
+def _intbv(*args, **kwargs):
+    # myhdl is only required to generate logic, the runtime uses the number types without it
+    from myhdl import intbv
+    return intbv(*args, **kwargs)
 
 
 class NumberType:
@@ -36,6 +43,23 @@ class NumberType:
     def value_of(self, val):
         raise NotImplementedError
 
+    def create_constants(self, values) -> np.ndarray:
+        """
+        Vectorized version of create_constant, the results are identical to create_constant of each value.
+        Values which are not representable raise the same exception as create_constant or create_from_constant.
+        :param values: array like of python values
+        :return: numpy array of the constant representations
+        """
+        raise NotImplementedError
+
+    def values_of(self, constants) -> np.ndarray:
+        """
+        Vectorized version of value_of, the results are identical to value_of of each constant.
+        :param constants: array like of constant representations, see create_constants
+        :return: numpy array of the python values
+        """
+        raise NotImplementedError
+
     @staticmethod
     def from_config(numeric_cfg: dict):
         numeric_type = numeric_cfg.get('type', 'fixed')
@@ -55,7 +79,10 @@ class BoolNumberType(NumberType):
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             return True
-        raise NotImplementedError
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.__class__)
 
     def create_from_constant(self, const_val):
         return bool(const_val)
@@ -66,6 +93,12 @@ class BoolNumberType(NumberType):
     def value_of(self, val):
         return bool(val)
 
+    def create_constants(self, values) -> np.ndarray:
+        return np.asarray(values).astype(bool)
+
+    def values_of(self, constants) -> np.ndarray:
+        return np.asarray(constants).astype(bool)
+
     @staticmethod
     def from_config(numeric_cfg: dict):
         raise NotImplementedError()
@@ -75,10 +108,13 @@ class UnsignedIntegerNumberType(NumberType):
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             return self.nbr_bits == other.nbr_bits
-        raise NotImplementedError
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.__class__, self.nbr_bits))
 
     def create_from_constant(self, const_val):
-        return intbv(const_val, min=0, max=2 ** self.nbr_bits)
+        return _intbv(const_val, min=0, max=2 ** self.nbr_bits)
 
     def create_constant(self, val):
         return int(val)
@@ -86,6 +122,15 @@ class UnsignedIntegerNumberType(NumberType):
     def value_of(self, val):
         return int(val)
 
+    def create_constants(self, values) -> np.ndarray:
+        values = np.asarray(values)
+        if not np.all((values >= 0) & (values < 2 ** self.nbr_bits)):
+            raise ValueError('Values exceed the range of the unsigned integer type.')
+        return values.astype(np.uint64)
+
+    def values_of(self, constants) -> np.ndarray:
+        return np.asarray(constants).astype(np.uint64)
+
     @staticmethod
     def from_config(numeric_cfg: dict):
         raise NotImplementedError()
@@ -103,11 +148,14 @@ class SignedFixedNumberType(NumberType):
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             return self.fraction_bits == other.fraction_bits and self.nonfraction_bits == other.nonfraction_bits
-        raise NotImplementedError
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.__class__, self.fraction_bits, self.nonfraction_bits))
 
     def create_from_constant(self, const_val):
         max_value = 2 ** (self.nonfraction_bits + self.fraction_bits)
-        return intbv(const_val, min=-max_value, max=max_value)
+        return _intbv(const_val, min=-max_value, max=max_value)
 
     def create_constant(self, val):
         return int(round(val * 2 ** self.fraction_bits))
@@ -118,6 +166,18 @@ class SignedFixedNumberType(NumberType):
         else:
             return float(val) / 2 ** self.fraction_bits
 
+    def create_constants(self, values) -> np.ndarray:
+        # np.rint rounds half to even like round
+        scaled = np.rint(np.asarray(values, dtype=np.float64) * 2.0 ** self.fraction_bits)
+        # Checked like in create_from_constant, the cast of values exceeding int64 is undefined
+        max_value = 2.0 ** (self.nonfraction_bits + self.fraction_bits)
+        if not np.all((scaled >= -max_value) & (scaled < max_value)):
+            raise ValueError('Values exceed the range of the fixed point type.')
+        return scaled.astype(np.int64)
+
+    def values_of(self, constants) -> np.ndarray:
+        return np.asarray(constants, dtype=np.int64).astype(np.float64) / 2.0 ** self.fraction_bits
+
     @staticmethod
     def from_config(numeric_cfg: dict):
         fraction_size = numeric_cfg.get('fixed_point_fraction_size', 37)
@@ -135,6 +195,10 @@ class FloatingNumberType(NumberType):
         FloatingPrecision.SINGLE: ('!I', '!f'),
         FloatingPrecision.DOUBLE: ('!Q', '!d')
     }
+    precision_dtype_map = {
+        FloatingPrecision.SINGLE: (np.uint32, np.float32),
+        FloatingPrecision.DOUBLE: (np.uint64, np.float64)
+    }
 
     def __init__(self, precision: Union[FloatingPrecision, str]):
         if isinstance(precision, str):
@@ -146,10 +210,13 @@ class FloatingNumberType(NumberType):
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             return self.precision == other.precision
-        raise NotImplementedError
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.__class__, self.precision))
 
     def create_from_constant(self, const_val):
-        return intbv(const_val, min=0, max=2 ** self.nbr_bits)
+        return _intbv(const_val, min=0, max=2 ** self.nbr_bits)
 
     def create_constant(self, val):
         unpack_mod, pack_mod = self.precision_struct_id_map[self.precision]
@@ -159,6 +226,20 @@ class FloatingNumberType(NumberType):
         pack_mod, unpack_mod = self.precision_struct_id_map[self.precision]
         return struct.unpack(unpack_mod, struct.pack(pack_mod, val))[0]
 
+    def create_constants(self, values) -> np.ndarray:
+        int_dtype, float_dtype = self.precision_dtype_map[self.precision]
+        values = np.asarray(values, dtype=np.float64)
+        with np.errstate(over='ignore'):
+            constants = values.astype(float_dtype)
+        # Like struct.pack, finite values rounding to infinity are rejected
+        if np.any(np.isinf(constants) & np.isfinite(values)):
+            raise OverflowError('Values exceed the range of the floating point type.')
+        return constants.view(int_dtype).astype(np.uint64)
+
+    def values_of(self, constants) -> np.ndarray:
+        int_dtype, float_dtype = self.precision_dtype_map[self.precision]
+        return np.asarray(constants).astype(int_dtype).view(float_dtype).astype(np.float64)
+
     @staticmethod
     def from_config(numeric_cfg: dict):
         precision = FloatingPrecision[
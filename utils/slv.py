@@ -1,5 +1,9 @@
+import hashlib
 import json
+import mmap
+import os
 import struct
+import tempfile
 
 FILE_NAME_ENDING = '.slv'
 FILE_HEADER_IDENTIFIER = 'RTLODESLV'
@@ -22,28 +26,127 @@ def pack(gbs_path, config, out_path):
         slv.write(slv_file_header + gbs_content)
 
 
-def unpack(slv_path, gbs_path=None):
-    file = open(slv_path, 'rb')
-    slv = file.read()
-
-    if len(slv) < FILE_HEADER_IDENTIFIER_LEN \
-            or slv[:FILE_HEADER_IDENTIFIER_LEN] != bytes(FILE_HEADER_IDENTIFIER, encoding='ascii'):
+def _read_header(file):
+    """
+    Reads the header of an opened slv file.
+    :return: config and the offset of the embedded gbs file
+    """
+    header_begin = FILE_HEADER_IDENTIFIER_LEN + 4
+    prefix = file.read(header_begin)
+    if len(prefix) < header_begin \
+            or prefix[:FILE_HEADER_IDENTIFIER_LEN] != bytes(FILE_HEADER_IDENTIFIER, encoding='ascii'):
         raise Exception("Can't parse given slv file.")
 
-    header_begin = FILE_HEADER_IDENTIFIER_LEN + 4
-    header_len = struct.unpack("<I", slv[FILE_HEADER_IDENTIFIER_LEN:header_begin])[0]
+    header_len = struct.unpack("<I", prefix[FILE_HEADER_IDENTIFIER_LEN:header_begin])[0]
 
     config = {}
     if header_len != 0:
-        config = json.loads(slv[header_begin:(header_begin + header_len)].decode('utf-8'))
+        config = json.loads(file.read(header_len).decode('utf-8'))
 
-    gbs_begin = header_begin + header_len
-    if gbs_path is not None:
-        if len(slv) <= gbs_begin:
-            Exception("No gbs file embedded.")
-        gbs_content = slv[gbs_begin:]
+    return config, header_begin + header_len
 
-        with open(gbs_path, 'wb') as gbs:
-            gbs.write(gbs_content)
 
+def read_config(slv_path):
+    """
+    Reads the config of a slv file without touching the embedded gbs file.
+    """
+    with open(slv_path, 'rb') as file:
+        config, _ = _read_header(file)
     return config
+
+
+def default_cache_dir():
+    """
+    Directory used to cache extracted gbs files, can be set by the environment variable RTLODE_CACHE_DIR.
+    """
+    if 'RTLODE_CACHE_DIR' in os.environ:
+        return os.environ['RTLODE_CACHE_DIR']
+    cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'rtlode')
+
+
+def _write_atomic(path, data):
+    """
+    Writes data to a temporary file which is renamed to path, concurrent readers never see partial files.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _is_cached(gbs_path, digest, gbs_size):
+    """
+    Checks if a cached gbs file exists with the given size and sha256 hash, damaged files are not reused.
+    """
+    if not os.path.isfile(gbs_path) or os.path.getsize(gbs_path) != gbs_size:
+        return False
+    sha256 = hashlib.sha256()
+    with open(gbs_path, 'rb') as gbs:
+        for block in iter(lambda: gbs.read(1 << 20), b''):
+            sha256.update(block)
+    return sha256.hexdigest() == digest
+
+
+def _read_ref(ref_path):
+    """
+    Reads the reference of a slv file to its cached gbs file.
+    :return: path of the cached gbs file if it is unchanged since the reference was written, otherwise None
+    """
+    try:
+        with open(ref_path, 'r') as ref:
+            digest, gbs_size, gbs_mtime_ns = ref.read().split()
+        gbs_path = os.path.join(os.path.dirname(ref_path), digest + '.gbs')
+        gbs_stat = os.stat(gbs_path)
+    except (OSError, ValueError):
+        return None
+    if gbs_stat.st_size != int(gbs_size) or gbs_stat.st_mtime_ns != int(gbs_mtime_ns):
+        return None
+    return gbs_path
+
+
+def extract_gbs(slv_path, cache_dir=None):
+    """
+    Extracts the gbs file embedded in a slv file to a cache directory.
+    Cached gbs files are named by the sha256 hash of their content. The hash of a slv file is remembered in a
+    reference by the path, size and modification time of the slv file, together with the size and modification time
+    of the cached gbs file. As long as both files are unchanged, neither of them is read again. Otherwise the gbs file
+    is extracted, reusing a cached gbs file only if its content matches the hash.
+    :param slv_path: path of the slv file
+    :param cache_dir: cache directory, defaults to default_cache_dir()
+    :return: path of the extracted gbs file
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+
+    with open(slv_path, 'rb') as file:
+        _, gbs_begin = _read_header(file)
+        slv_stat = os.fstat(file.fileno())
+        gbs_size = slv_stat.st_size - gbs_begin
+        if gbs_size <= 0:
+            raise Exception("No gbs file embedded.")
+
+        ref_key = '%s:%d:%d' % (os.path.realpath(slv_path), slv_stat.st_size, slv_stat.st_mtime_ns)
+        ref_path = os.path.join(cache_dir, hashlib.sha256(ref_key.encode('utf-8')).hexdigest() + '.ref')
+        gbs_path = _read_ref(ref_path)
+        if gbs_path is not None:
+            return gbs_path
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as slv:
+            gbs_content = memoryview(slv)[gbs_begin:]
+            try:
+                digest = hashlib.sha256(gbs_content).hexdigest()
+                gbs_path = os.path.join(cache_dir, digest + '.gbs')
+                if not _is_cached(gbs_path, digest, gbs_size):
+                    _write_atomic(gbs_path, gbs_content)
+            finally:
+                gbs_content.release()
+
+    gbs_stat = os.stat(gbs_path)
+    _write_atomic(ref_path, ('%s %d %d' % (digest, gbs_stat.st_size, gbs_stat.st_mtime_ns)).encode('ascii'))
+    return gbs_path